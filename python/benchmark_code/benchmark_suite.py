@@ -0,0 +1,467 @@
+# benchmark_code/benchmark_suite.py
+# ============================================================
+# End-to-end benchmark — per-stage wall time, peak RSS, throughput
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Workloads:
+#     synthetic_x<k>   synthetic ISO_DATA (synthetic_iso_data.py) scaled k-fold
+#     corpus_<name>    a bundled UVL-MODULE clean corpus
+# - Stages (in pipeline order; corpora start at "injection"):
+#     structure        BRANCH_PROFILE + ISO_Check_ sheets through the 101
+#                      runner's own per-sheet step (_process_structure_sheet)
+#     uvl_build        uvl_builder.build_uvl_from_frames per sheet
+#     injection        inject_scientific_defects_v5.run_injection (seeded)
+#     uvl_to_kr        batch_uvl_to_kr.run_batch, clean + injected, force
+#     logic_analysis   load_kr_model + analyze_kr_for_defects per KR file
+# - Each stage records wall seconds (perf_counter), RSS at entry, peak
+#   RSS (a sampler thread polling /proc/self/statm; ru_maxrss where /proc
+#   is missing), the stage's own RSS growth (peak - entry), processed
+#   units and units/second. Stage output is silenced.
+# - Stages share one process, so the absolute peak carries everything
+#   earlier stages left allocated; the regression check uses the
+#   per-stage growth instead. (With the ru_maxrss fallback the growth is
+#   only how far the stage pushed the process high-water mark.)
+# - With --repeat N a workload runs N times in fresh work dirs; the
+#   lowest wall time and RSS figures per stage are kept.
+# - Every run is appended to a JSON history. When a baseline exists,
+#   a stage whose wall time or RSS growth exceeds the baseline by more
+#   than the threshold (and an absolute noise floor) is a regression,
+#   and the process exits with status 1.
+# ============================================================
+
+from __future__ import annotations
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# project root (python/) + the flat-import folders of the stages
+ROOT_DIR = Path(__file__).resolve().parent.parent
+for _p in (ROOT_DIR, ROOT_DIR / "structurecode", ROOT_DIR / "validation_code"):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+import structure_branch_profile_pandas as sbpp  # noqa: E402
+import uvl_builder as ub  # noqa: E402
+from batch_uvl_to_kr import run_batch  # noqa: E402
+from final_logic_analyzer import analyze_kr_for_defects, derive_model_key, load_kr_model  # noqa: E402
+from inject_scientific_defects_v5 import run_injection  # noqa: E402
+from config.domain_config import (  # noqa: E402
+    BRANCH_NAME_OVERRIDES,
+    DEP_LABELS,
+    UVL_NAMESPACE,
+)
+from benchmark_code.synthetic_iso_data import (  # noqa: E402
+    STRUCT_SHEET_PREFIX,
+    SyntheticSpec,
+    generate_iso_data,
+)
+
+# the 101 runner's module name starts with a digit: no plain import statement
+structure_runner = importlib.import_module("101_run_structure_universal")
+
+UVL_MODULE_DIR = ROOT_DIR.parent / "UVL-MODULE"
+CORPORA = {
+    "reduced": UVL_MODULE_DIR / "UVL-CLEAN-REDUCED",
+    "quarter2025": UVL_MODULE_DIR / "UVL-CLEAN-QUARTER2025",
+}
+STAGES = ("structure", "uvl_build", "injection", "uvl_to_kr", "logic_analysis")
+
+BENCH_DIR = ROOT_DIR / "cache" / "benchmarks"
+HISTORY_PATH = BENCH_DIR / "history.json"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+# A stage regresses when it is slower / bigger than baseline * (1 + threshold)
+# AND the absolute difference clears the noise floor.
+DEFAULT_TIME_THRESHOLD = 0.25
+DEFAULT_RSS_THRESHOLD = 0.25
+MIN_WALL_DELTA_S = 0.05
+MIN_RSS_DELTA_MB = 16.0
+
+_RSS_SAMPLE_S = 0.005
+_MB = 1024.0 * 1024.0
+
+
+# =========================
+# Measurement
+# =========================
+def _current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KiB on Linux, bytes on macOS (a high-water mark, not current RSS)
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageMeter:
+    """Context manager: wall time + RSS at entry / peak RSS of one stage, stdout silenced."""
+
+    def __init__(self, quiet: bool = True) -> None:
+        self.quiet = quiet
+        self.wall_s = 0.0
+        self.rss_start_mb: Optional[float] = None
+        self.peak_rss_mb: Optional[float] = None
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._redirect = None
+
+    def _sample(self) -> None:
+        rss = _current_rss_bytes()
+        if rss is not None and rss > self._peak:
+            self._peak = rss
+
+    def _run_sampler(self) -> None:
+        while not self._stop.wait(_RSS_SAMPLE_S):
+            self._sample()
+
+    def __enter__(self) -> "StageMeter":
+        start = _current_rss_bytes()
+        self.rss_start_mb = None if start is None else start / _MB
+        self._peak = start or 0
+        self._thread = threading.Thread(target=self._run_sampler, daemon=True)
+        self._thread.start()
+        if self.quiet:
+            self._redirect = contextlib.redirect_stdout(io.StringIO())
+            self._redirect.__enter__()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall_s = time.perf_counter() - self._t0
+        if self._redirect is not None:
+            self._redirect.__exit__(*exc)
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.peak_rss_mb = self._peak / _MB if self._peak else None
+
+    @property
+    def rss_delta_mb(self) -> Optional[float]:
+        """RSS growth of this stage alone (peak - RSS at entry)."""
+        if self.peak_rss_mb is None or self.rss_start_mb is None:
+            return None
+        return max(0.0, self.peak_rss_mb - self.rss_start_mb)
+
+
+def _stage_record(meter: StageMeter, units: int, unit: str, **detail) -> Dict:
+    rec = {
+        "wall_s": round(meter.wall_s, 4),
+        "peak_rss_mb": None if meter.peak_rss_mb is None else round(meter.peak_rss_mb, 1),
+        "rss_start_mb": None if meter.rss_start_mb is None else round(meter.rss_start_mb, 1),
+        "rss_delta_mb": None if meter.rss_delta_mb is None else round(meter.rss_delta_mb, 1),
+        "units": int(units),
+        "unit": unit,
+        "throughput": round(units / meter.wall_s, 2) if meter.wall_s > 0 else None,
+    }
+    if detail:
+        rec["detail"] = detail
+    return rec
+
+
+# =========================
+# Stages
+# =========================
+def _structure_stage(frames: Dict) -> Dict:
+    """BRANCH_PROFILE + ISO_Check_ sheets through the 101 runner's per-sheet step."""
+    profile = sbpp.process_branch_profile_sheet(frames["BRANCH_PROFILE"], BRANCH_NAME_OVERRIDES, DEP_LABELS)
+    out = {"BRANCH_PROFILE": profile}
+    for sheet, df in frames.items():
+        if sheet.startswith(STRUCT_SHEET_PREFIX):
+            out[sheet] = structure_runner._process_structure_sheet(df, sheet, profile)
+    return out
+
+
+def _uvl_build_stage(processed: Dict, scope_rules, uvl_dir: Path) -> int:
+    uvl_dir.mkdir(parents=True, exist_ok=True)
+    built = 0
+    for sheet, df in processed.items():
+        if not sheet.startswith(STRUCT_SHEET_PREFIX):
+            continue
+        ok = ub.build_uvl_from_frames(
+            df,
+            sheet,
+            str(uvl_dir / f"ISO_DATA_synthetic__{sheet}.uvl"),
+            UVL_NAMESPACE,
+            branch_profile=processed["BRANCH_PROFILE"],
+            scope_rules=scope_rules,
+            report_to_terminal=False,
+            force=True,
+        )
+        built += int(bool(ok))
+    return built
+
+
+def _logic_stage(kr_dirs: List[Path]) -> Dict[str, int]:
+    models = defects = 0
+    for kr_dir in kr_dirs:
+        for path in sorted(kr_dir.glob("*.kr.pl")):
+            analysis = analyze_kr_for_defects(load_kr_model(path), derive_model_key(path.name))
+            models += 1
+            defects += len(analysis.defects_filtered)
+    return {"models": models, "defects": defects}
+
+
+def _kr_and_logic(stages: Dict, clean_uvl: Path, work: Path, seed: int, quiet: bool) -> None:
+    inj_uvl = work / "uvl_injected"
+    with StageMeter(quiet) as m:
+        key = run_injection(str(clean_uvl), str(inj_uvl), seed=seed, write_key=False)
+    stages["injection"] = _stage_record(m, len(key), "files")
+
+    n_uvl = len(list(clean_uvl.glob("*.uvl"))) + len(list(inj_uvl.glob("*.uvl")))
+    kr_dirs = [work / "kr_clean", work / "kr_injected"]
+    with StageMeter(quiet) as m:
+        run_batch(str(clean_uvl), str(kr_dirs[0]), force=True)
+        run_batch(str(inj_uvl), str(kr_dirs[1]), force=True)
+    stages["uvl_to_kr"] = _stage_record(m, n_uvl, "files")
+
+    with StageMeter(quiet) as m:
+        res = _logic_stage(kr_dirs)
+    stages["logic_analysis"] = _stage_record(m, res["models"], "models", defects=res["defects"])
+
+
+def run_synthetic_workload(spec: SyntheticSpec, work: Path, quiet: bool = True) -> Dict:
+    frames = generate_iso_data(spec)  # setup, not timed
+    n_rows = sum(len(df) for name, df in frames.items() if name.startswith(STRUCT_SHEET_PREFIX))
+    stages: Dict[str, Dict] = {}
+
+    with StageMeter(quiet) as m:
+        processed = _structure_stage(frames)
+    stages["structure"] = _stage_record(m, n_rows, "rows")
+
+    uvl_dir = work / "uvl"
+    with StageMeter(quiet) as m:
+        n_models = _uvl_build_stage(processed, frames["SCOPE_RULES"], uvl_dir)
+    stages["uvl_build"] = _stage_record(m, n_rows, "rows", models=n_models)
+
+    _kr_and_logic(stages, uvl_dir, work, spec.seed, quiet)
+    return {"kind": "synthetic", "spec": asdict(spec), "stages": stages}
+
+
+def run_corpus_workload(clean_uvl: Path, work: Path, seed: int, quiet: bool = True) -> Dict:
+    stages: Dict[str, Dict] = {}
+    _kr_and_logic(stages, clean_uvl, work, seed, quiet)
+    return {"kind": "corpus", "source": str(clean_uvl), "stages": stages}
+
+
+def _best_of(runs: List[Dict]) -> Dict:
+    """Keeps the lowest wall time / peak RSS / RSS growth per stage over repeated runs."""
+    best = runs[0]
+    for other in runs[1:]:
+        for stage, rec in other["stages"].items():
+            cur = best["stages"][stage]
+            if rec["wall_s"] < cur["wall_s"]:
+                cur.update({k: rec[k] for k in ("wall_s", "throughput")})
+            for key in ("peak_rss_mb", "rss_delta_mb"):
+                if rec.get(key) is not None and (cur.get(key) is None or rec[key] < cur[key]):
+                    cur[key] = rec[key]
+    best["repeat"] = len(runs)
+    return best
+
+
+def _repeat(fn: Callable[[Path], Dict], repeat: int, work_root: Path, name: str) -> Dict:
+    runs = []
+    for i in range(max(1, repeat)):
+        work = work_root / f"{name}_{i}"
+        shutil.rmtree(work, ignore_errors=True)
+        work.mkdir(parents=True)
+        runs.append(fn(work))
+    return _best_of(runs)
+
+
+# =========================
+# History / baseline
+# =========================
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _load_json(path: Path, default):
+    if not path.exists():
+        return default
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def append_history(run: Dict, path: Path = HISTORY_PATH) -> None:
+    history = _load_json(path, {"runs": []})
+    history.setdefault("runs", []).append(run)
+    _write_json(path, history)
+
+
+def compare_to_baseline(
+    run: Dict,
+    baseline: Dict,
+    time_threshold: float = DEFAULT_TIME_THRESHOLD,
+    rss_threshold: float = DEFAULT_RSS_THRESHOLD,
+) -> List[Dict]:
+    """One row per (workload, stage, metric) present in both runs; 'regressed' marks failures."""
+    rows = []
+    for wl, cur_wl in run["workloads"].items():
+        base_wl = baseline.get("workloads", {}).get(wl)
+        if base_wl is None:
+            continue
+        for stage, cur in cur_wl["stages"].items():
+            base = base_wl["stages"].get(stage)
+            if base is None:
+                continue
+            for metric, thr, floor in (
+                ("wall_s", time_threshold, MIN_WALL_DELTA_S),
+                ("rss_delta_mb", rss_threshold, MIN_RSS_DELTA_MB),
+            ):
+                b, c = base.get(metric), cur.get(metric)
+                if b is None or c is None:
+                    continue
+                ratio = c / b if b > 0 else float("inf")
+                rows.append({
+                    "workload": wl,
+                    "stage": stage,
+                    "metric": metric,
+                    "baseline": b,
+                    "current": c,
+                    "ratio": round(ratio, 3),
+                    "regressed": ratio > 1.0 + thr and (c - b) > floor,
+                })
+    return rows
+
+
+def _print_run(run: Dict) -> None:
+    print(f"{'workload':<16} {'stage':<15} {'wall_s':>9} {'peak_MB':>9} {'delta_MB':>9} {'throughput':>14}")
+    print("-" * 78)
+    for wl, rec in run["workloads"].items():
+        for stage in STAGES:
+            s = rec["stages"].get(stage)
+            if s is None:
+                continue
+            tp = "-" if s["throughput"] is None else f"{s['throughput']:.1f} {s['unit']}/s"
+            peak = "-" if s["peak_rss_mb"] is None else f"{s['peak_rss_mb']:.1f}"
+            delta = "-" if s.get("rss_delta_mb") is None else f"{s['rss_delta_mb']:.1f}"
+            print(f"{wl:<16} {stage:<15} {s['wall_s']:>9.3f} {peak:>9} {delta:>9} {tp:>14}")
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="End-to-end pipeline benchmark with regression baselines")
+    ap.add_argument("--scales", type=float, nargs="*", default=[1, 2, 4],
+                    help="Synthetic workload sizes (SyntheticSpec.scaled factors; default: 1 2 4)")
+    ap.add_argument("--corpora", nargs="*", default=list(CORPORA), choices=list(CORPORA),
+                    help="Bundled UVL-MODULE corpora to run (default: all)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=1, help="Runs per workload; best wall/RSS figures are kept")
+    ap.add_argument("--history", type=Path, default=HISTORY_PATH)
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                    help="Allowed wall-time growth vs baseline (default: 0.25 = +25%%)")
+    ap.add_argument("--rss-threshold", type=float, default=DEFAULT_RSS_THRESHOLD,
+                    help="Allowed per-stage RSS growth vs baseline (default: 0.25)")
+    ap.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    ap.add_argument("--no-history", action="store_true", help="Do not append this run to the history")
+    ap.add_argument("--work-dir", type=Path, default=None, help="Keep stage outputs here (default: temp dir)")
+    ap.add_argument("--verbose", action="store_true", help="Show stage output")
+    return ap.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    quiet = not args.verbose
+
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "workloads": {},
+    }
+
+    tmp = None
+    if args.work_dir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="iso_bench_")
+        work_root = Path(tmp.name)
+    else:
+        work_root = args.work_dir
+    try:
+        for scale in args.scales:
+            name = f"synthetic_x{scale:g}"
+            spec = SyntheticSpec(seed=args.seed).scaled(scale)
+            print(f"⏱️  {name}: {spec.tag}")
+            run["workloads"][name] = _repeat(
+                lambda w: run_synthetic_workload(spec, w, quiet), args.repeat, work_root, name
+            )
+        for corpus in args.corpora:
+            name = f"corpus_{corpus}"
+            if not CORPORA[corpus].exists():
+                print(f"⚠️  {name}: {CORPORA[corpus]} not found, skipped")
+                continue
+            print(f"⏱️  {name}: {CORPORA[corpus]}")
+            run["workloads"][name] = _repeat(
+                lambda w: run_corpus_workload(CORPORA[corpus], w, args.seed, quiet), args.repeat, work_root, name
+            )
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    print()
+    _print_run(run)
+
+    if not args.no_history:
+        append_history(run, args.history)
+        print(f"\n📄 History: {args.history}")
+
+    baseline = _load_json(args.baseline, None)
+    regressions = []
+    if baseline is None:
+        print(f"ℹ️  No baseline at {args.baseline} (store one with --update-baseline)")
+    else:
+        rows = compare_to_baseline(run, baseline, args.threshold, args.rss_threshold)
+        regressions = [r for r in rows if r["regressed"]]
+        print(f"📏 Baseline {baseline.get('commit')} @ {baseline.get('timestamp')}: "
+              f"{len(rows)} comparisons, {len(regressions)} regressions")
+        for r in regressions:
+            print(f"❌ {r['workload']}/{r['stage']} {r['metric']}: "
+                  f"{r['baseline']} -> {r['current']} (x{r['ratio']})")
+
+    if args.update_baseline:
+        _write_json(args.baseline, run)
+        print(f"✅ Baseline stored: {args.baseline}")
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,537 @@
+# benchmark_code/synthetic_iso_data.py
+# ============================================================
+# Synthetic ISO_DATA workbooks — deterministic, scalable test data
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Builds the RAW sheets the runners read, with the exact column names
+#   of the production export:
+#     BRANCH_PROFILE, SCOPE_RULES, users       (master sheets)
+#     ISO_Check_category<n>                    (structure, 101 runner)
+#     visit_result<n>                          (results, 202 runner)
+# - Every size knob lives in SyntheticSpec (categories, items per
+#   category, answers per item, branches, plans, scope rules, visits).
+#   spec.scaled(k) grows the workload k-fold for scaling runs.
+# - One random.Random(seed) drives everything, so the same spec always
+#   yields byte-identical frames (frames_digest() checks that).
+# - The data deliberately carries the noise the pipeline cleans up:
+#   branch names from BRANCH_NAME_OVERRIDES / DEP_LABELS, the misspelled
+#   category from CATEGORY_SPELLING_MAP, Arabic quarter plans, blank
+#   item names / answers, failed items without a corrective action.
+# - visit_result<n> rows reuse the item / answer ids of
+#   ISO_Check_category<n>, so results match their structure sheet.
+# - Output: one ISO_DATA_synthetic_*.xlsx (single ExcelWriter) and/or a
+#   directory of <sheet>.parquet files plus spec.json.
+# ============================================================
+
+from __future__ import annotations
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import pandas as pd
+
+# project root (python/) for canonical_code / config / pipeline_store
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from canonical_code.canonicalization import normalize_text, to_uvl_code  # noqa: E402
+from config.domain_config import (  # noqa: E402
+    BRANCH_NAME_OVERRIDES,
+    CATEGORY_SPELLING_MAP,
+    DEP_LABELS,
+    VISIT_RESULT_STATUS_MAP,
+    VISIT_STATUS_MAP,
+)
+
+FILE_PREFIX = "ISO_DATA"
+STRUCT_SHEET_PREFIX = "ISO_Check_category"
+RESULT_SHEET_PREFIX = "visit_result"
+MASTER_SHEETS = ("BRANCH_PROFILE", "SCOPE_RULES", "users")
+
+STRUCTURE_COLUMNS = [
+    "BRANCH_ID", "BRANCH_NAME", "CHECK_CATEGORY_ID", "CHECK_CATEGORY_NAME", "ISSUE_NUMBER",
+    "CHECK_ITEM_ID", "CHECK_ITEM_NAME", "LAB_SECTION_ID", "CHOICE_ID", "CHOICE_VALUE_OPTION_ID",
+    "CHOICE_VALUE_OPTION_NAME", "GENERAL_SCORE", "CATEGORY_MIN_ACCEPTABLE_SCORE",
+    "WEIGHT_PERCENTAGE", "CI_MIN_ACCEPTABLE_SCORE", "OPTION_VALUE", "AUDIT_TYPE", "AUDIT_PLAN",
+    "VISIT_RESULT_SCORE_STATUS_CODE",  # exported as-is; read by results_matcher
+]
+
+RESULT_COLUMNS = [
+    "VISIT_ID", "VISIT_RESULT_ID", "VISIT_DATE", "DATE_VISIT_ENTRY", "DATE_VISIT_APPROVED",
+    "BRANCH_ID", "BRANCH_NAME", "LAB_SECTION_ID", "AUDITOR", "AUDITEE", "AUDIT_TYPE", "AUDIT_PLAN",
+    "CATEGORY_ID", "CHECK_CATEGORY_NAME", "ISSUE_NUMBER", "CHECK_ITEM_ID", "CHECK_ITEM_NAME",
+    "ITEM_CLASSIFICATION_NAME", "CHOICE_ID", "CHOICE_VALUE_OPTION_ID", "CHOICE_VALUE_OPTION_NAME",
+    "CHOICE_VALUE_CODE", "CATEGORY_GENERAL_SCORE", "CATEGORY_MIN_ACC_SCORE", "WEIGHT_PERCENTAGE",
+    "C_ITEM_MIN_ACC_SCORE", "OPTION_VALUE", "ITEM_SCORE", "ITEM_SCORE_STATUS",
+    "CATEGORY_WEIGHT_SUM", "CATEGORY_OVERALL_SCORE", "CATEGORY_OVERALL_SCORE_STATUS",
+    "V_RESULT_MIN_ACC_SCORE", "OVERALL_VISIT_RESULT_SCORE", "VISIT_TOTAL_STATUS",
+    "VISIT_STATUS", "VISIT_RESULT_STATUS", "VISIT_RESULT_NOTES",
+    "NC_RESPONSIBLE_PERSON", "NC_EXPECTED_COMPLETION_DATE", "NC_ROOT_CAUSE",
+    "NC_PREVENTIVE_ACTION", "NC_CORRECTIVE_ACTION", "NC_FOLLOW_UP_EFFECTIVENESS",
+]
+
+# Raw answer labels and their OPTION_VALUE (None = not scored)
+ANSWER_POOL = [("Yes", 1.0), ("No", 0.0), ("N/A", None), ("Partially", 0.5), ("Not observed", 0.0)]
+
+# Raw AUDIT_PLAN texts, one per AUDIT_PLAN_RULES family (structure_audit_plan_pandas.py)
+PLAN_POOL = [
+    "الربع الأول",
+    "الربع الثاني",
+    "الربع الثالث",
+    "الربع الرابع",
+    "ISO 15189 clause compliance audit",
+    "تجديد شهادة الايزو",
+    "LIS formula verification",
+    "متابعة الملاحظات",
+    "Mass balance calibration renewal",
+    "Standard thermometer certificate renewal",
+]
+
+AUDIT_TYPES = [("Planned", 0.7), ("Unplanned", 0.2), ("Re Evaluate", 0.1)]
+
+CATEGORY_TOPICS = [
+    "Sample reception", "Refrigerator temperature monitoring", "Hematology analyzers",
+    "Biochemistry quality control", "Microbiology culture handling", "Document control",
+    "Personnel competency", "Waste management", "Safety and first aid", "Pathology archives",
+]
+ITEM_VERBS = ["Check", "Verify", "Review", "Confirm", "Inspect"]
+ITEM_OBJECTS = [
+    "calibration records", "fridge log", "reagent expiry", "IQC chart", "staff training file",
+    "maintenance sheet", "spill kit", "label printer", "sample rejection log", "SOP version",
+]
+ITEM_CLASSIFICATIONS = ["Major", "Minor", "Critical", "Observation"]
+SCOPE_FLAGS = ["iso_active", "micro_active", "path_active"]
+SCOPE_ACTIONS = [("require", 0.45), ("forbid", 0.35), ("allow", 0.2)]
+
+BASE_DATE = datetime(2025, 1, 1, 8, 0, 0)
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """Size knobs of one synthetic workbook; every field feeds the generator."""
+
+    seed: int = 42
+    n_structure_sheets: int = 2
+    n_categories: int = 6            # per structure sheet
+    items_per_category: int = 8
+    answers_per_item: int = 3
+    n_branches: int = 12
+    n_plans: int = 6
+    n_scope_rules: int = 6
+    n_auditors: int = 8
+    visits_per_sheet: int = 20
+    categories_per_visit: int = 2
+    missing_rate: float = 0.05       # blank item names / answers
+
+    def scaled(self, factor: float) -> "SyntheticSpec":
+        """Grows categories, items, branches, plans, rules and visits by `factor`."""
+        def grow(n: int) -> int:
+            return max(1, int(math.ceil(n * factor)))
+
+        return replace(
+            self,
+            n_categories=grow(self.n_categories),
+            items_per_category=grow(self.items_per_category),
+            n_branches=grow(self.n_branches),
+            n_plans=grow(self.n_plans),
+            n_scope_rules=grow(self.n_scope_rules),
+            n_auditors=grow(self.n_auditors),
+            visits_per_sheet=grow(self.visits_per_sheet),
+        )
+
+    @property
+    def tag(self) -> str:
+        return (
+            f"s{self.seed}_c{self.n_structure_sheets}x{self.n_categories}"
+            f"_i{self.items_per_category}_v{self.visits_per_sheet}"
+        )
+
+
+def _weighted(rng: random.Random, pairs: List[tuple]) -> str:
+    return rng.choices([p[0] for p in pairs], weights=[p[1] for p in pairs], k=1)[0]
+
+
+def _split_weights(rng: random.Random, n: int) -> List[float]:
+    """Item weights of one category: positive, two decimals, summing to 100."""
+    raw = [rng.randint(1, 9) for _ in range(n)]
+    total = sum(raw)
+    weights = [round(100.0 * r / total, 2) for r in raw]
+    weights[-1] = round(100.0 - sum(weights[:-1]), 2)
+    return weights
+
+
+# =========================
+# Master sheets
+# =========================
+def _branch_pool(spec: SyntheticSpec) -> List[tuple]:
+    """(BRANCH_ID, BRANCH_NAME) pairs; the first half exercises the override / DEP tables."""
+    specials = list(BRANCH_NAME_OVERRIDES) + sorted(DEP_LABELS - set(BRANCH_NAME_OVERRIDES))
+    n_special = min(len(specials), spec.n_branches // 2)
+    names = specials[:n_special] + [f"Branch {k:03d}" for k in range(1, spec.n_branches - n_special + 1)]
+    return [(100 + k, name) for k, name in enumerate(names)]
+
+
+def build_branch_profile(spec: SyntheticSpec, rng: random.Random, branches: List[tuple]) -> pd.DataFrame:
+    rows = []
+    for bid, name in branches:
+        rows.append({
+            "BRANCH_ID": bid,
+            "BRANCH_NAME": name,
+            "iso_active": 1 if rng.random() < 0.9 else 0,
+            "micro_active": 1 if rng.random() < 0.5 else 0,
+            "path_active": 1 if rng.random() < 0.3 else 0,
+            "notes": None,
+        })
+    return pd.DataFrame(rows, columns=["BRANCH_ID", "BRANCH_NAME", "iso_active", "micro_active", "path_active", "notes"])
+
+
+def build_scope_rules(spec: SyntheticSpec, rng: random.Random, category_names: List[str]) -> pd.DataFrame:
+    codes = sorted({to_uvl_code(normalize_text(CATEGORY_SPELLING_MAP.get(n, n))) for n in category_names})
+    rows = []
+    for k in range(spec.n_scope_rules):
+        rows.append({
+            "RULE_ID": k + 1,
+            "CAPABILITY_FLAG": SCOPE_FLAGS[k % len(SCOPE_FLAGS)],
+            "TARGET_CODE": rng.choice(codes),
+            "TARGET_TYPE": "category",
+            "ACTION": _weighted(rng, SCOPE_ACTIONS),
+        })
+    return pd.DataFrame(rows, columns=["RULE_ID", "CAPABILITY_FLAG", "TARGET_CODE", "TARGET_TYPE", "ACTION"])
+
+
+def build_users(spec: SyntheticSpec, rng: random.Random) -> pd.DataFrame:
+    rows = []
+    n_staff = spec.n_auditors + max(1, spec.n_auditors // 4)
+    for k in range(n_staff):
+        is_auditor = 1 if k < spec.n_auditors else 0
+        rows.append({
+            "ID": 5000 + k,
+            "FULL_NAME_EN": f"{'Auditor' if is_auditor else 'Staff'} {k + 1:03d}",
+            "is_auditor": is_auditor,
+            "iso_auditor": 1 if is_auditor and rng.random() < 0.8 else 0,
+            "micro_auditor": 1 if is_auditor and rng.random() < 0.4 else 0,
+            "path_auditor": 1 if is_auditor and rng.random() < 0.3 else 0,
+            "senior_auditor": 1 if is_auditor and rng.random() < 0.2 else 0,
+            "notes": None,
+        })
+    return pd.DataFrame(rows, columns=[
+        "ID", "FULL_NAME_EN", "is_auditor", "iso_auditor", "micro_auditor", "path_auditor", "senior_auditor", "notes",
+    ])
+
+
+# =========================
+# Structure sheets
+# =========================
+def _category_catalog(spec: SyntheticSpec, rng: random.Random, sheet_no: int) -> List[dict]:
+    """Categories of one structure sheet with their items and answers (shared with the results)."""
+    cats = []
+    item_id = sheet_no * 1_000_000
+    for c in range(spec.n_categories):
+        cat_id = sheet_no * 1000 + c + 1
+        topic = CATEGORY_TOPICS[c % len(CATEGORY_TOPICS)]
+        name = f"{topic} {sheet_no}-{c + 1:03d}"
+        if sheet_no == 1 and c == spec.n_categories - 1:
+            name = next(iter(CATEGORY_SPELLING_MAP))  # misspelled on purpose
+        weights = _split_weights(rng, spec.items_per_category)
+        items = []
+        for i in range(spec.items_per_category):
+            item_id += 1
+            item_name = None
+            if rng.random() >= spec.missing_rate:
+                item_name = f"{rng.choice(ITEM_VERBS)} {rng.choice(ITEM_OBJECTS)} #{i + 1}?"
+            answers = []
+            for a in range(spec.answers_per_item):
+                label, value = ANSWER_POOL[a] if a < len(ANSWER_POOL) else (f"Option {a + 1}", 0.0)
+                if rng.random() < spec.missing_rate:
+                    label = None
+                answers.append({"choice_id": item_id * 10 + a, "option_id": a + 1, "label": label, "value": value})
+            items.append({
+                "item_id": item_id,
+                "name": item_name,
+                "weight": weights[i],
+                "min_score": round(weights[i] * 0.5, 2),
+                "classification": rng.choice(ITEM_CLASSIFICATIONS),
+                "answers": answers,
+                # auditors mostly record the first ("Yes") answer
+                "answer_weights": [6] + [1] * (len(answers) - 1),
+            })
+        general = round(sum(weights), 2)
+        cats.append({
+            "cat_id": cat_id,
+            "name": name,
+            "issue": 1 + rng.randrange(3),
+            "lab_section": 10 + c % 5,
+            "general_score": general,
+            "min_score": round(general * 0.8, 2),
+            "items": items,
+        })
+    return cats
+
+
+def _audit_type_and_plan(rng: random.Random, plans: List[str]) -> tuple:
+    audit_type = _weighted(rng, AUDIT_TYPES)
+    if audit_type == "Planned" or rng.random() < 0.3:
+        return audit_type, rng.choice(plans)
+    return audit_type, None
+
+
+def _answer_status(item: dict, ans: dict) -> str:
+    if ans["value"] is None:
+        return "pass"
+    return "pass" if item["weight"] * ans["value"] >= item["min_score"] else "fail"
+
+
+def build_structure_sheet(
+    spec: SyntheticSpec, rng: random.Random, catalog: List[dict], branches: List[tuple], plans: List[str]
+) -> pd.DataFrame:
+    cols: Dict[str, list] = {c: [] for c in STRUCTURE_COLUMNS}
+    for cat in catalog:
+        for item in cat["items"]:
+            for ans in item["answers"]:
+                bid, bname = rng.choice(branches)
+                audit_type, plan = _audit_type_and_plan(rng, plans)
+                row = (
+                    bid, bname, cat["cat_id"], cat["name"], cat["issue"],
+                    item["item_id"], item["name"], cat["lab_section"], ans["choice_id"], ans["option_id"],
+                    ans["label"], cat["general_score"], cat["min_score"],
+                    item["weight"], item["min_score"], ans["value"], audit_type, plan,
+                    _answer_status(item, ans),
+                )
+                for c, v in zip(STRUCTURE_COLUMNS, row):
+                    cols[c].append(v)
+    return pd.DataFrame(cols, columns=STRUCTURE_COLUMNS)
+
+
+# =========================
+# Result sheets
+# =========================
+def _status_label(slug_key: str) -> str:
+    """Raw export text whose to_uvl_code() slug is `slug_key` (e.g. 'in_progress' -> 'In progress')."""
+    return slug_key.replace("_", " ").capitalize()
+
+
+def _notes_text(rng: random.Random, failed: int) -> Optional[str]:
+    if rng.random() < 0.4:
+        return None
+    parts = [f"ملاحظات: visit note {rng.randint(1, 999)}"]
+    if rng.random() < 0.5:
+        parts.append(f"ملاحظات تطويرية: improvement {rng.randint(1, 99)}")
+    if failed:
+        parts.append(f"بنود عدم المطابقة: {failed} items")
+    return "\n".join(parts)
+
+
+def build_result_sheet(
+    spec: SyntheticSpec,
+    rng: random.Random,
+    catalog: List[dict],
+    branches: List[tuple],
+    plans: List[str],
+    auditors: List[str],
+    first_visit_id: int,
+    first_result_id: int,
+) -> pd.DataFrame:
+    cols: Dict[str, list] = {c: [] for c in RESULT_COLUMNS}
+    visit_statuses = [_status_label(k) for k in VISIT_STATUS_MAP]
+    result_statuses = [_status_label(k) for k in VISIT_RESULT_STATUS_MAP]
+    result_id = first_result_id
+    n_cats = min(spec.categories_per_visit, len(catalog))
+
+    for v in range(spec.visits_per_sheet):
+        visit_id = first_visit_id + v
+        bid, bname = rng.choice(branches)
+        audit_type, plan = _audit_type_and_plan(rng, plans)
+        visit_date = BASE_DATE + timedelta(days=rng.randrange(365), minutes=rng.randrange(600))
+        entry_date = visit_date + timedelta(days=rng.randrange(4))
+        approved_date = entry_date + timedelta(days=rng.randrange(11)) if rng.random() < 0.8 else None
+        auditor = rng.choice(auditors)
+        auditee = f"Lab supervisor {rng.randint(1, 50)}"
+        visit_status = rng.choice(visit_statuses)
+        result_status = rng.choice(result_statuses)
+
+        visit_rows = []
+        cat_scores = []
+        for cat in rng.sample(catalog, n_cats):
+            cat_rows = []
+            for item in cat["items"]:
+                ans = rng.choices(item["answers"], weights=item["answer_weights"], k=1)[0]
+                value = ans["value"]
+                score = round(item["weight"] * value, 2) if value is not None else None
+                passed = _answer_status(item, ans) == "pass"
+                cat_rows.append((cat, item, ans, score, passed))
+            # not-applicable answers (no score) count at full weight
+            cat_score = round(sum(r[1]["weight"] if r[3] is None else r[3] for r in cat_rows), 2)
+            weight_sum = round(sum(r[1]["weight"] for r in cat_rows), 2)
+            cat_status = "Passed" if cat_score >= cat["min_score"] else "Failed"
+            cat_scores.append(cat_score)
+            visit_rows.extend((r, cat_score, weight_sum, cat_status) for r in cat_rows)
+
+        overall = round(sum(cat_scores) / n_cats, 2)
+        v_min = 80.0
+        total_status = "Passed" if overall >= v_min else "Failed"
+        failed = sum(1 for x in visit_rows if not x[0][4])
+        notes = _notes_text(rng, failed)
+
+        for (cat, item, ans, score, passed), cat_score, weight_sum, cat_status in visit_rows:
+            result_id += 1
+            nc = [None] * 6
+            if not passed:
+                nc = [
+                    auditee,
+                    entry_date + timedelta(days=14),
+                    f"root cause {rng.randint(1, 20)}",
+                    f"preventive action {rng.randint(1, 20)}",
+                    f"corrective action {rng.randint(1, 20)}" if rng.random() < 0.85 else None,
+                    "effective" if rng.random() < 0.6 else None,
+                ]
+            row = [
+                visit_id, result_id, visit_date, entry_date, approved_date,
+                bid, bname, cat["lab_section"], auditor, auditee, audit_type, plan,
+                cat["cat_id"], cat["name"], cat["issue"], item["item_id"], item["name"],
+                item["classification"], ans["choice_id"], ans["option_id"], ans["label"],
+                "PASS" if passed else "FAIL", cat["general_score"], cat["min_score"], item["weight"],
+                item["min_score"], ans["value"], score, "Pass" if passed else "Fail",
+                weight_sum, cat_score, cat_status,
+                v_min, overall, total_status,
+                visit_status, result_status, notes,
+                *nc,
+            ]
+            for c, v in zip(RESULT_COLUMNS, row):
+                cols[c].append(v)
+    return pd.DataFrame(cols, columns=RESULT_COLUMNS)
+
+
+# =========================
+# Workbook assembly
+# =========================
+def generate_iso_data(spec: SyntheticSpec) -> Dict[str, pd.DataFrame]:
+    """All raw sheets of one synthetic ISO_DATA workbook, in workbook order."""
+    rng = random.Random(spec.seed)
+    branches = _branch_pool(spec)
+    plans = [PLAN_POOL[k] if k < len(PLAN_POOL) else f"Special audit plan {k + 1}" for k in range(spec.n_plans)]
+
+    catalogs = [_category_catalog(spec, rng, s) for s in range(1, spec.n_structure_sheets + 1)]
+    all_category_names = [cat["name"] for catalog in catalogs for cat in catalog]
+
+    users = build_users(spec, rng)
+    auditors = users.loc[users["is_auditor"] == 1, "FULL_NAME_EN"].tolist()
+
+    frames: Dict[str, pd.DataFrame] = {
+        "BRANCH_PROFILE": build_branch_profile(spec, rng, branches),
+        "SCOPE_RULES": build_scope_rules(spec, rng, all_category_names),
+        "users": users,
+    }
+    for s, catalog in enumerate(catalogs, start=1):
+        frames[f"{STRUCT_SHEET_PREFIX}{s}"] = build_structure_sheet(spec, rng, catalog, branches, plans)
+
+    next_visit, next_result = 1, 0
+    for s, catalog in enumerate(catalogs, start=1):
+        df = build_result_sheet(spec, rng, catalog, branches, plans, auditors, next_visit, next_result)
+        frames[f"{RESULT_SHEET_PREFIX}{s}"] = df
+        next_visit += spec.visits_per_sheet
+        next_result += len(df)
+    return frames
+
+
+def frames_digest(frames: Dict[str, pd.DataFrame]) -> str:
+    """SHA-256 over sheet names, columns and cell values (determinism check)."""
+    h = hashlib.sha256()
+    for name, df in frames.items():
+        h.update(name.encode("utf-8"))
+        h.update(",".join(map(str, df.columns)).encode("utf-8"))
+        h.update(str(len(df)).encode("utf-8"))
+        if len(df):
+            h.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def default_workbook_name(spec: SyntheticSpec) -> str:
+    return f"{FILE_PREFIX}_synthetic_{spec.tag}.xlsx"
+
+
+def write_workbook(frames: Dict[str, pd.DataFrame], out_path: str | Path) -> Path:
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        for sheet_name, df in frames.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return out_path
+
+
+def write_parquet_dir(frames: Dict[str, pd.DataFrame], out_dir: str | Path, spec: SyntheticSpec) -> Path:
+    """<out_dir>/<sheet>.parquet per sheet + spec.json (spec, digest, row counts)."""
+    from pipeline_store.columnar_store import to_arrow_safe
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for sheet_name, df in frames.items():
+        to_arrow_safe(df).to_parquet(out_dir / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', sheet_name)}.parquet", index=False)
+    meta = {
+        "spec": asdict(spec),
+        "digest": frames_digest(frames),
+        "rows": {name: int(len(df)) for name, df in frames.items()},
+    }
+    (out_dir / "spec.json").write_text(json.dumps(meta, indent=1, ensure_ascii=False), encoding="utf-8")
+    return out_dir
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    d = SyntheticSpec()
+    ap = argparse.ArgumentParser(description="Generate a deterministic synthetic ISO_DATA workbook")
+    ap.add_argument("--out-dir", default=".", help="Output folder (default: current folder)")
+    ap.add_argument("--format", choices=["xlsx", "parquet", "both"], default="xlsx")
+    ap.add_argument("--seed", type=int, default=d.seed)
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply every size knob below (default: 1)")
+    ap.add_argument("--sheets", type=int, default=d.n_structure_sheets, help="Structure/result sheet pairs")
+    ap.add_argument("--categories", type=int, default=d.n_categories, help="Categories per structure sheet")
+    ap.add_argument("--items", type=int, default=d.items_per_category, help="Items per category")
+    ap.add_argument("--answers", type=int, default=d.answers_per_item, help="Answers per item")
+    ap.add_argument("--branches", type=int, default=d.n_branches)
+    ap.add_argument("--plans", type=int, default=d.n_plans)
+    ap.add_argument("--scope-rules", type=int, default=d.n_scope_rules)
+    ap.add_argument("--auditors", type=int, default=d.n_auditors)
+    ap.add_argument("--visits", type=int, default=d.visits_per_sheet, help="Visits per result sheet")
+    ap.add_argument("--categories-per-visit", type=int, default=d.categories_per_visit)
+    ap.add_argument("--missing-rate", type=float, default=d.missing_rate)
+    return ap.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    spec = SyntheticSpec(
+        seed=args.seed,
+        n_structure_sheets=args.sheets,
+        n_categories=args.categories,
+        items_per_category=args.items,
+        answers_per_item=args.answers,
+        n_branches=args.branches,
+        n_plans=args.plans,
+        n_scope_rules=args.scope_rules,
+        n_auditors=args.auditors,
+        visits_per_sheet=args.visits,
+        categories_per_visit=args.categories_per_visit,
+        missing_rate=args.missing_rate,
+    )
+    if args.scale != 1.0:
+        spec = spec.scaled(args.scale)
+
+    frames = generate_iso_data(spec)
+    out_dir = Path(args.out_dir)
+    print(f"Synthetic ISO_DATA {spec.tag}: " + ", ".join(f"{k}={len(v)}" for k, v in frames.items()))
+    if args.format in ("xlsx", "both"):
+        print(f"✅ Workbook: {write_workbook(frames, out_dir / default_workbook_name(spec))}")
+    if args.format in ("parquet", "both"):
+        print(f"✅ Parquet: {write_parquet_dir(frames, out_dir / default_workbook_name(spec).replace('.xlsx', '.parquet'), spec)}")
+    print(f"   digest={frames_digest(frames)}")
+
+
+if __name__ == "__main__":
+    main()
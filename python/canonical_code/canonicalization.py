@@ -0,0 +1,368 @@
+# canonical_code/canonicalization.py
+# ============================================================
+# CANONICALIZATION CORE (Shared by Structure + Results)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Single implementation of the text / slug / ID / flag normalization
+#   used by structurecode and result_code. Both core utility modules
+#   re-export from here, so Structure and Results cannot drift apart.
+# - Slugs, ID tokens and flags are memoized in bounded LRU caches.
+# - The slug cache can be persisted to disk (JSON), so a Results run can
+#   reuse the slugs computed while processing the Structure sheets.
+#   Worker processes (--jobs) mark their cache after loading it and hand
+#   the slugs they compute back to the parent, which merges them before
+#   saving.
+#
+# CACHE KEYS:
+# - Slugs and flags depend only on str(val) once NA is ruled out, so they
+#   are keyed by that string (1 and 1.0 never share an entry).
+# - ID tokens depend on the value type (int/float vs text), so they are
+#   keyed by (type, value).
+# ============================================================
+
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+import json
+import os
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Standard missing tokens shared across the entire project
+_MISSING_TOKENS = {"", "nan", "none", "null", "na", "n/a", "-", "--", "?"}
+
+# Bump when the slug algorithm changes: older on-disk caches are ignored.
+# v2: caches written under pandas 3 could hold NaN instead of None for empty slugs.
+CANON_VERSION = 2
+DEFAULT_CACHE_MAXSIZE = 65536
+
+_MISS = object()
+
+
+class BoundedCache:
+    """Small LRU map (OrderedDict) whose contents can be dumped to disk."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_MAXSIZE) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = _MISS) -> Any:
+        try:
+            val = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return val
+
+    def put(self, key: Hashable, val: Any) -> None:
+        self._data[key] = val
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def items(self):
+        return list(self._data.items())
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_SLUG_CACHE = BoundedCache()
+_ID_TOKEN_CACHE = BoundedCache()
+_FLAG_CACHE = BoundedCache()
+
+
+def _is_na(val: Any) -> bool:
+    if val is None:
+        return True
+    try:
+        return bool(pd.isna(val))
+    except Exception:
+        return False
+
+
+# ============================================================
+# Scalar reference implementation
+# ============================================================
+
+def normalize_text(val: Any) -> str:
+    if _is_na(val):
+        return ""
+    s = str(val).strip()
+    s = unicodedata.normalize('NFKC', s)
+    if not s:
+        return ""
+    s = re.sub(r"\s+", " ", s)
+    return s
+
+def is_missing_like(val: Any) -> bool:
+    if _is_na(val):
+        return True
+    s = normalize_text(val)
+    if not s:
+        return True
+    return s.strip().lower() in _MISSING_TOKENS
+
+def _compute_uvl_code(txt: str) -> Optional[str]:
+    if is_missing_like(txt):
+        return None
+    s = normalize_text(txt)
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = s.lower()
+    s = re.sub(r"[^a-z0-9_]+", "_", s)
+    s = re.sub(r"_+", "_", s).strip("_")
+    if not s:
+        return None
+    if not re.match(r"^[a-z_]", s):
+        s = f"_{s}"
+    return s
+
+def to_uvl_code(val: Any) -> Optional[str]:
+    if _is_na(val):
+        return None
+    txt = str(val)
+    slug = _SLUG_CACHE.get(txt)
+    if slug is _MISS:
+        slug = _compute_uvl_code(txt)
+        _SLUG_CACHE.put(txt, slug)
+    return slug
+
+def _compute_id_token(val: Any) -> Optional[str]:
+    s = str(val).strip()
+    if s.lower() in _MISSING_TOKENS:
+        return None
+    if isinstance(val, (int, float)):
+        f_val = float(val)
+        if f_val.is_integer():
+            return str(int(f_val))
+        return s.rstrip("0").rstrip(".")
+    try:
+        f = float(s)
+        if f.is_integer():
+            return str(int(f))
+        return str(f).rstrip("0").rstrip(".")
+    except Exception:
+        return s
+
+def normalize_id_token(val: Any) -> Optional[str]:
+    if _is_na(val):
+        return None
+    try:
+        key = (type(val), val)
+        tok = _ID_TOKEN_CACHE.get(key)
+    except TypeError:
+        return _compute_id_token(val)
+    if tok is _MISS:
+        tok = _compute_id_token(val)
+        _ID_TOKEN_CACHE.put(key, tok)
+    return tok
+
+def _compute_flag01(txt: str) -> int:
+    if is_missing_like(txt):
+        return 0
+    s = txt.strip().lower()
+    if s in {'1', '1.0', 'true', 'active', 'yes', 'y', 'enabled'}:
+        return 1
+    return 0
+
+def normalize_flag01(val: Any) -> int:
+    """
+    تحويل قيم الأعلام (iso_active, micro_active, etc) إلى 0 أو 1 حصراً.
+    تتعامل مع المدخلات: 'Active', 1, 1.0, 'Yes', '1' -> تعيد 1
+    تتعامل مع: NaN, 'No', 0, 'Inactive' -> تعيد 0
+    """
+    if _is_na(val):
+        return 0
+    txt = str(val)
+    flag = _FLAG_CACHE.get(txt)
+    if flag is _MISS:
+        flag = _compute_flag01(txt)
+        _FLAG_CACHE.put(txt, flag)
+    return flag
+
+
+# ============================================================
+# Vectorized (Series) layer
+# ------------------------------------------------------------
+# Column-level twins of normalize_text / is_missing_like / to_uvl_code.
+# Every non-missing cell is cast with str() exactly like the scalar path,
+# the distinct strings are factorized, and the NFKC/NFKD/regex work runs
+# once per distinct value before being broadcast back by position.
+# ============================================================
+
+def _broadcast_distinct(
+    series: pd.Series,
+    fn: Callable[[pd.Series], pd.Series],
+    na_value: Any,
+) -> np.ndarray:
+    values = series.to_numpy(dtype=object)
+    out = np.full(len(values), na_value, dtype=object)
+    if not len(values):
+        return out
+    na_mask = pd.isna(values)
+    present = np.flatnonzero(~na_mask)
+    if not len(present):
+        return out
+    txt = np.array([str(v) for v in values[present]], dtype=object)
+    codes, uniques = pd.factorize(txt)
+    mapped = fn(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    out[present] = mapped[codes]
+    return out
+
+def _normalize_distinct(s: pd.Series) -> pd.Series:
+    s = s.str.strip().str.normalize("NFKC")
+    return s.str.replace(r"\s+", " ", regex=True)
+
+def _missing_distinct(norm: pd.Series) -> pd.Series:
+    return norm.eq("") | norm.str.strip().str.lower().isin(_MISSING_TOKENS)
+
+def _strip_combining(s: str) -> str:
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+def _slug_distinct(s: pd.Series) -> pd.Series:
+    norm = _normalize_distinct(s)
+    missing = _missing_distinct(norm)
+    slug = norm.str.normalize("NFKD").map(_strip_combining).str.lower()
+    slug = slug.str.replace(r"[^a-z0-9_]+", "_", regex=True)
+    slug = slug.str.replace(r"_+", "_", regex=True).str.strip("_")
+    needs_prefix = ~slug.str.match(r"^[a-z_]") & slug.ne("")
+    slug = slug.where(~needs_prefix, "_" + slug)
+    # object first: map() infers a str dtype under pandas 3, where where() puts NaN, not None
+    return slug.astype(object).where(~missing & slug.ne(""), None)
+
+def _slug_distinct_cached(s: pd.Series) -> pd.Series:
+    found = [_SLUG_CACHE.get(t) for t in s]
+    todo = [i for i, v in enumerate(found) if v is _MISS]
+    if todo:
+        fresh = _slug_distinct(s.iloc[todo])
+        for i, slug in zip(todo, fresh):
+            found[i] = slug
+            _SLUG_CACHE.put(s.iat[i], slug)
+    return pd.Series(found, index=s.index, dtype=object)
+
+def normalize_text_series(series: pd.Series) -> pd.Series:
+    out = _broadcast_distinct(series, _normalize_distinct, "")
+    return pd.Series(out, index=series.index, dtype=object)
+
+def is_missing_like_series(series: pd.Series) -> pd.Series:
+    out = _broadcast_distinct(series, lambda s: _missing_distinct(_normalize_distinct(s)), True)
+    return pd.Series(out.astype(bool), index=series.index)
+
+def is_present_series(series: pd.Series) -> pd.Series:
+    """Vectorized `bool(token)` for token columns (None / NaN / "" are absent)."""
+    return series.notna() & series.ne("")
+
+def clean_text_series(series: pd.Series) -> pd.Series:
+    """Vectorized `None if is_missing_like(x) else normalize_text(x).strip() or None`."""
+    def _clean(s: pd.Series) -> pd.Series:
+        norm = _normalize_distinct(s)
+        txt = norm.str.strip()
+        return txt.astype(object).where(~_missing_distinct(norm) & txt.ne(""), None)
+    out = _broadcast_distinct(series, _clean, None)
+    return pd.Series(out, index=series.index, dtype=object)
+
+def to_uvl_code_series(series: pd.Series) -> pd.Series:
+    out = _broadcast_distinct(series, _slug_distinct_cached, None)
+    return pd.Series(out, index=series.index, dtype=object)
+
+def map_distinct(series: pd.Series, fn: Callable[[Any], Any]) -> pd.Series:
+    """
+    Dedup-then-map for scalar rules that have no string-method equivalent
+    (regex rule tables, override dicts). Intended for already-cleaned text
+    columns: values are keyed by equality, so 1 and 1.0 share one call.
+    Missing cells are passed to fn as None.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    mapped = np.empty(len(uniques) + 1, dtype=object)
+    mapped[:-1] = [fn(u) for u in uniques]
+    mapped[-1] = fn(None)
+    return pd.Series(mapped[codes], index=series.index, dtype=object)
+
+def normalize_id_token_series(series: pd.Series) -> pd.Series:
+    """
+    Column twin of normalize_id_token. Tokens depend on the value type,
+    so values are deduplicated by equality (map_distinct), not by str():
+    equal values of different types (1 and 1.0) give the same token
+    anyway, while "1" stays its own entry.
+    """
+    return map_distinct(series, normalize_id_token)
+
+
+# ============================================================
+# On-disk slug cache (optional)
+# ============================================================
+
+def load_slug_cache(path: str | Path) -> int:
+    """Preloads slugs saved by an earlier run. Returns the number loaded."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return 0
+    if payload.get("version") != CANON_VERSION:
+        return 0
+    return merge_slugs(payload.get("slugs", {}))
+
+def save_slug_cache(path: str | Path) -> int:
+    """Writes the current slug cache atomically (temp file + rename)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    slugs = {txt: slug for txt, slug in _SLUG_CACHE.items()}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(
+        json.dumps({"version": CANON_VERSION, "slugs": slugs}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+    return len(slugs)
+
+# Slug texts a worker process already had (see mark_slug_cache); None outside workers
+_SLUG_MARK: Optional[Set[str]] = None
+
+def mark_slug_cache() -> None:
+    """Remembers the slugs held now; take_new_slugs() only returns slugs added later."""
+    global _SLUG_MARK
+    _SLUG_MARK = {txt for txt, _ in _SLUG_CACHE.items()}
+
+def take_new_slugs() -> Dict[str, Optional[str]]:
+    """
+    Slugs added since mark_slug_cache() or the previous call ({} without a
+    mark). A worker returns them with its result so the parent can
+    merge_slugs() them into the cache it saves.
+    """
+    if _SLUG_MARK is None:
+        return {}
+    new = {txt: slug for txt, slug in _SLUG_CACHE.items() if txt not in _SLUG_MARK}
+    _SLUG_MARK.update(new)
+    return new
+
+def merge_slugs(slugs: Dict[str, Optional[str]]) -> int:
+    """Adds slugs computed elsewhere (disk, worker processes). Returns the number merged."""
+    for txt, slug in slugs.items():
+        _SLUG_CACHE.put(txt, slug)
+    return len(slugs)
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        name: {"size": len(c), "hits": c.hits, "misses": c.misses}
+        for name, c in (("slug", _SLUG_CACHE), ("id_token", _ID_TOKEN_CACHE), ("flag01", _FLAG_CACHE))
+    }
+
+def clear_caches() -> None:
+    for c in (_SLUG_CACHE, _ID_TOKEN_CACHE, _FLAG_CACHE):
+        c.clear()
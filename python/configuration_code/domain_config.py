@@ -20,6 +20,34 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 UVL_OUTPUT_DIR = BASE_DIR / "uvl_outputs"
 UVL_NAMESPACE = "MedicareAuditStructure"
 
+# =========================
+# Canonical slug cache (shared by structure + results runners)
+# =========================
+# JSON dump of the canonicalization slug cache; the results runner reuses
+# slugs computed while processing the structure sheets.
+CANONICAL_CACHE_PATH = BASE_DIR / "cache" / "canonical_slugs.json"
+
+# =========================
+# Columnar intermediate store (Parquet, keyed by workbook hash + sheet)
+# =========================
+# Stages run with --columnar hand processed sheets to the next stage
+# through this directory instead of re-parsing the ISO_DATA workbook.
+COLUMNAR_CACHE_DIR = BASE_DIR / "cache" / "columnar"
+
+# =========================
+# Structure reference cache (results matcher)
+# =========================
+# Pickled matcher reference per structure digest; the results runner
+# loads it instead of re-reading every ISO_Check_ sheet.
+STRUCTURE_REF_CACHE_DIR = BASE_DIR / "cache" / "structure_reference"
+
+# =========================
+# Incremental results import (processed rows + visit watermarks)
+# =========================
+# Not keyed by workbook hash: each new import changes the workbook, the
+# processed history carries over (202 --incremental).
+RESULTS_INCREMENTAL_DIR = BASE_DIR / "cache" / "results_incremental"
+
 # =========================
 # Category spelling harmonization
 # =========================
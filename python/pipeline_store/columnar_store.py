@@ -0,0 +1,270 @@
+# pipeline_store/columnar_store.py
+# ============================================================
+# COLUMNAR INTERMEDIATE STORE (Parquet / Arrow)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Pipeline stages (structure runner, Option-A reducer, reduced UVL
+#   batch, results runner) hand DataFrames to each other through this
+#   store instead of re-parsing sheets from the ISO_DATA workbook.
+# - One store directory per workbook, keyed by the SHA-256 of the
+#   workbook bytes; one Parquet file per sheet.
+# - Text columns with repeated values are saved as categoricals
+#   (Parquet dictionary encoding). Reads memory-map the Parquet file;
+#   the Arrow -> pandas conversion still copies every column.
+# - Object columns that mix types (12 / "12a") are saved as text plus a
+#   hidden <column>__pytype tag column; load() converts the cells back,
+#   so a sheet written from the store has the same cell types.
+# - When a stage rewrites the workbook (optional Excel export), it calls
+#   bind() so the new file hash resolves to the same store directory.
+#   A workbook edited by hand gets a new hash, so its store starts empty
+#   and stages fall back to reading the XLSX.
+#
+# LAYOUT:
+#   <root>/index.json                 workbook hash -> store directory
+#   <root>/<stem>__<hash16>/manifest.json
+#   <root>/<stem>__<hash16>/<sheet>.parquet
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import numbers
+import os
+import re
+import numpy as np
+import pandas as pd
+
+STORE_VERSION = 1
+_INDEX_NAME = "index.json"
+_MANIFEST_NAME = "manifest.json"
+
+# Object columns whose distinct/non-null ratio is at most this are stored as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Hidden column holding the original cell types of a mixed-type column
+TYPE_TAG_SUFFIX = "__pytype"
+
+_RESTORE_TYPE = {
+    "bool": lambda v: v == "True",
+    "int": int,
+    "float": float,
+    "datetime": lambda v: pd.Timestamp(v).to_pydatetime(),
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+}
+
+
+def workbook_hash(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _safe_file_stem(sheet_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", sheet_name)
+
+
+def _read_json(path: Path, default: Any) -> Any:
+    if not path.exists():
+        return default
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return default
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _type_tag(val: Any) -> Optional[str]:
+    """Name under which a stringified cell is converted back (None: stays text)."""
+    if isinstance(val, (bool, np.bool_)):
+        return "bool"
+    if isinstance(val, numbers.Integral):
+        return "int"
+    if isinstance(val, numbers.Real):
+        return "float"
+    if isinstance(val, datetime):
+        return "datetime"
+    if isinstance(val, date):
+        return "date"
+    if isinstance(val, time):
+        return "time"
+    return None
+
+
+def to_arrow_safe(df: pd.DataFrame, keep_types: bool = False) -> pd.DataFrame:
+    """
+    Arrow needs one type per column. Object columns that mix types
+    (e.g. 12 and "12a" in CHECK_ITEM_ID) are stored as text; missing
+    cells stay missing. keep_types=True adds a <column>__pytype column
+    per converted column so restore_types() can undo the conversion.
+    """
+    import pyarrow as pa
+
+    out = df.copy()
+    out.columns = [str(c) for c in out.columns]
+    for c in list(out.columns):
+        if out[c].dtype != object:
+            continue
+        try:
+            pa.array(out[c], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            if keep_types:
+                out[c + TYPE_TAG_SUFFIX] = out[c].map(lambda v: None if pd.isna(v) else _type_tag(v)).astype(object)
+            out[c] = out[c].map(lambda v: v if pd.isna(v) else str(v)).astype(object)
+    return out
+
+
+def restore_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Inverse of to_arrow_safe(keep_types=True): converts tagged cells back, drops the tag columns."""
+    tag_cols = [c for c in df.columns if c.endswith(TYPE_TAG_SUFFIX) and c[: -len(TYPE_TAG_SUFFIX)] in df.columns]
+    for tag_col in tag_cols:
+        c = tag_col[: -len(TYPE_TAG_SUFFIX)]
+        tags = df[tag_col].astype(object)
+        values = df[c].astype(object)
+        tagged = tags.notna().to_numpy()
+        values.loc[tagged] = [_RESTORE_TYPE[t](v) for t, v in zip(tags[tagged], values[tagged])]
+        df[c] = values
+    return df.drop(columns=tag_cols)
+
+
+def to_categorical(df: pd.DataFrame, max_ratio: float = CATEGORY_MAX_RATIO) -> pd.DataFrame:
+    """Converts repetitive all-text object columns to category dtype."""
+    out = df.copy()
+    for c in out.columns:
+        if out[c].dtype != object:
+            continue
+        non_null = out[c].dropna()
+        if non_null.empty or not all(isinstance(v, str) for v in non_null):
+            continue
+        if non_null.nunique() <= max(1, int(len(non_null) * max_ratio)):
+            out[c] = out[c].astype("category")
+    return out
+
+
+class ColumnarStore:
+    """Per-workbook directory of Parquet sheets plus a JSON manifest."""
+
+    def __init__(self, root: str | Path, key: str) -> None:
+        self.root = Path(root)
+        self.key = key
+        self.dir = self.root / key
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.dir / _MANIFEST_NAME
+        manifest = _read_json(self._manifest_path, {})
+        if manifest.get("version") != STORE_VERSION:
+            manifest = {"version": STORE_VERSION, "hashes": [], "workbook_sheets": [], "sheets": {}}
+        self._manifest: Dict[str, Any] = manifest
+
+    # ------------------------------------------------------------------
+    # Construction / binding
+    # ------------------------------------------------------------------
+    @classmethod
+    def for_workbook(cls, xlsx_path: str | Path, root: str | Path) -> "ColumnarStore":
+        xlsx_path = Path(xlsx_path)
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        digest = workbook_hash(xlsx_path)
+        index = _read_json(root / _INDEX_NAME, {})
+        key = index.get(digest) or f"{_safe_file_stem(xlsx_path.stem)}__{digest[:16]}"
+        store = cls(root, key)
+        store._register_hash(digest)
+        return store
+
+    def _register_hash(self, digest: str) -> None:
+        index_path = self.root / _INDEX_NAME
+        index = _read_json(index_path, {})
+        if index.get(digest) != self.key:
+            index[digest] = self.key
+            _write_json_atomic(index_path, index)
+        if digest not in self._manifest["hashes"]:
+            self._manifest["hashes"].append(digest)
+            self._save_manifest()
+
+    def bind(self, xlsx_path: str | Path) -> None:
+        """Call after rewriting the workbook so its new hash maps to this store."""
+        self._register_hash(workbook_hash(xlsx_path))
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def _save_manifest(self) -> None:
+        _write_json_atomic(self._manifest_path, self._manifest)
+
+    @property
+    def workbook_sheets(self) -> List[str]:
+        return list(self._manifest["workbook_sheets"])
+
+    def set_workbook_sheets(self, sheet_names: List[str]) -> None:
+        if list(sheet_names) != self._manifest["workbook_sheets"]:
+            self._manifest["workbook_sheets"] = list(sheet_names)
+            self._save_manifest()
+
+    def sheet_names(self) -> List[str]:
+        return list(self._manifest["sheets"])
+
+    def has(self, sheet_name: str) -> bool:
+        entry = self._manifest["sheets"].get(sheet_name)
+        return bool(entry) and (self.dir / entry["file"]).exists()
+
+    def content_stamp(self, sheet_names: List[str]) -> str:
+        """SHA-256 over the stored Parquet bytes of these sheets ("-" for sheets not in the store)."""
+        h = hashlib.sha256()
+        for name in sheet_names:
+            digest = workbook_hash(self.dir / self._manifest["sheets"][name]["file"]) if self.has(name) else "-"
+            h.update(f"{name}={digest}|".encode("utf-8"))
+        return h.hexdigest()
+
+    def stage_of(self, sheet_name: str) -> Optional[str]:
+        entry = self._manifest["sheets"].get(sheet_name)
+        return entry.get("stage") if entry else None
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+    def save(self, sheet_name: str, df: pd.DataFrame, stage: str = "") -> Path:
+        target = self.dir / f"{_safe_file_stem(sheet_name)}.parquet"
+        tmp = target.with_name(target.name + ".tmp")
+        to_categorical(to_arrow_safe(df, keep_types=True)).to_parquet(tmp, index=False, engine="pyarrow")
+        os.replace(tmp, target)
+        self._manifest["sheets"][sheet_name] = {
+            "file": target.name,
+            "stage": stage,
+            "rows": int(len(df)),
+            "columns": int(df.shape[1]),
+        }
+        # Keep the recorded sheet order complete once a stage has listed the workbook
+        order = self._manifest["workbook_sheets"]
+        if order and sheet_name not in order:
+            order.append(sheet_name)
+        self._save_manifest()
+        return target
+
+    def load(self, sheet_name: str, as_category: bool = False) -> pd.DataFrame:
+        """
+        Arrow read from the memory-mapped file, converted (copied) into a
+        pandas frame. Category columns are returned as object columns
+        unless as_category=True (read-only consumers such as the UVL
+        builder can keep them as categoricals). Mixed-type columns get
+        their original cell types back.
+        """
+        import pyarrow.parquet as pq
+
+        entry = self._manifest["sheets"].get(sheet_name)
+        if not entry:
+            raise KeyError(f"Sheet '{sheet_name}' not in columnar store {self.dir}")
+        df = pq.read_table(self.dir / entry["file"], memory_map=True).to_pandas()
+        if not as_category:
+            for c in df.columns:
+                if isinstance(df[c].dtype, pd.CategoricalDtype):
+                    df[c] = df[c].astype(object)
+        return restore_types(df)
@@ -0,0 +1,163 @@
+# pipeline_store/sheet_chunks.py
+# ============================================================
+# CHUNKED SHEET READ / WRITE (bounded memory)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - iter_xlsx_chunks streams one sheet through openpyxl read-only mode
+#   and yields DataFrames of at most chunk_rows rows. Cells are
+#   converted exactly like pd.read_excel (openpyxl engine) and every
+#   chunk goes through pandas' TextParser, so values per row match a
+#   full read_excel; only dtype inference is per chunk: a column that
+#   is empty in one chunk comes back float there, and numeric-looking
+#   text ("12") in an otherwise numeric chunk comes back as a number.
+#   The result stages normalize both the same way.
+#   Trailing empty rows are dropped, like read_excel.
+# - iter_parquet_chunks does the same from a Parquet file (record
+#   batches); category columns come back as object, like
+#   ColumnarStore.load.
+# - ChunkedParquetWriter writes each processed chunk as its own part
+#   file (<dir>/part-00000.parquet, ...). Chunks do not share one Arrow
+#   schema (see dtype note above), so parts are unified on read by
+#   read_chunked_parquet (pandas concat).
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence
+import json
+import os
+import re
+import shutil
+import pandas as pd
+
+from pipeline_store.columnar_store import to_arrow_safe
+
+DEFAULT_CHUNK_ROWS = 50_000
+_PARTS_MANIFEST = "_parts.json"
+
+
+def _convert_cell(cell: Any) -> Any:
+    # Same rules as pandas' OpenpyxlReader._convert_cell
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        return val if val == cell.value else float(cell.value)
+    return cell.value
+
+
+def _rows_to_frame(header: List[Any], rows: List[List[Any]], usecols: Optional[Sequence[str]]) -> pd.DataFrame:
+    from pandas.io.parsers import TextParser
+
+    return TextParser([header] + rows, header=0, usecols=usecols).read()
+
+
+def iter_xlsx_chunks(
+    xlsx_path: str | Path,
+    sheet_name: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    usecols: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yields the sheet as DataFrames of at most chunk_rows rows (header taken from row 1)."""
+    from openpyxl import load_workbook
+
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+    book = load_workbook(xlsx_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = book[sheet_name]
+        sheet.reset_dimensions()
+        rows_iter = sheet.rows
+        header_row = next(rows_iter, None)
+        if header_row is None:
+            return
+        header = [_convert_cell(c) for c in header_row]
+        while header and header[-1] == "":
+            header.pop()
+        width = len(header)
+
+        buf: List[List[Any]] = []
+        pending_blank = 0  # blank rows are only kept when data follows them
+        for row in rows_iter:
+            values = [_convert_cell(c) for c in row][:width]
+            if all(v == "" for v in values):
+                pending_blank += 1
+                continue
+            if pending_blank:
+                buf.extend([[""] * width for _ in range(pending_blank)])
+                pending_blank = 0
+            values.extend([""] * (width - len(values)))
+            buf.append(values)
+            if len(buf) >= chunk_rows:
+                yield _rows_to_frame(header, buf[:chunk_rows], usecols)
+                buf = buf[chunk_rows:]
+        if buf:
+            yield _rows_to_frame(header, buf, usecols)
+    finally:
+        book.close()
+
+
+def parquet_path_for(parquet_dir: str | Path, sheet_name: str) -> Path:
+    """<parquet_dir>/<sheet>.parquet, same file naming as ColumnarStore and the synthetic generator."""
+    return Path(parquet_dir) / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', sheet_name)}.parquet"
+
+
+def iter_parquet_chunks(
+    path: str | Path,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yields a Parquet file as DataFrames of at most chunk_rows rows."""
+    import pyarrow.parquet as pq
+
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+    pf = pq.ParquetFile(path)
+    for batch in pf.iter_batches(batch_size=chunk_rows, columns=list(columns) if columns else None):
+        df = batch.to_pandas()
+        for c in df.columns:
+            if isinstance(df[c].dtype, pd.CategoricalDtype):
+                df[c] = df[c].astype(object)
+        yield df
+
+
+class ChunkedParquetWriter:
+    """Writes a stream of DataFrame chunks as part files under one directory."""
+
+    def __init__(self, out_dir: str | Path) -> None:
+        self.dir = Path(out_dir)
+        if self.dir.exists():
+            shutil.rmtree(self.dir)
+        self.dir.mkdir(parents=True)
+        self.parts: List[dict] = []
+
+    def write(self, df: pd.DataFrame) -> Path:
+        path = self.dir / f"part-{len(self.parts):05d}.parquet"
+        to_arrow_safe(df).to_parquet(path, index=False, engine="pyarrow")
+        self.parts.append({"file": path.name, "rows": int(len(df))})
+        return path
+
+    @property
+    def rows(self) -> int:
+        return sum(p["rows"] for p in self.parts)
+
+    def close(self) -> Path:
+        manifest = self.dir / _PARTS_MANIFEST
+        tmp = manifest.with_name(manifest.name + ".tmp")
+        tmp.write_text(json.dumps({"rows": self.rows, "parts": self.parts}, indent=1), encoding="utf-8")
+        os.replace(tmp, manifest)
+        return self.dir
+
+
+def read_chunked_parquet(out_dir: str | Path) -> pd.DataFrame:
+    """All parts written by ChunkedParquetWriter, in order, as one DataFrame."""
+    out_dir = Path(out_dir)
+    manifest = json.loads((out_dir / _PARTS_MANIFEST).read_text(encoding="utf-8"))
+    frames = [pd.read_parquet(out_dir / p["file"]) for p in manifest["parts"]]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
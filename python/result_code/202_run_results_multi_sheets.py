@@ -3,7 +3,14 @@
 # ============================================================
 
 from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterable
+import argparse
+import contextlib
+import io
+import traceback
+import warnings
 import pandas as pd
 
 # --- 1. استيراد الموديولات الأساسية والهوية ---
@@ -31,7 +38,32 @@ from results_pipeline.result_item_classification_columns_pandas import process_r
 from results_pipeline.result_visit_status_columns import process_result_visit_status_columns as visit_status_func
 from results_pipeline.result_visit_total_status_pandas import process_result_visit_result_score_status_columns as visit_total_score_func
 from results_pipeline.result_audit_plan_mapping_pandas import process_result_audit_plan_mapping as map_func
-from results_pipeline.results_matcher import build_structure_reference_from_workbook, match_results_df_to_structure
+from results_pipeline.results_matcher import (
+    build_structure_reference_from_workbook,
+    match_results_df_to_structure,
+    summarize_match_flags,
+    MATCH_FLAG_COLS,
+)
+from results_pipeline.core_utilities_results_pandas import (
+    load_slug_cache,
+    save_slug_cache,
+    mark_slug_cache,
+    take_new_slugs,
+    merge_slugs,
+    mark_inplace_stages,
+    clear_inplace_stages,
+)
+from results_pipeline.results_reference_cache import StructureReferenceCache
+from results_pipeline.results_incremental import IncrementalResultsStore
+from results_pipeline.results_stage_instrumentation import NullInstrumentation, StageInstrumentation, TRACE_FORMATS
+from pipeline_store.columnar_store import ColumnarStore
+from pipeline_store.sheet_chunks import (
+    DEFAULT_CHUNK_ROWS,
+    ChunkedParquetWriter,
+    iter_parquet_chunks,
+    iter_xlsx_chunks,
+    parquet_path_for,
+)
 
 # Configuration
 from config.domain_config import (
@@ -39,7 +71,11 @@ from config.domain_config import (
     VISIT_STATUS_MAP, 
     VISIT_RESULT_STATUS_MAP, 
     BRANCH_NAME_OVERRIDES,
-    DEP_LABELS
+    DEP_LABELS,
+    CANONICAL_CACHE_PATH,
+    COLUMNAR_CACHE_DIR,
+    STRUCTURE_REF_CACHE_DIR,
+    RESULTS_INCREMENTAL_DIR,
 )
 
 # =========================
@@ -57,92 +93,367 @@ def prepare_raw_columns(df: pd.DataFrame) -> pd.DataFrame:
             df[new] = df[old]
     return df
 
-def run_master_pipeline(df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
-    df = prepare_raw_columns(df)
+def run_master_pipeline(
+    df: pd.DataFrame,
+    sheet_name: str,
+    instr: NullInstrumentation | None = None,
+    inplace: bool = False,
+) -> pd.DataFrame:
+    # instr: StageInstrumentation to time/profile every stage; default runs the stages plainly
+    # inplace: stages write into df itself instead of copying it (same rows/columns, lower peak memory)
+    if inplace:
+        mark_inplace_stages(df)
+        with warnings.catch_warnings():
+            # one frame gaining ~100 columns one by one is fragmented by design here
+            warnings.simplefilter("ignore", pd.errors.PerformanceWarning)
+            return _run_stages(df, sheet_name, instr)
+    return _run_stages(df, sheet_name, instr)
+
+
+def _run_stages(df: pd.DataFrame, sheet_name: str, instr: NullInstrumentation | None) -> pd.DataFrame:
+    run = (instr or NullInstrumentation()).run
+    df = run("prepare_raw_columns", prepare_raw_columns, df)
     
     # المرحلة 1: التطهير الأساسي (الأرقام، التواريخ، التوكنات)
     print("      .. Step 1: Base Data Sanitization")
-    df = num_func(df)   
-    df = date_func(df)  
-    df = token_func(df) # تحويل الـ IDs لنصوص نظيفة
+    df = run("num_func", num_func, df)
+    df = run("date_func", date_func, df)
+    df = run("token_func", token_func, df) # تحويل الـ IDs لنصوص نظيفة
     
     # المرحلة 2: الهوية والأطراف
     print("      .. Step 2: Identity (Category, Branch, Parties)")
-    df = cat_func(df=df, sheet_name=sheet_name, category_spelling_map=CATEGORY_SPELLING_MAP)
-    df = branch_func(df=df, branch_overrides=BRANCH_NAME_OVERRIDES, dep_labels=DEP_LABELS)
-    df = parties_func(df) 
+    df = run("cat_func", cat_func, df, sheet_name=sheet_name, category_spelling_map=CATEGORY_SPELLING_MAP)
+    df = run("branch_func", branch_func, df, branch_overrides=BRANCH_NAME_OVERRIDES, dep_labels=DEP_LABELS)
+    df = run("parties_func", parties_func, df)
     
     # المرحلة 3: بناء المفاتيح الفريدة (Critical Step for UVL)
     print("      .. Step 3: Building Item Keys & Features")
-    df = item_func(df) # ينشئ ITEM_KEY الأساسي للفرادة
-    df = ans_func(df)  # ينشئ أكواد الإجابات الفريدة المرتبطة بالبند
+    df = run("item_func", item_func, df) # ينشئ ITEM_KEY الأساسي للفرادة
+    df = run("ans_func", ans_func, df)  # ينشئ أكواد الإجابات الفريدة المرتبطة بالبند
     
     # المرحلة 4: ترميز الحالات والنتائج بنظام الفرادة (UVL Encoding)
     print("      .. Step 4: Unique Status Encoding (coss_ & iss_)")
     # حالة البند: iss_cat__item_pass
-    df = item_status_func(df, visit_result_status_map=VISIT_RESULT_STATUS_MAP)
+    df = run("item_status_func", item_status_func, df, visit_result_status_map=VISIT_RESULT_STATUS_MAP)
     # حالة الكاتيجوري: coss_cat_pass
-    df = cat_status_func(df, visit_result_status_map=VISIT_RESULT_STATUS_MAP)
+    df = run("cat_status_func", cat_status_func, df, visit_result_status_map=VISIT_RESULT_STATUS_MAP)
     
     # المرحلة 5: معالجة الملاحظات وتتبع NC
     print("      .. Step 5: Notes & NC Tracking (Unique Logic)")
-    df = notes_func(df) # تفكيك الملاحظات لـ 3 أعمدة
-    df = nc_func(df)    # إنشاء أكواد NC الفريدة تحت الـ ITEM_KEY
+    df = run("notes_func", notes_func, df) # تفكيك الملاحظات لـ 3 أعمدة
+    df = run("nc_func", nc_func, df)    # إنشاء أكواد NC الفريدة تحت الـ ITEM_KEY
     
     # المرحلة 6: التصنيف والربط مع الهيكل
     print("      .. Step 6: Final Classification & Integrity Checks")
-    df = class_func(df)
-    df = visit_status_func(df, visit_status_map=VISIT_STATUS_MAP)
-    df = visit_total_score_func(df, visit_result_status_map=VISIT_RESULT_STATUS_MAP)
-    df = map_func(df)
+    df = run("class_func", class_func, df)
+    df = run("visit_status_func", visit_status_func, df, visit_status_map=VISIT_STATUS_MAP)
+    df = run("visit_total_score_func", visit_total_score_func, df, visit_result_status_map=VISIT_RESULT_STATUS_MAP)
+    df = run("map_func", map_func, df)
     
     return df
 
-def main() -> None:
+def run_sheet_streaming(
+    chunks: Iterable[pd.DataFrame],
+    sheet_name: str,
+    full_ref: dict,
+    writer: ChunkedParquetWriter,
+) -> pd.DataFrame:
+    """
+    Streaming mode: every stage (and the matcher) is row-local, so the
+    sheet runs chunk by chunk and each processed chunk is written out
+    before the next one is read. Returns the match summary of the sheet.
+    """
+    flags, struct_key = [], None
+    for i, chunk in enumerate(chunks):
+        # a chunk is a fresh frame owned by the stream: stages write into it (no per-stage copies)
+        with contextlib.redirect_stdout(io.StringIO()) if i else contextlib.nullcontext():
+            df = run_master_pipeline(chunk, sheet_name=sheet_name, inplace=True)
+        matching = match_results_df_to_structure(df, full_ref=full_ref, result_sheet_name=sheet_name)
+        clear_inplace_stages(df)
+        writer.write(df)
+        flags.append(matching["processed_df"][MATCH_FLAG_COLS].reset_index(drop=True))
+        struct_key = matching["summary"]["matched_with_struct"].iat[0]
+        print(f"      .. chunk {i + 1}: {len(df)} rows ({writer.rows} total)")
+    all_flags = pd.concat(flags, ignore_index=True) if flags else pd.DataFrame(columns=MATCH_FLAG_COLS, dtype=bool)
+    return summarize_match_flags(all_flags, sheet_name, struct_key)
+
+
+# Structure reference of a --jobs worker: sent once by the pool initializer, read-only afterwards
+_WORKER_REF: dict = {}
+
+
+def _init_result_worker(slug_cache_path: Path, full_ref: dict) -> None:
+    global _WORKER_REF
+    load_slug_cache(slug_cache_path)
+    # slugs computed from here on go back to the parent with each result
+    mark_slug_cache()
+    _WORKER_REF = full_ref
+
+
+def _result_task(task: dict, capture: bool = True) -> dict:
+    """
+    One result sheet, or one row-chunk of it: stages + matcher.
+    Runs in a worker process under --jobs; its prints are captured and
+    returned so the parent can replay them in sheet order, together with
+    the slugs it computed (merged into the parent's slug cache).
+    """
+    buf = io.StringIO()
+    out = {"sheet": task["sheet"], "part": task["part"], "df": None, "flags": None, "struct_key": None, "error": None}
+    with (contextlib.redirect_stdout(buf) if capture else contextlib.nullcontext()):
+        try:
+            sheet = task["sheet"]
+            # the task frame was unpickled in this worker and belongs to it: stages write into it
+            df = run_master_pipeline(task["df"], sheet_name=sheet, inplace=True)
+            matching = match_results_df_to_structure(df, full_ref=_WORKER_REF, result_sheet_name=sheet)
+            clear_inplace_stages(df)
+            out["df"] = df
+            if matching:
+                out["flags"] = matching["processed_df"][MATCH_FLAG_COLS].reset_index(drop=True)
+                out["struct_key"] = matching["summary"]["matched_with_struct"].iat[0]
+        except Exception:
+            out["error"] = traceback.format_exc()
+    out["log"] = buf.getvalue()
+    out["slugs"] = take_new_slugs()
+    return out
+
+
+def _collect_result_parts(sheet: str, parts: list[Future]) -> tuple[pd.DataFrame, dict]:
+    """
+    Joins the row-chunks of one sheet back in their original order.
+    Returns the processed frame and a matcher-shaped result
+    ({"processed_df": match flags, "summary": ...}; {} when unmatched).
+    """
+    results = [p.result() for p in parts]
+    for res in results:
+        merge_slugs(res["slugs"])
+        if res["error"]:
+            raise RuntimeError(f"{sheet} (rows part {res['part']}) failed:\n{res['error']}")
+    # every chunk logs the same steps: replay the first one only
+    print(results[0]["log"], end="")
+    if len(results) > 1:
+        print(f"      .. {len(results)} row-chunks processed in parallel")
+    df = pd.concat([r["df"] for r in results]) if len(results) > 1 else results[0]["df"]
+    if any(r["flags"] is None for r in results):
+        return df, {}
+    flags = pd.concat([r["flags"] for r in results], ignore_index=True)
+    summary = summarize_match_flags(flags, sheet, results[0]["struct_key"])
+    return df, {"processed_df": flags, "summary": summary}
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Results runner (visit_result* sheets -> processed + match summaries)")
+    ap.add_argument("--columnar", action="store_true",
+                    help="read structure sheets from / write processed results to the columnar store")
+    ap.add_argument("--no-excel", action="store_true",
+                    help="skip rewriting the workbook (results stay in the columnar store only)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="process only visits not processed before; append them to RESULTS_INCREMENTAL_DIR "
+                         "(rows keep their sheet order and cell types, as in a full run)")
+    ap.add_argument("--full-rebuild", action="store_true",
+                    help="with --incremental: forget the stored visits and reprocess every result sheet")
+    ap.add_argument("--stream-chunk-rows", type=int, default=0,
+                    help="streaming mode: process result sheets in chunks of N rows (bounded memory); "
+                         "output goes to <workbook>.processed/ as Parquet parts, the workbook is not rewritten")
+    ap.add_argument("--stream-parquet-dir", type=Path, default=None,
+                    help="streaming mode: read <sheet>.parquet from this folder when present instead of the XLSX")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="worker processes for result sheets (default 1 = sequential); "
+                         "output sheets are still written in their original order")
+    ap.add_argument("--job-chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                    help="with --jobs: split result sheets longer than N rows into row-chunks "
+                         "processed by separate workers (0 = one task per sheet)")
+    ap.add_argument("--no-ref-cache", action="store_true",
+                    help="always rebuild the structure reference from the ISO_Check_ sheets (skip STRUCTURE_REF_CACHE_DIR)")
+    ap.add_argument("--inplace", action="store_true",
+                    help="copy-free stages: every stage writes into one shared frame (lower peak memory)")
+    ap.add_argument("--trace-dir", type=Path, default=None,
+                    help="write a per-sheet stage trace (time, rows, columns, memory, copies) to this folder")
+    ap.add_argument("--trace-format", choices=TRACE_FORMATS, default="json",
+                    help="json: stage records; chrome: trace-event file for chrome://tracing / Perfetto")
+    ap.add_argument("--profile-stages", nargs="*", default=None,
+                    help="stages to run under cProfile (names like nc_func item_func, or 'all'); needs --trace-dir")
+    ap.add_argument("--tracemalloc-stages", nargs="*", default=None,
+                    help="stages to run under tracemalloc (names or 'all'); needs --trace-dir")
+    args = ap.parse_args(argv)
+    if args.full_rebuild and not args.incremental:
+        ap.error("--full-rebuild requires --incremental")
+    return args
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    if args.stream_chunk_rows and args.incremental:
+        raise SystemExit("--stream-chunk-rows and --incremental cannot be combined")
+    jobs = max(1, args.jobs)
+    if jobs > 1 and (args.stream_chunk_rows or args.trace_dir is not None):
+        raise SystemExit("--jobs cannot be combined with --stream-chunk-rows or --trace-dir")
     print("\n" + "="*60)
     print("🚀 Master Runner: UVL Unique Structure Mode")
     print("="*60)
     
+    pool = None
     try:
+        # إعادة استخدام الـ slugs المحسوبة مسبقاً من شيتات الستركشر
+        n_cached = load_slug_cache(CANONICAL_CACHE_PATH)
+        if n_cached:
+            print(f"♻️  Reusing {n_cached} cached slugs from structure processing")
+
         # البحث عن الملف
         xlsx_path = sorted(list(Path(".").glob(f"{FILE_PREFIX}*.xlsx")), reverse=True)[0]
         xls = pd.ExcelFile(xlsx_path)
-        
+        store = ColumnarStore.for_workbook(xlsx_path, COLUMNAR_CACHE_DIR) if args.columnar else None
+
+        def read_sheet(name: str) -> pd.DataFrame:
+            # Processed structure sheets come from the columnar store when the structure runner left them there
+            if store is not None and store.has(name):
+                return store.load(name)
+            return pd.read_excel(xlsx_path, sheet_name=name)
+
         all_struct_sheets = [s for s in xls.sheet_names if s.startswith(STRUCT_PREFIX)]
         all_result_sheets = [s for s in xls.sheet_names if s.startswith(RESULT_PREFIX)]
 
         print(f"📂 Active Workbook: {xlsx_path.name}")
-        ref = build_structure_reference_from_workbook(str(xlsx_path), all_struct_sheets)
+        ref_cache = None if args.no_ref_cache else StructureReferenceCache(STRUCTURE_REF_CACHE_DIR)
+        if ref_cache is None:
+            ref = build_structure_reference_from_workbook(str(xlsx_path), all_struct_sheets, read_sheet=read_sheet)
+        else:
+            ref = ref_cache.get(
+                xlsx_path,
+                all_struct_sheets,
+                read_sheet=read_sheet,
+                source="columnar" if store is not None else "xlsx",
+                source_stamp=store.content_stamp(all_struct_sheets) if store is not None else "",
+            )
+            print(f"♻️  Structure reference: {ref_cache.last_status} ({len(ref)} sheets)")
+
+        inc = IncrementalResultsStore(RESULTS_INCREMENTAL_DIR, FILE_PREFIX) if args.incremental else None
+
+        if args.stream_chunk_rows:
+            # Streaming: one chunk of one result sheet in memory at a time; nothing else is loaded or rewritten
+            out_dir = xlsx_path.with_name(f"{xlsx_path.stem}.processed")
+            for sheet in all_result_sheets:
+                print(f"\n[PHASE] Streaming -> {sheet} (chunks of {args.stream_chunk_rows} rows)")
+                src = parquet_path_for(args.stream_parquet_dir, sheet) if args.stream_parquet_dir else None
+                if src is not None and src.exists():
+                    chunks = iter_parquet_chunks(src, args.stream_chunk_rows)
+                else:
+                    chunks = iter_xlsx_chunks(xlsx_path, sheet, args.stream_chunk_rows)
+                writer = ChunkedParquetWriter(out_dir / f"{sheet}.parts")
+                summary = run_sheet_streaming(chunks, sheet, ref, writer)
+                writer.close()
+                summary.to_parquet(parquet_path_for(out_dir, f"{REPORT_PREFIX}{sheet}_summary"), index=False)
+                print(f"      .. {writer.rows} rows -> {writer.dir}")
+            save_slug_cache(CANONICAL_CACHE_PATH)
+            print("\n🎉 SUCCESS: All Unique UVL Features generated and mapped!")
+            return
 
         final_sheets = {}
-        # نسخ الشيتات التي لا تبدأ بـ Result كما هي
-        for s in xls.sheet_names:
+        # نسخ الشيتات التي لا تبدأ بـ Result كما هي (فقط عند إعادة كتابة الملف كاملاً)
+        for s in xls.sheet_names if not (args.no_excel or inc is not None) else []:
             if not s.startswith(RESULT_PREFIX):
                 final_sheets[s] = pd.read_excel(xlsx_path, sheet_name=s)
 
+        def finish_sheet(sheet: str, df_processed, matching_results, dirty: set, sheet_keys=None) -> None:
+            if inc is not None:
+                df_processed, summary = inc.commit(
+                    sheet, df_processed, matching_results, dirty, ref, sheet_keys,
+                    reference_digest=ref_cache.last_digest if ref_cache is not None else None,
+                )
+            else:
+                summary = matching_results["summary"]
+
+            final_sheets[sheet] = df_processed
+            final_sheets[f"{REPORT_PREFIX}{sheet}_summary"] = summary
+            if store is not None:
+                store.save(sheet, df_processed, stage="results")
+                store.save(f"{REPORT_PREFIX}{sheet}_summary", summary, stage="results")
+
+        # --jobs N: sheets (or row-chunks of long sheets) run in worker processes against
+        # one copy of the structure reference per worker; they are joined back and
+        # finished in the original sheet / row order below.
+        if jobs > 1:
+            print(f"⚙️  Parallel mode: {jobs} worker processes")
+            pool = ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_result_worker,
+                initargs=(CANONICAL_CACHE_PATH, ref),
+            )
+
         # معالجة شيتات النتائج
+        submitted = []
         for sheet in all_result_sheets:
-            print(f"\n[PHASE] Processing -> {sheet}")
+            print(f"\n[PHASE] {'Submitting' if pool else 'Processing'} -> {sheet}")
             df_raw = pd.read_excel(xlsx_path, sheet_name=sheet)
-            df_processed = run_master_pipeline(df_raw, sheet_name=sheet)
-            
-            print(f"      .. Matching with Structure Reference")
-            matching_results = match_results_df_to_structure(
-                df_results=df_processed, full_ref=ref, result_sheet_name=sheet
-            )
-            
-            final_sheets[sheet] = df_processed
-            final_sheets[f"{REPORT_PREFIX}{sheet}_summary"] = matching_results["summary"]
+            dirty: set = set()
+            sheet_keys = None
+            if inc is not None:
+                if args.full_rebuild:
+                    inc.reset(sheet)
+                n_total = len(df_raw)
+                df_raw, dirty, sheet_keys = inc.pending(sheet, df_raw)
+                print(f"      .. Incremental: {len(df_raw)} new rows in {len(dirty)} visits "
+                      f"({n_total - len(df_raw)} rows already processed)")
+
+            if pool is not None:
+                parts = []
+                if inc is None or len(df_raw):
+                    step = args.job_chunk_rows if args.job_chunk_rows > 0 else max(len(df_raw), 1)
+                    for part, start in enumerate(range(0, max(len(df_raw), 1), step)):
+                        task = {"sheet": sheet, "part": part, "df": df_raw.iloc[start:start + step]}
+                        parts.append(pool.submit(_result_task, task))
+                submitted.append((sheet, dirty, sheet_keys, parts))
+                continue
+
+            df_processed, matching_results = None, None
+            if inc is None or len(df_raw):
+                instr = None
+                if args.trace_dir is not None:
+                    instr = StageInstrumentation(
+                        sheet,
+                        profile_stages=args.profile_stages,
+                        tracemalloc_stages=args.tracemalloc_stages,
+                        out_dir=args.trace_dir,
+                    )
+                df_processed = run_master_pipeline(df_raw, sheet_name=sheet, instr=instr, inplace=args.inplace)
+
+                print(f"      .. Matching with Structure Reference")
+                matching_results = (instr or NullInstrumentation()).run(
+                    "match_func", match_results_df_to_structure, df_processed, full_ref=ref, result_sheet_name=sheet
+                )
+                clear_inplace_stages(df_processed)
+                if instr is not None:
+                    instr.print_summary()
+                    print(f"      .. Stage trace: {instr.write(args.trace_dir, args.trace_format)}")
+
+            finish_sheet(sheet, df_processed, matching_results, dirty, sheet_keys)
+
+        # Parallel mode: sheets are finished (logged + staged for write-back) in their original order
+        for sheet, dirty, sheet_keys, parts in submitted:
+            print(f"\n[PHASE] Processed -> {sheet}")
+            df_processed, matching_results = _collect_result_parts(sheet, parts) if parts else (None, None)
+            finish_sheet(sheet, df_processed, matching_results, dirty, sheet_keys)
             
-        # حفظ النتائج في الملف الأصلي (In-place)
-        with pd.ExcelWriter(xlsx_path, engine="openpyxl") as writer:
-            for sheet_name, content_df in final_sheets.items():
-                content_df.to_excel(writer, sheet_name=sheet_name, index=False)
+        # حفظ النتائج في الملف الأصلي (In-place) — optional when the columnar store holds them
+        if not args.no_excel:
+            # incremental: only result / summary sheets are replaced, the rest of the workbook is left untouched
+            writer_opts = {"mode": "a", "if_sheet_exists": "replace"} if inc is not None else {}
+            with pd.ExcelWriter(xlsx_path, engine="openpyxl", **writer_opts) as writer:
+                for sheet_name, content_df in final_sheets.items():
+                    content_df.to_excel(writer, sheet_name=sheet_name, index=False)
+            if store is not None:
+                store.bind(xlsx_path)
+            # structure sheets were copied as-is: the rewritten workbook keeps the same reference
+            if ref_cache is not None:
+                ref_cache.bind(xlsx_path)
+
+        save_slug_cache(CANONICAL_CACHE_PATH)
 
         print("\n🎉 SUCCESS: All Unique UVL Features generated and mapped!")
 
     except Exception as e:
         print(f"\n❌ RUNTIME ERROR: {str(e)}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,7 +3,9 @@
 # RESULTS Utilities (Pandas) — Canonical Parity Layer
 # ------------------------------------------------------------
 # LOGIC & METHODOLOGY:
-# - This module is an exact functional mirror of the structure utilities.
+# - Text normalization, slugification and ID tokenization are imported
+#   from canonical_code.canonicalization, the same implementation the
+#   structure utilities re-export.
 # - It ensures that data extracted from the field (Results) is normalized 
 #   using the same NFKC and Slugification logic as the configuration (Structure).
 # - This parity is critical for successful joins between Results and UVL features.
@@ -12,74 +14,72 @@
 # - Standardizes Arabic text normalization to handle lab supervisor input.
 # - Ensures numeric IDs (Branches, Items) are tokenized identically to 
 #   avoid "Key Mismatches" caused by Excel's float formatting.
+# - Slugs already computed for the Structure sheets are reused through
+#   the shared (optionally on-disk) slug cache.
+#
+# IN-PLACE STAGE CONTRACT (opt-in):
+# - Stages start with stage_frame(df) instead of df.copy(). A frame marked
+#   with mark_inplace_stages() is returned as-is, so every stage writes
+#   its derived columns into the same frame (one frame instead of one
+#   full copy per stage). Unmarked frames are copied exactly as before.
+# - The mark lives in df.attrs, so it holds no matter how a stage
+#   imported this module (results_pipeline.* or flat).
 # ============================================================
 
 from __future__ import annotations
-from typing import Any, List, Optional
-import re
-import unicodedata
+from typing import List
+import sys
+from pathlib import Path
 import pandas as pd
 
-# Standard missing tokens shared across the entire project
-_MISSING_TOKENS = {"", "nan", "none", "null", "na", "n/a", "-", "--", "?"}
-
-def normalize_text(val: Any) -> str:
-    """
-    Mirror: Normalizes results text (Arabic/English) using NFKC.
-    """
-    if val is None:
-        return ""
-    try:
-        if pd.isna(val):
-            return ""
-    except Exception:
-        pass
+# The canonical core lives in python/canonical_code (shared with structurecode)
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from canonical_code.canonicalization import (  # noqa: E402,F401
+    _MISSING_TOKENS,
+    normalize_text,
+    is_missing_like,
+    to_uvl_code,
+    normalize_id_token,
+    normalize_flag01,
+    normalize_text_series,
+    is_missing_like_series,
+    is_present_series,
+    clean_text_series,
+    to_uvl_code_series,
+    map_distinct,
+    normalize_id_token_series,
+    load_slug_cache,
+    save_slug_cache,
+    mark_slug_cache,
+    take_new_slugs,
+    merge_slugs,
+)
+
+INPLACE_STAGES_ATTR = "results_inplace_stages"
+
+
+def mark_inplace_stages(df: pd.DataFrame) -> pd.DataFrame:
+    """Opts a frame into the in-place stage contract (stages stop copying it)."""
+    df.attrs[INPLACE_STAGES_ATTR] = True
+    return df
 
-    s = str(val).strip()
-    s = unicodedata.normalize('NFKC', s)
-    
-    if not s:
-        return ""
-    s = re.sub(r"\s+", " ", s)
-    return s
 
-def is_missing_like(val: Any) -> bool:
-    """
-    Mirror: Detects missing data in audit results sheets.
-    """
-    if val is None:
-        return True
-    try:
-        if pd.isna(val):
-            return True
-    except Exception:
-        pass
+def clear_inplace_stages(df: pd.DataFrame) -> pd.DataFrame:
+    df.attrs.pop(INPLACE_STAGES_ATTR, None)
+    return df
 
-    s = normalize_text(val)
-    if not s:
-        return True
-    return s.strip().lower() in _MISSING_TOKENS
 
-def to_uvl_code(val: Any) -> Optional[str]:
-    """
-    Mirror: Generates identical slugs for result answers to match UVL features.
-    """
-    if is_missing_like(val):
-        return None
+def is_inplace_stages(df: pd.DataFrame) -> bool:
+    return bool(df.attrs.get(INPLACE_STAGES_ATTR, False))
 
-    s = normalize_text(val)
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.lower()
 
-    s = re.sub(r"[^a-z0-9_]+", "_", s)
-    s = re.sub(r"_+", "_", s).strip("_")
+def stage_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame a stage writes into: the caller's frame in in-place mode, else a copy."""
+    return df if is_inplace_stages(df) else df.copy()
 
-    if not s:
-        return None
-    if not re.match(r"^[a-z_]", s):
-        s = f"_{s}"
-    return s
 
 def ensure_column_df(df: pd.DataFrame, col_name: str) -> pd.DataFrame:
     """Safely adds columns to results dataframe."""
@@ -93,33 +93,3 @@ def require_columns_df(df: pd.DataFrame, required: List[str], sheet_name: str =
     if missing:
         where = f" in result sheet '{sheet_name}'" if sheet_name else ""
         raise ValueError(f"Missing required columns{where}: {missing}")
-
-def normalize_id_token(val: Any) -> Optional[str]:
-    """
-    Mirror: Ensures Branch/Item IDs in Results match those in Structure.
-    """
-    if val is None:
-        return None
-    try:
-        if pd.isna(val):
-            return None
-    except Exception:
-        pass
-
-    s = str(val).strip()
-    if s.lower() in _MISSING_TOKENS:
-        return None
-
-    if isinstance(val, (int, float)):
-        f_val = float(val)
-        if f_val.is_integer():
-            return str(int(f_val))
-        return s.rstrip("0").rstrip(".")
-
-    try:
-        f = float(s)
-        if f.is_integer():
-            return str(int(f))
-        return str(f).rstrip("0").rstrip(".")
-    except Exception:
-        return s
\ No newline at end of file
@@ -25,18 +25,23 @@
 #
 # Produces (derived columns):
 # - ANSWER_TEXT_CLEAN, ANSWER_CODE, ANSWER_FEATURE_NAME
+#
+# Performance:
+# - Answers come from a tiny vocabulary: every distinct answer text is
+#   cleaned and slugged once (factorize, then broadcast by position),
+#   and the feature name is one masked string concatenation.
 # ============================================================
 
 from __future__ import annotations
-from typing import Optional, Tuple
 import pandas as pd
 
 from core_utilities_results_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
+    clean_text_series,
+    to_uvl_code_series,
+    is_missing_like_series,
     ensure_column_df,
     require_columns_df,
+    stage_frame,
 )
 
 def process_result_answer_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.DataFrame:
@@ -44,35 +49,22 @@ def process_result_answer_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.
     Identical mirroring of namespacing logic to ensure canonical parity.
     """
     require_columns_df(df, ["ITEM_FEATURE_NAME", "CHOICE_VALUE_OPTION_NAME"], sheet_name)
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, "ANSWER_TEXT_CLEAN")
     ensure_column_df(df, "ANSWER_CODE")
     ensure_column_df(df, "ANSWER_FEATURE_NAME")
 
-    def _encode_row(row) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        item_feat = row["ITEM_FEATURE_NAME"]
-        raw_ans = row["CHOICE_VALUE_OPTION_NAME"]
-
-        if is_missing_like(item_feat) or is_missing_like(raw_ans):
-            return None, None, None
-
-        ans_clean = normalize_text(raw_ans).strip() or None
-        if not ans_clean:
-            return None, None, None
-
-        ans_code = to_uvl_code(ans_clean)
-        if not ans_code:
-            return None, None, None
-
-        ans_feat = f"{item_feat}__{ans_code}"
-        return ans_clean, ans_code, ans_feat
+    ans_clean = clean_text_series(df["CHOICE_VALUE_OPTION_NAME"])
+    ans_code = to_uvl_code_series(ans_clean)
 
-    encoded = df.apply(_encode_row, axis=1, result_type="expand")
-    encoded.columns = ["ANSWER_TEXT_CLEAN", "ANSWER_CODE", "ANSWER_FEATURE_NAME"]
+    # all three are set together: item feature present, answer present, answer code non-empty
+    ok = ~is_missing_like_series(df["ITEM_FEATURE_NAME"]) & ans_code.notna()
+    ans_feat = df["ITEM_FEATURE_NAME"].where(ok, "").astype(str) + "__" + ans_code.where(ok, "")
 
-    df["ANSWER_TEXT_CLEAN"] = encoded["ANSWER_TEXT_CLEAN"]
-    df["ANSWER_CODE"] = encoded["ANSWER_CODE"]
-    df["ANSWER_FEATURE_NAME"] = encoded["ANSWER_FEATURE_NAME"]
+    # object first: where() on a str-dtype column would put NaN, not None, in the masked cells
+    df["ANSWER_TEXT_CLEAN"] = ans_clean.astype(object).where(ok, None)
+    df["ANSWER_CODE"] = ans_code.astype(object).where(ok, None)
+    df["ANSWER_FEATURE_NAME"] = ans_feat.astype(object).where(ok, None)
 
     return df
\ No newline at end of file
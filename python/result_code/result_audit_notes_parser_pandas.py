@@ -12,7 +12,7 @@
 from __future__ import annotations
 import pandas as pd
 import re
-from results_pipeline.core_utilities_results_pandas import normalize_text, ensure_column_df
+from results_pipeline.core_utilities_results_pandas import normalize_text, ensure_column_df, stage_frame
 
 def process_visit_notes_splitting(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -22,7 +22,7 @@ def process_visit_notes_splitting(df: pd.DataFrame) -> pd.DataFrame:
     if target_col not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
     
     # الأعمدة الجديدة المستهدفة
     new_cols = ["NOTES_GENERAL", "NOTES_DEVELOPMENTAL", "NOTES_NC_EVIDENCE"]
@@ -23,13 +23,14 @@ from results_pipeline.core_utilities_results_pandas import (
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 def process_result_audit_parties_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Standardizes names of auditors and auditees for reporting and logic modeling.
     """
-    df = df.copy()
+    df = stage_frame(df)
 
     # 1. Processing AUDITOR (The Fixed List)
     if "AUDITOR" in df.columns:
@@ -11,7 +11,7 @@
 
 from __future__ import annotations
 import pandas as pd
-from results_pipeline.core_utilities_results_pandas import normalize_text, is_missing_like
+from results_pipeline.core_utilities_results_pandas import normalize_text, is_missing_like, stage_frame
 
 def map_multi_auditees_bilingual(results_df: pd.DataFrame, users_df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -39,7 +39,7 @@ def map_multi_auditees_bilingual(results_df: pd.DataFrame, users_df: pd.DataFram
             norm_en = normalize_text(en_name).replace(" ", "")
             user_map[norm_en] = (en_name, off_id)
 
-    results_df = results_df.copy()
+    results_df = stage_frame(results_df)
 
     def _process_cell(raw_cell):
         """تفكيك الخلية والبحث في القاموس الثنائي اللغة."""
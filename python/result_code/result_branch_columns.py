@@ -17,6 +17,7 @@ from core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
     normalize_id_token,
+    stage_frame,
 )
 
 def process_result_branch_columns(
@@ -27,7 +28,7 @@ def process_result_branch_columns(
     if "BRANCH_ID" not in df.columns or "BRANCH_NAME" not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, "BRANCH_LABEL_CLEAN")
     ensure_column_df(df, "ENTITY_TYPE")
@@ -22,6 +22,7 @@ import pandas as pd
 from results_pipeline.core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 def process_result_bulk_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -35,7 +36,7 @@ def process_result_bulk_datetime_columns(df: pd.DataFrame) -> pd.DataFrame:
         "DATE_VISIT_APPROVED"
     ]
 
-    df = df.copy()
+    df = stage_frame(df)
 
     for col in date_columns:
         if col not in df.columns:
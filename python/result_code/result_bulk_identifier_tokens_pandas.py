@@ -24,6 +24,7 @@ from results_pipeline.core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
     normalize_id_token,
+    stage_frame,
 )
 
 def process_result_bulk_identifier_tokens(df: pd.DataFrame) -> pd.DataFrame:
@@ -43,7 +44,7 @@ def process_result_bulk_identifier_tokens(df: pd.DataFrame) -> pd.DataFrame:
         "CHOICE_VALUE_OPTION_ID"
     ]
 
-    df = df.copy()
+    df = stage_frame(df)
 
     for col in id_columns:
         if col not in df.columns:
@@ -24,6 +24,7 @@ import pandas as pd
 from results_pipeline.core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 def process_result_bulk_numeric_metrics(df: pd.DataFrame) -> pd.DataFrame:
@@ -44,7 +45,7 @@ def process_result_bulk_numeric_metrics(df: pd.DataFrame) -> pd.DataFrame:
         "OVERALL_VISIT_RESULT_SCORE"
     ]
 
-    df = df.copy()
+    df = stage_frame(df)
 
     for col in metric_columns:
         if col not in df.columns:
@@ -25,6 +25,7 @@ import re
 from results_pipeline.core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 def process_result_business_identifiers(df: pd.DataFrame) -> pd.DataFrame:
@@ -33,7 +34,7 @@ def process_result_business_identifiers(df: pd.DataFrame) -> pd.DataFrame:
     """
     target_columns = ["RESULTCODE", "SOLUTION_CODE"]
     
-    df = df.copy()
+    df = stage_frame(df)
 
     for col in target_columns:
         if col not in df.columns:
@@ -20,6 +20,7 @@ from core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
     require_columns_df,
+    stage_frame,
 )
 
 def process_result_category_df(
@@ -29,7 +30,7 @@ def process_result_category_df(
 ) -> pd.DataFrame:
     # In Results, we assume the same column name for consistency; if different, adjust here.
     require_columns_df(df, ["CHECK_CATEGORY_NAME"], sheet_name)
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, "CATEGORY_NAME_CLEAN")
     ensure_column_df(df, "CATEGORY_NAME_HARMONIZED")
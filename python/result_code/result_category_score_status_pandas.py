@@ -17,6 +17,7 @@ from results_pipeline.core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
     normalize_id_token,
+    stage_frame,
 )
 
 def process_result_category_score_status_columns(
@@ -32,7 +33,7 @@ def process_result_category_score_status_columns(
     if target_col not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, f"{target_col}_CLEAN")
     ensure_column_df(df, f"{target_col}_CODE")
@@ -38,6 +38,7 @@ from core_utilities_results_pandas import (
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 _ALLOWED = {"major", "minor"}
@@ -49,7 +50,7 @@ def process_result_item_classification_columns(df: pd.DataFrame) -> pd.DataFrame
     if "ITEM_CLASSIFICATION_NAME" not in df.columns or "ITEM_FEATURE_NAME" not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, "ITEM_CLASSIFICATION_NAME_CLEAN")
     ensure_column_df(df, "ITEM_CLASSIFICATION_CODE")
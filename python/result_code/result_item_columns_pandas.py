@@ -24,19 +24,25 @@
 #
 # Produces (derived columns):
 # - ITEM_NAME_CLEAN, ITEM_TEXT_CODE, ITEM_KEY, ITEM_FEATURE_NAME
+#
+# Columnar build (same rules as structure_item_columns_pandas):
+# - Names are cleaned / slugged and IDs tokenized once per distinct value;
+#   key and feature strings are concatenated under row masks.
+# - Unlike Structure, a partial row still gets a feature:
+#   item_{item_key} (no text code) or item__{text_code} (no key).
 # ============================================================
 
 from __future__ import annotations
-from typing import Optional, Tuple
 import pandas as pd
 
 from core_utilities_results_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
+    clean_text_series,
+    to_uvl_code_series,
     ensure_column_df,
     require_columns_df,
-    normalize_id_token,
+    normalize_id_token_series,
+    is_present_series,
+    stage_frame,
 )
 
 def process_result_item_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.DataFrame:
@@ -44,42 +50,36 @@ def process_result_item_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.Da
     Mirroring the structure logic to maintain identical ITEM_FEATURE_NAME across pipelines.
     """
     require_columns_df(df, ["CHECK_ITEM_NAME", "CHECK_ITEM_ID", "CHECK_CATEGORY_ID", "ISSUE_NUMBER"], sheet_name)
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, "ITEM_NAME_CLEAN")
     ensure_column_df(df, "ITEM_TEXT_CODE")
     ensure_column_df(df, "ITEM_KEY")
     ensure_column_df(df, "ITEM_FEATURE_NAME")
 
-    def _build_row(row) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
-        raw_name = row["CHECK_ITEM_NAME"]
-        item_clean = normalize_text(raw_name).strip() or None if not is_missing_like(raw_name) else None
-        item_text_code = to_uvl_code(item_clean) if item_clean else None
-
-        item_id_s = normalize_id_token(row["CHECK_ITEM_ID"])
-        cat_id_s = normalize_id_token(row["CHECK_CATEGORY_ID"])
-        issue_s = normalize_id_token(row["ISSUE_NUMBER"])
-
-        item_key = (f"cat{cat_id_s}__iss{issue_s}__item{item_id_s}" 
-                    if (cat_id_s and issue_s and item_id_s) else None)
+    item_clean = clean_text_series(df["CHECK_ITEM_NAME"])
+    item_text_code = to_uvl_code_series(item_clean)
 
-        if item_key and item_text_code:
-            item_feature = f"item_{item_key}__{item_text_code}"
-        elif item_key:
-            item_feature = f"item_{item_key}"
-        elif item_text_code:
-            item_feature = f"item__{item_text_code}"
-        else:
-            item_feature = None
+    item_id_s = normalize_id_token_series(df["CHECK_ITEM_ID"])
+    cat_id_s = normalize_id_token_series(df["CHECK_CATEGORY_ID"])
+    issue_s = normalize_id_token_series(df["ISSUE_NUMBER"])
 
-        return item_clean, item_text_code, item_key, item_feature
+    has_key = is_present_series(cat_id_s) & is_present_series(issue_s) & is_present_series(item_id_s)
+    item_key = ("cat" + cat_id_s.where(has_key, "") + "__iss" + issue_s.where(has_key, "")
+                + "__item" + item_id_s.where(has_key, ""))
+    item_key = item_key.where(has_key, None).astype(object)
 
-    out = df.apply(_build_row, axis=1, result_type="expand")
-    out.columns = ["ITEM_NAME_CLEAN", "ITEM_TEXT_CODE", "ITEM_KEY", "ITEM_FEATURE_NAME"]
+    # item_{key}__{code} / item_{key} / item__{code} / None
+    has_code = is_present_series(item_text_code)
+    key_s = item_key.where(has_key, "")
+    code_s = item_text_code.where(has_code, "")
+    code_only = ("item__" + code_s).where(has_code, None)
+    key_only = ("item_" + key_s).where(has_key, code_only)
+    item_feature = ("item_" + key_s + "__" + code_s).where(has_key & has_code, key_only).astype(object)
 
-    df["ITEM_NAME_CLEAN"] = out["ITEM_NAME_CLEAN"]
-    df["ITEM_TEXT_CODE"] = out["ITEM_TEXT_CODE"]
-    df["ITEM_KEY"] = out["ITEM_KEY"]
-    df["ITEM_FEATURE_NAME"] = out["ITEM_FEATURE_NAME"]
+    df["ITEM_NAME_CLEAN"] = item_clean
+    df["ITEM_TEXT_CODE"] = item_text_code
+    df["ITEM_KEY"] = item_key
+    df["ITEM_FEATURE_NAME"] = item_feature
 
     return df
\ No newline at end of file
@@ -10,7 +10,7 @@ from __future__ import annotations
 from typing import Dict
 import pandas as pd
 from results_pipeline.core_utilities_results_pandas import (
-    normalize_text, to_uvl_code, is_missing_like, ensure_column_df
+    normalize_text, to_uvl_code, is_missing_like, ensure_column_df, stage_frame
 )
 
 def process_result_item_score_status_columns(
@@ -26,7 +26,7 @@ def process_result_item_score_status_columns(
     if target_col not in df.columns or key_col not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
     ensure_column_df(df, f"{target_col}_CODE")
 
     def _encode_result(row):
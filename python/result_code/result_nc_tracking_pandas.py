@@ -17,6 +17,7 @@ from results_pipeline.core_utilities_results_pandas import (
     is_missing_like,
     ensure_column_df,
     to_uvl_code,
+    stage_frame,
 )
 
 def process_result_nc_tracking(df: pd.DataFrame) -> pd.DataFrame:
@@ -33,7 +34,7 @@ def process_result_nc_tracking(df: pd.DataFrame) -> pd.DataFrame:
         "NC_FOLLOW_UP_EFFECTIVENESS"
     ]
 
-    df = df.copy()
+    df = stage_frame(df)
     key_col = "ITEM_KEY" # المفتاح الذي يضمن عدم التكرار (cat__iss__item)
 
     # التحقق من وجود المفتاح قبل البدء
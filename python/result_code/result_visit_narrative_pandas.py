@@ -25,6 +25,7 @@ from results_pipeline.core_utilities_results_pandas import (
     normalize_text,
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 def process_result_visit_narrative_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -36,7 +37,7 @@ def process_result_visit_narrative_columns(df: pd.DataFrame) -> pd.DataFrame:
     if target_col not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, f"{target_col}_CLEAN")
 
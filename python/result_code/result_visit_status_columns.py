@@ -27,6 +27,7 @@ from results_pipeline.core_utilities_results_pandas import (
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 def process_result_visit_status_columns(
@@ -42,7 +43,7 @@ def process_result_visit_status_columns(
     if target_col not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     # Initialize derived columns for cleaning and UVL coding
     ensure_column_df(df, "VISIT_STATUS_CLEAN")
@@ -35,6 +35,7 @@ from core_utilities_results_pandas import (
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 _COL_RAW = "AUDIT_TYPE"
@@ -48,7 +49,7 @@ def process_result_audit_type_df(df: pd.DataFrame, sheet_name: str) -> pd.DataFr
     if _COL_RAW not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     ensure_column_df(df, _COL_CLEAN)
     ensure_column_df(df, _COL_CODE)
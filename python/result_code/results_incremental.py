@@ -0,0 +1,204 @@
+# results_pipeline/results_incremental.py
+# ============================================================
+# Incremental Results Import (watermark per result sheet)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Visit history only grows, so a run only has to process the rows of
+#   visits it has not seen yet. All result stages are row-local, so
+#   processing a subset of visits gives the same rows as a full run.
+# - Watermark per sheet = {visit key: row count} of every processed
+#   visit (visit key = VISIT_ID normalized like VISIT_ID_CLEAN; rows
+#   without an ID share the "" key). A visit is (re)processed when it is
+#   new or its row count changed; its previous rows are replaced.
+#   A VISIT_DATE watermark would skip back-dated visits entered late,
+#   hence the VISIT_ID set.
+# - Rows are returned (and stored) in the order of the current sheet, as
+#   a full run writes them: the j-th stored row of a visit takes the
+#   position of the j-th row of that visit in the sheet. Stored visits
+#   no longer in the sheet are dropped, as a full run would not write
+#   them. Cell types of mixed-type columns are kept by the ColumnarStore.
+# - Processed rows and their match flags (MATCH_FLAG_COLS) are kept in
+#   a ColumnarStore that is NOT keyed by workbook hash (every import
+#   changes the workbook). The sheet summary is recomputed from all
+#   stored flags.
+# - Stored flags depend on the structure reference: when its digest
+#   changed (or is unknown), stored rows are re-matched only; the
+#   stages are not re-run.
+# - reset() forgets a sheet (full rebuild on demand).
+#
+# LAYOUT:
+#   <root>/<key>/manifest.json, <sheet>.parquet, <sheet>__match_flags.parquet
+#   <root>/<key>/watermarks.json   sheet -> visits, reference digest, struct sheet
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from pipeline_store.columnar_store import ColumnarStore
+from results_pipeline.core_utilities_results_pandas import is_missing_like, map_distinct, normalize_id_token
+from results_pipeline.results_matcher import MATCH_FLAG_COLS, match_results_df_to_structure, summarize_match_flags
+
+WATERMARK_VERSION = 1
+WATERMARK_FILE = "watermarks.json"
+VISIT_ID_COL = "VISIT_ID"
+FLAGS_SUFFIX = "__match_flags"
+
+
+def _visit_key(val: Any) -> str:
+    if val is None or is_missing_like(val):
+        return ""
+    return normalize_id_token(val) or ""
+
+
+def _match_flags(matching: Dict[str, pd.DataFrame], n_rows: int) -> pd.DataFrame:
+    """MATCH_FLAG_COLS of a matcher result; all False when no structure sheet matched ({})."""
+    if matching:
+        return matching["processed_df"][MATCH_FLAG_COLS].reset_index(drop=True)
+    return pd.DataFrame(False, index=pd.RangeIndex(n_rows), columns=MATCH_FLAG_COLS)
+
+
+def _struct_key(matching: Dict[str, pd.DataFrame]) -> Optional[str]:
+    return matching["summary"]["matched_with_struct"].iat[0] if matching else None
+
+
+def visit_keys(df: pd.DataFrame) -> pd.Series:
+    """Per-row visit key (same token as VISIT_ID_CLEAN, "" when missing)."""
+    if VISIT_ID_COL not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return map_distinct(df[VISIT_ID_COL], _visit_key)
+
+
+def _source_positions(row_keys: pd.Series, sheet_keys: pd.Series) -> np.ndarray:
+    """Sheet position of each row: the j-th row of visit k sits where the sheet has its j-th k."""
+    def ranked(keys: pd.Series) -> pd.DataFrame:
+        keys = keys.reset_index(drop=True)
+        return pd.DataFrame({"key": keys, "nth": keys.groupby(keys).cumcount()})
+
+    src = ranked(sheet_keys)
+    src["pos"] = np.arange(len(src), dtype=float)
+    pos = ranked(row_keys).merge(src, on=["key", "nth"], how="left")["pos"]
+    return pos.fillna(np.inf).to_numpy()
+
+
+class IncrementalResultsStore:
+    """Processed result rows + per-sheet visit watermark, persisted across runs and workbooks."""
+
+    def __init__(self, root: str | Path, key: str) -> None:
+        self.store = ColumnarStore(root, key)
+        self._state_path = self.store.dir / WATERMARK_FILE
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if self._state_path.exists():
+            try:
+                payload = json.loads(self._state_path.read_text(encoding="utf-8"))
+                if payload.get("version") == WATERMARK_VERSION:
+                    self._state = dict(payload.get("sheets", {}))
+            except Exception:
+                self._state = {}
+
+    def _save_state(self) -> None:
+        tmp = self._state_path.with_name(self._state_path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": WATERMARK_VERSION, "sheets": self._state}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self._state_path)
+
+    def _has_rows(self, sheet: str) -> bool:
+        state = self._state.get(sheet)
+        return bool(state and state.get("visits")) and self.store.has(sheet) and self.store.has(sheet + FLAGS_SUFFIX)
+
+    def reset(self, sheet: str) -> None:
+        """Forget everything processed for this sheet; the next commit starts from scratch."""
+        if self._state.pop(sheet, None) is not None:
+            self._save_state()
+
+    def pending(self, sheet: str, df_raw: pd.DataFrame) -> Tuple[pd.DataFrame, Set[str], pd.Series]:
+        """
+        Rows of new or changed visits (index reset), the keys of those
+        visits and the visit key of every sheet row (pass it to commit()).
+        """
+        keys = visit_keys(df_raw)
+        seen = self._state[sheet]["visits"] if self._has_rows(sheet) else {}
+        counts = keys.value_counts()
+        dirty = {k for k, n in counts.items() if seen.get(k) != int(n)}
+        mask = keys.isin(dirty).to_numpy()
+        return df_raw.loc[mask].reset_index(drop=True), dirty, keys.reset_index(drop=True)
+
+    def commit(
+        self,
+        sheet: str,
+        processed_new: Optional[pd.DataFrame],
+        matching_new: Optional[Dict[str, pd.DataFrame]],
+        dirty: Set[str],
+        full_ref: Dict[str, Any],
+        sheet_keys: Optional[pd.Series] = None,
+        reference_digest: Optional[str] = None,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Replaces the rows of the dirty visits with processed_new (the
+        pipeline + matcher output for pending() rows; None when there
+        were none). With sheet_keys (from pending()), stored visits that
+        are no longer in the sheet are dropped and the rows come back in
+        sheet order. Returns all processed rows of the sheet and the
+        summary over all of them.
+        """
+        state = self._state.get(sheet, {})
+        frames, flags = [], []
+        visits: Dict[str, int] = {}
+        struct_key = state.get("matched_with_struct")
+        changed = bool(dirty) or not self._has_rows(sheet)
+
+        if self._has_rows(sheet):
+            prev = self.store.load(sheet)
+            prev_flags = self.store.load(sheet + FLAGS_SUFFIX)
+            prev_keys = visit_keys(prev)
+            keep = ~prev_keys.isin(dirty).to_numpy()
+            gone: Set[str] = set()
+            if sheet_keys is not None:
+                # visits deleted from the sheet: a full run would not write them
+                gone = set(prev_keys.unique()) - set(sheet_keys.unique())
+                if gone:
+                    keep &= ~prev_keys.isin(gone).to_numpy()
+                    changed = True
+            prev = prev.loc[keep].reset_index(drop=True)
+            prev_flags = prev_flags.loc[keep].reset_index(drop=True)
+            if reference_digest is None or state.get("reference_digest") != reference_digest:
+                # structure changed since these rows were matched: re-match them (stages are not re-run)
+                rematch = match_results_df_to_structure(prev, full_ref, sheet)
+                prev_flags = _match_flags(rematch, len(prev))
+                struct_key = _struct_key(rematch)
+                changed = True
+            frames.append(prev)
+            flags.append(prev_flags)
+            visits = {k: n for k, n in state["visits"].items() if k not in dirty and k not in gone}
+
+        if processed_new is not None and len(processed_new):
+            frames.append(processed_new.reset_index(drop=True))
+            flags.append(_match_flags(matching_new, len(processed_new)))
+            struct_key = _struct_key(matching_new)
+            visits.update({k: int(n) for k, n in visit_keys(processed_new).value_counts().items()})
+
+        all_rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        all_flags = pd.concat(flags, ignore_index=True) if flags else pd.DataFrame(columns=MATCH_FLAG_COLS, dtype=bool)
+        if sheet_keys is not None and len(all_rows):
+            order = np.argsort(_source_positions(visit_keys(all_rows), sheet_keys), kind="stable")
+            if (order != np.arange(len(order))).any():
+                all_rows = all_rows.take(order).reset_index(drop=True)
+                all_flags = all_flags.take(order).reset_index(drop=True)
+                changed = True
+
+        if changed:
+            self.store.save(sheet, all_rows, stage="results")
+            self.store.save(sheet + FLAGS_SUFFIX, all_flags, stage="match_flags")
+        self._state[sheet] = {
+            "visits": visits,
+            "reference_digest": reference_digest,
+            "matched_with_struct": struct_key,
+        }
+        self._save_state()
+        return all_rows, summarize_match_flags(all_flags, sheet, struct_key)
@@ -6,15 +6,22 @@
 # - Matches Results with Structure based on sheet numeric suffixes.
 # - Transfers VISIT_RESULT_SCORE_STATUS_CODE from Structure to Results.
 # - Handles "Planned" audit type logic and "Missing Item" exceptions.
+# - Fully vectorized: one isin/map per column against the structure
+#   reference (no per-row loop), so a year of visits matches in well
+#   under a second.
 # ============================================================
 
 from __future__ import annotations
-from typing import Dict, List, Set, Any
+from typing import Callable, Dict, List, Optional, Set, Any
 import pandas as pd
 import re
 
 # استيراد الأدوات المساعدة
-from results_pipeline.core_utilities_results_pandas import is_missing_like
+from results_pipeline.core_utilities_results_pandas import (
+    is_missing_like_series,
+    is_inplace_stages,
+    clear_inplace_stages,
+)
 
 # --- CONFIG: أعمدة الستركشر ---
 STRUCT_ITEM_FEATURE_COL    = "ITEM_FEATURE_NAME"
@@ -29,20 +36,43 @@ RES_ANS_FEATURE_COL        = "ANSWER_FEATURE_NAME"
 RES_PLAN_CODE_COL          = "AUDIT_PLAN_CODE"
 RES_AUDIT_TYPE_CODE_COL    = "AUDIT_TYPE_CODE"
 
+# أعمدة الستركشر التي يُبنى منها المرجع (ومنها تُحسب بصمة المرجع المخزّن)
+STRUCT_REFERENCE_COLS = [
+    STRUCT_ITEM_FEATURE_COL,
+    STRUCT_SCORE_STATUS_COL,
+    STRUCT_ANS_FEATURE_COL,
+    STRUCT_PLAN_CODE_COL,
+]
 
-def build_structure_reference_from_workbook(xlsx_path: str, structure_sheets: List[str]) -> Dict[str, Dict[str, Any]]:
-    """يبني مرجعاً من الستركشر مع الاحتفاظ بنتيجة التقييم والبنود والإجابات."""
+# أعمدة التتبع التي يضيفها المطابق لكل صف (ومنها يُحسب الملخص)
+MATCH_FLAG_COLS = ["_item_ok", "_ans_ok", "_plan_ok"]
+
+
+def build_structure_reference_from_workbook(
+    xlsx_path: str,
+    structure_sheets: List[str],
+    read_sheet: Optional[Callable[[str], pd.DataFrame]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    يبني مرجعاً من الستركشر مع الاحتفاظ بنتيجة التقييم والبنود والإجابات.
+    read_sheet: optional loader (e.g. the columnar store); defaults to pd.read_excel.
+    """
+    if read_sheet is None:
+        read_sheet = lambda sh: pd.read_excel(xlsx_path, sheet_name=sh)  # noqa: E731
+    return build_structure_reference({sh: read_sheet(sh) for sh in structure_sheets})
+
+
+def build_structure_reference(structure_frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+    """Same reference as build_structure_reference_from_workbook, from sheets already loaded."""
     reference = {}
-    for sh in structure_sheets:
-        df = pd.read_excel(xlsx_path, sheet_name=sh)
-        
+    for sh, df in structure_frames.items():
         # استخراج البنود مع حالاتها (Score Status)
         items_map = {}
         if STRUCT_ITEM_FEATURE_COL in df.columns:
             # نأخذ البند والنتيجة المقابلة له
             sub_df = df[[STRUCT_ITEM_FEATURE_COL, STRUCT_SCORE_STATUS_COL]].dropna(subset=[STRUCT_ITEM_FEATURE_COL])
-            for _, row in sub_df.iterrows():
-                items_map[row[STRUCT_ITEM_FEATURE_COL]] = row[STRUCT_SCORE_STATUS_COL]
+            # آخر ظهور للبند هو المعتمد (نفس سلوك الكتابة المتتالية في القاموس)
+            items_map = dict(zip(sub_df[STRUCT_ITEM_FEATURE_COL], sub_df[STRUCT_SCORE_STATUS_COL]))
         
         answers = set(df[STRUCT_ANS_FEATURE_COL].dropna().unique()) if STRUCT_ANS_FEATURE_COL in df.columns else set()
         plans = set(df[STRUCT_PLAN_CODE_COL].dropna().unique()) if STRUCT_PLAN_CODE_COL in df.columns else set()
@@ -55,6 +85,13 @@ def build_structure_reference_from_workbook(xlsx_path: str, structure_sheets: Li
     return reference
 
 
+def _column_or_none(df: pd.DataFrame, col: str) -> pd.Series:
+    """العمود إن وُجد، وإلا عمود فارغ (None) بنفس الفهرس."""
+    if col in df.columns:
+        return df[col]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
 def match_results_df_to_structure(df_results: pd.DataFrame, full_ref: Dict[str, Any], result_sheet_name: str) -> Dict[str, pd.DataFrame]:
     """يطابق النتائج بالستركشر وينقل عمود Score Status لضمان سلامة الـ UVL."""
     
@@ -66,43 +103,28 @@ def match_results_df_to_structure(df_results: pd.DataFrame, full_ref: Dict[str,
     if not target_struct_key: return {}
 
     ref = full_ref[target_struct_key]
-    df = df_results.copy()
+    # in-place mode: a shallow copy is enough, only new tracking columns are written below
+    df = clear_inplace_stages(df_results.copy(deep=not is_inplace_stages(df_results)))
     
-    # تحضير أعمدة التتبع
-    df["_item_ok"] = False
-    df["_ans_ok"] = False
-    df["STRUCT_SCORE_STATUS"] = None # العمود الذي سيتم نقله من الستركشر
+    items_map = ref["items_map"]
+    item_vals = _column_or_none(df, RES_ITEM_FEATURE_COL)
+    ans_vals = _column_or_none(df, RES_ANS_FEATURE_COL)
 
     # 2. منطق مطابقة البنود والإجابات + نقل الـ Score Status
-    for idx, row in df.iterrows():
-        item_val = row.get(RES_ITEM_FEATURE_COL)
-        ans_val = row.get(RES_ANS_FEATURE_COL)
-        
-        # معالجة استثناء البند الفارغ (زيارة تذكيرية)
-        if is_missing_like(item_val):
-            df.at[idx, "_item_ok"] = True
-            df.at[idx, "_ans_ok"] = True
-            continue
-            
-        # المطابقة الفعلية للبند
-        if item_val in ref["items_map"]:
-            df.at[idx, "_item_ok"] = True
-            # نقل الـ Score Status من المرجع إلى صف النتيجة
-            df.at[idx, "STRUCT_SCORE_STATUS"] = ref["items_map"][item_val]
-            
-        # المطابقة الفعلية للإجابة
-        if is_missing_like(ans_val) or ans_val in ref["answers"]:
-            df.at[idx, "_ans_ok"] = True
+    # معالجة استثناء البند الفارغ (زيارة تذكيرية): البند والإجابة مقبولان
+    item_missing = is_missing_like_series(item_vals)
+    item_hit = ~item_missing & item_vals.isin(items_map.keys())
+    ans_hit = is_missing_like_series(ans_vals) | ans_vals.isin(ref["answers"])
 
-    # 3. منطق مطابقة الخطة الشرطية (Planned Only)
-    def check_plan_logic(row):
-        audit_type_code = str(row.get(RES_AUDIT_TYPE_CODE_COL, "")).lower().strip()
-        plan_code = row.get(RES_PLAN_CODE_COL)
-        if audit_type_code == "planned":
-            return plan_code in ref["plans"]
-        return True
+    df["_item_ok"] = item_missing | item_hit
+    df["_ans_ok"] = item_missing | ans_hit
+    # نقل الـ Score Status من المرجع إلى صفوف البنود المطابقة فقط
+    df["STRUCT_SCORE_STATUS"] = item_vals.map(items_map).astype(object).where(item_hit, None)
 
-    df["_plan_ok"] = df.apply(check_plan_logic, axis=1)
+    # 3. منطق مطابقة الخطة الشرطية (Planned Only)
+    audit_type = _column_or_none(df, RES_AUDIT_TYPE_CODE_COL)
+    planned = audit_type.astype(str).str.lower().str.strip().eq("planned")
+    df["_plan_ok"] = ~planned | _column_or_none(df, RES_PLAN_CODE_COL).isin(ref["plans"])
 
     # 4. تجهيز التقارير
     available_opt = [c for c in ["VISIT_ID", "VISIT_DATE", "CHECK_ITEM_NAME", "BRANCH_NAME", RES_AUDIT_TYPE_CODE_COL] if c in df.columns]
@@ -111,21 +133,23 @@ def match_results_df_to_structure(df_results: pd.DataFrame, full_ref: Dict[str,
     unmatched_answers = df[~df["_ans_ok"]][[RES_ANS_FEATURE_COL] + available_opt].copy()
     unmatched_plans = df[~df["_plan_ok"]][[RES_PLAN_CODE_COL] + available_opt].copy()
 
-    # ملخص النتائج النهائي
-    summary = pd.DataFrame([{
-        "result_sheet": result_sheet_name,
-        "matched_with_struct": target_struct_key,
-        "total_records": len(df),
-        "items_ok": df["_item_ok"].sum(),
-        "answers_ok": df["_ans_ok"].sum(),
-        "plans_ok": df["_plan_ok"].sum(),
-        "status": "PASS" if (df["_item_ok"].all() and df["_plan_ok"].all()) else "FAIL"
-    }])
-
     return {
         "processed_df": df, # أعدنا الـ DataFrame المعالج ليستخدمه الرنر
-        "summary": summary,
+        "summary": summarize_match_flags(df, result_sheet_name, target_struct_key),
         "unmatched_items": unmatched_items,
         "unmatched_answers": unmatched_answers,
         "unmatched_plans": unmatched_plans
-    }
\ No newline at end of file
+    }
+
+
+def summarize_match_flags(flags: pd.DataFrame, result_sheet_name: str, target_struct_key: str) -> pd.DataFrame:
+    """ملخص النتائج النهائي من أعمدة التتبع (MATCH_FLAG_COLS) لأي مجموعة صفوف مطابَقة."""
+    return pd.DataFrame([{
+        "result_sheet": result_sheet_name,
+        "matched_with_struct": target_struct_key,
+        "total_records": len(flags),
+        "items_ok": flags["_item_ok"].sum(),
+        "answers_ok": flags["_ans_ok"].sum(),
+        "plans_ok": flags["_plan_ok"].sum(),
+        "status": "PASS" if (flags["_item_ok"].all() and flags["_plan_ok"].all()) else "FAIL"
+    }])
@@ -0,0 +1,189 @@
+# results_pipeline/results_reference_cache.py
+# ============================================================
+# Persisted Structure Reference (RESULTS matcher)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - The matcher reference (items_map with score status, answers and
+#   plans per ISO_Check_ sheet) is pickled once per structure digest:
+#   a SHA-256 over the sheet names and the STRUCT_REFERENCE_COLS of
+#   every structure sheet (values + dtypes, row order included).
+# - The digest needs the sheets themselves, so index.json maps a cheap
+#   source key (workbook SHA-256 + structure sheet list + where the
+#   sheets are read from + a stamp of that source) to the digest. A
+#   known source key loads the pickle without opening a single
+#   structure sheet. When the sheets come from the columnar store, the
+#   stamp covers the stored Parquet files: 101 --columnar --writeback
+#   none rewrites them without touching the workbook.
+# - An unknown source key (new or hand-edited workbook) re-reads the
+#   sheets and recomputes the digest; an unchanged structure reuses the
+#   pickle, a changed one is rebuilt. Either way the new key is indexed.
+# - The results runner rewrites the workbook (result sheets only) and
+#   calls bind() so the new file hash resolves to the same reference,
+#   like ColumnarStore.bind().
+#
+# LAYOUT:
+#   <root>/index.json            source key -> structure digest
+#   <root>/<digest16>.pkl        {"version", "digest", "sheets", "reference"}
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import json
+import os
+import pickle
+import pandas as pd
+
+from pipeline_store.columnar_store import workbook_hash
+from results_pipeline.results_matcher import STRUCT_REFERENCE_COLS, build_structure_reference
+
+# Bump whenever build_structure_reference changes what it returns
+REFERENCE_CACHE_VERSION = 1
+_INDEX_NAME = "index.json"
+# Source keys kept in the index (oldest dropped first, with their unused pickles)
+_MAX_SOURCES = 64
+
+
+def _sheet_digest(h: Any, sheet_name: str, df: pd.DataFrame) -> None:
+    present = [c for c in STRUCT_REFERENCE_COLS if c in df.columns]
+    h.update(f"sheet={sheet_name}|rows={len(df)}|".encode("utf-8"))
+    h.update(",".join(f"{c}:{df[c].dtype}" for c in present).encode("utf-8"))
+    if present and len(df):
+        h.update(pd.util.hash_pandas_object(df[present].astype(str), index=False).to_numpy().tobytes())
+
+
+def structure_digest(structure_frames: Dict[str, pd.DataFrame]) -> str:
+    """SHA-256 over exactly what build_structure_reference reads."""
+    h = hashlib.sha256(f"reference_v{REFERENCE_CACHE_VERSION}|".encode("utf-8"))
+    for sh, df in structure_frames.items():
+        _sheet_digest(h, sh, df)
+    return h.hexdigest()
+
+
+def source_key(xlsx_path: str | Path, structure_sheets: List[str], source: str = "xlsx", source_stamp: str = "") -> str:
+    parts = [
+        f"v={REFERENCE_CACHE_VERSION}",
+        f"source={source}",
+        f"stamp={source_stamp}",
+        f"workbook={workbook_hash(xlsx_path)}",
+        "sheets=" + ",".join(structure_sheets),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class StructureReferenceCache:
+    """Loads the matcher reference by source key / structure digest; builds it only when the structure changed."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._sources: Dict[str, str] = {}
+        index_path = self.root / _INDEX_NAME
+        if index_path.exists():
+            try:
+                payload = json.loads(index_path.read_text(encoding="utf-8"))
+                if payload.get("version") == REFERENCE_CACHE_VERSION:
+                    self._sources = dict(payload.get("sources", {}))
+            except Exception:
+                self._sources = {}
+        self.last_status: Optional[str] = None  # "hit" | "reused" | "built"
+        self._last: Optional[tuple] = None       # (structure_sheets, source, source_stamp, digest)
+
+    @property
+    def last_digest(self) -> Optional[str]:
+        """Structure digest of the reference returned by the last get()."""
+        return self._last[3] if self._last is not None else None
+
+    def _pickle_path(self, digest: str) -> Path:
+        return self.root / f"{digest[:16]}.pkl"
+
+    def _load(self, digest: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        path = self._pickle_path(digest)
+        if not path.exists():
+            return None
+        try:
+            with path.open("rb") as fp:
+                payload = pickle.load(fp)
+        except Exception:
+            return None
+        if payload.get("version") != REFERENCE_CACHE_VERSION or payload.get("digest") != digest:
+            return None
+        return payload["reference"]
+
+    def _dump(self, digest: str, structure_sheets: List[str], reference: Dict[str, Dict[str, Any]]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._pickle_path(digest)
+        tmp = path.with_name(path.name + ".tmp")
+        payload = {
+            "version": REFERENCE_CACHE_VERSION,
+            "digest": digest,
+            "sheets": list(structure_sheets),
+            "reference": reference,
+        }
+        with tmp.open("wb") as fp:
+            pickle.dump(payload, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _register(self, key: str, digest: str) -> None:
+        self._sources.pop(key, None)
+        self._sources[key] = digest
+        while len(self._sources) > _MAX_SOURCES:
+            self._sources.pop(next(iter(self._sources)))
+        self.root.mkdir(parents=True, exist_ok=True)
+        live = {self._pickle_path(d).name for d in self._sources.values()}
+        for stale in self.root.glob("*.pkl"):
+            if stale.name not in live:
+                stale.unlink(missing_ok=True)
+        index_path = self.root / _INDEX_NAME
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": REFERENCE_CACHE_VERSION, "sources": self._sources}, indent=1),
+            encoding="utf-8",
+        )
+        os.replace(tmp, index_path)
+
+    def get(
+        self,
+        xlsx_path: str | Path,
+        structure_sheets: List[str],
+        read_sheet: Optional[Callable[[str], pd.DataFrame]] = None,
+        source: str = "xlsx",
+        source_stamp: str = "",
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Reference for the structure sheets of xlsx_path (same value as
+        build_structure_reference_from_workbook). source names where
+        read_sheet takes the sheets from, e.g. "xlsx" or "columnar";
+        source_stamp must change whenever that source's content does
+        (e.g. ColumnarStore.content_stamp for "columnar").
+        """
+        key = source_key(xlsx_path, structure_sheets, source, source_stamp)
+        digest = self._sources.get(key)
+        if digest is not None:
+            reference = self._load(digest)
+            if reference is not None:
+                self.last_status = "hit"
+                self._last = (list(structure_sheets), source, source_stamp, digest)
+                return reference
+
+        if read_sheet is None:
+            read_sheet = lambda sh: pd.read_excel(xlsx_path, sheet_name=sh)  # noqa: E731
+        frames = {sh: read_sheet(sh) for sh in structure_sheets}
+        digest = structure_digest(frames)
+        reference = self._load(digest)
+        if reference is not None:
+            self.last_status = "reused"
+        else:
+            reference = build_structure_reference(frames)
+            self._dump(digest, structure_sheets, reference)
+            self.last_status = "built"
+        self._register(key, digest)
+        self._last = (list(structure_sheets), source, source_stamp, digest)
+        return reference
+
+    def bind(self, xlsx_path: str | Path) -> None:
+        """After rewriting the workbook without touching its structure sheets: map the new file to the last reference."""
+        if self._last is None:
+            return
+        structure_sheets, source, source_stamp, digest = self._last
+        self._register(source_key(xlsx_path, structure_sheets, source, source_stamp), digest)
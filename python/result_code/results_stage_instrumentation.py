@@ -0,0 +1,286 @@
+# results_pipeline/results_stage_instrumentation.py
+# ============================================================
+# Stage Instrumentation for run_master_pipeline (RESULTS)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - run_master_pipeline calls every stage through instr.run(name, fn, df).
+#   The default NullInstrumentation just calls fn (zero overhead).
+# - StageInstrumentation records per stage:
+#     wall time, rows in/out, columns added/removed, process RSS delta,
+#     shallow frame size in/out and the number of DataFrame.copy() calls
+#     made while the stage ran (DataFrame.copy is wrapped for the
+#     duration of the stage and restored afterwards).
+# - Optional per-stage wrappers:
+#     profile_stages     -> cProfile; .prof saved to out_dir + top entries
+#     tracemalloc_stages -> Python allocation peak / net during the stage
+#   Either accepts stage names or "all".
+# - One trace per sheet: JSON (records) or Chrome trace-event format
+#   (open in chrome://tracing or Perfetto).
+# ============================================================
+
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+import pandas as pd
+
+TRACE_FORMATS = ("json", "chrome")
+_MB = 1024.0 * 1024.0
+_PROFILE_TOP_N = 15
+
+StageSelection = Union[str, Iterable[str], None]
+
+
+def _current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _frame_mb(df: Any) -> Optional[float]:
+    # Shallow size: object columns count their pointers only (deep=True is too slow on wide sheets)
+    if not isinstance(df, pd.DataFrame):
+        return None
+    return round(float(df.memory_usage(index=True, deep=False).sum()) / _MB, 3)
+
+
+def _selects(selection: StageSelection, stage: str) -> bool:
+    if not selection:
+        return False
+    if isinstance(selection, str):
+        return selection == "all" or selection == stage
+    return "all" in selection or stage in selection
+
+
+def _safe_name(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text)
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    start_s: float
+    wall_s: float
+    rows_in: Optional[int]
+    rows_out: Optional[int]
+    cols_in: Optional[int]
+    cols_out: Optional[int]
+    cols_added: List[str] = field(default_factory=list)
+    cols_removed: List[str] = field(default_factory=list)
+    frame_mb_in: Optional[float] = None
+    frame_mb_out: Optional[float] = None
+    rss_delta_mb: Optional[float] = None
+    df_copies: int = 0
+    py_alloc_peak_mb: Optional[float] = None
+    py_alloc_net_mb: Optional[float] = None
+    profile_top: List[Dict[str, Any]] = field(default_factory=list)
+    profile_file: Optional[str] = None
+
+
+class _CopyCounter:
+    """Counts DataFrame.copy() calls while active (wraps the class attribute)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._orig: Optional[Callable] = None
+
+    def __enter__(self) -> "_CopyCounter":
+        orig = pd.DataFrame.copy
+        counter = self
+
+        def counting_copy(frame, *args, **kwargs):
+            counter.count += 1
+            return orig(frame, *args, **kwargs)
+
+        self._orig = orig
+        pd.DataFrame.copy = counting_copy
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pd.DataFrame.copy = self._orig
+
+
+class NullInstrumentation:
+    """Default: runs the stage, records nothing."""
+
+    def run(self, stage: str, fn: Callable, df: Any, *args, **kwargs):
+        return fn(df, *args, **kwargs)
+
+
+class StageInstrumentation(NullInstrumentation):
+    """Per-sheet stage recorder for run_master_pipeline."""
+
+    def __init__(
+        self,
+        sheet_name: str,
+        profile_stages: StageSelection = None,
+        tracemalloc_stages: StageSelection = None,
+        out_dir: Optional[Union[str, Path]] = None,
+        count_copies: bool = True,
+    ) -> None:
+        self.sheet_name = sheet_name
+        self.profile_stages = profile_stages
+        self.tracemalloc_stages = tracemalloc_stages
+        self.out_dir = Path(out_dir) if out_dir is not None else None
+        self.count_copies = count_copies
+        self.records: List[StageRecord] = []
+        self._t0 = time.perf_counter()
+
+    def run(self, stage: str, fn: Callable, df: Any, *args, **kwargs):
+        is_frame = isinstance(df, pd.DataFrame)
+        cols_before = list(df.columns) if is_frame else []
+        rec = StageRecord(
+            stage=stage,
+            start_s=0.0,
+            wall_s=0.0,
+            rows_in=len(df) if is_frame else None,
+            rows_out=None,
+            cols_in=len(cols_before) if is_frame else None,
+            cols_out=None,
+            frame_mb_in=_frame_mb(df),
+        )
+
+        use_profile = _selects(self.profile_stages, stage)
+        use_tracemalloc = _selects(self.tracemalloc_stages, stage)
+        started_tracemalloc = False
+        if use_tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            tracemalloc.reset_peak()
+            alloc_before = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if use_profile else None
+        copies = _CopyCounter() if self.count_copies else None
+
+        rss_before = _current_rss_bytes()
+        t_start = time.perf_counter()
+        try:
+            if copies is not None:
+                copies.__enter__()
+            if profiler is not None:
+                profiler.enable()
+            out = fn(df, *args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if copies is not None:
+                copies.__exit__(None, None, None)
+        t_end = time.perf_counter()
+        rss_after = _current_rss_bytes()
+
+        rec.start_s = round(t_start - self._t0, 6)
+        rec.wall_s = round(t_end - t_start, 6)
+        if rss_before is not None and rss_after is not None:
+            rec.rss_delta_mb = round((rss_after - rss_before) / _MB, 3)
+        if copies is not None:
+            rec.df_copies = copies.count
+        if use_tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            rec.py_alloc_peak_mb = round((peak - alloc_before) / _MB, 3)
+            rec.py_alloc_net_mb = round((current - alloc_before) / _MB, 3)
+            if started_tracemalloc:
+                tracemalloc.stop()
+        if profiler is not None:
+            self._store_profile(rec, profiler)
+
+        if isinstance(out, pd.DataFrame):
+            cols_after = list(out.columns)
+            before = set(cols_before)
+            after = set(cols_after)
+            rec.rows_out = len(out)
+            rec.cols_out = len(cols_after)
+            rec.cols_added = [c for c in cols_after if c not in before]
+            rec.cols_removed = [c for c in cols_before if c not in after]
+            rec.frame_mb_out = _frame_mb(out)
+
+        self.records.append(rec)
+        return out
+
+    def _store_profile(self, rec: StageRecord, profiler: cProfile.Profile) -> None:
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        stats.sort_stats("cumulative")
+        top = []
+        for func in stats.fcn_list[:_PROFILE_TOP_N]:
+            cc, nc, tt, ct, _ = stats.stats[func]
+            top.append({
+                "function": f"{Path(func[0]).name}:{func[1]}({func[2]})",
+                "calls": nc,
+                "tottime_s": round(tt, 6),
+                "cumtime_s": round(ct, 6),
+            })
+        rec.profile_top = top
+        if self.out_dir is not None:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{_safe_name(self.sheet_name)}__{_safe_name(rec.stage)}.prof"
+            profiler.dump_stats(str(path))
+            rec.profile_file = str(path)
+
+    # -------------------------
+    # Output
+    # -------------------------
+    def summary(self) -> pd.DataFrame:
+        cols = ["stage", "wall_s", "rows_in", "rows_out", "cols_added", "rss_delta_mb", "df_copies"]
+        df = pd.DataFrame([asdict(r) for r in self.records])
+        if df.empty:
+            return pd.DataFrame(columns=cols)
+        df["cols_added"] = df["cols_added"].apply(len)
+        return df[cols]
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        return {
+            "sheet": self.sheet_name,
+            "total_wall_s": round(sum(r.wall_s for r in self.records), 6),
+            "stages": [asdict(r) for r in self.records],
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.sheet_name}},
+        ]
+        for r in self.records:
+            args = {k: v for k, v in asdict(r).items() if k not in ("stage", "start_s", "wall_s", "profile_top")}
+            events.append({
+                "name": r.stage,
+                "cat": "results_pipeline",
+                "ph": "X",
+                "ts": round(r.start_s * 1e6, 1),
+                "dur": round(r.wall_s * 1e6, 1),
+                "pid": pid,
+                "tid": 0,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, out_dir: Optional[Union[str, Path]] = None, fmt: str = "json") -> Path:
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(f"Unknown trace format '{fmt}'. Use one of {TRACE_FORMATS}.")
+        target_dir = Path(out_dir) if out_dir is not None else (self.out_dir or Path("."))
+        target_dir.mkdir(parents=True, exist_ok=True)
+        suffix = "trace.json" if fmt == "chrome" else "stages.json"
+        path = target_dir / f"{_safe_name(self.sheet_name)}.{suffix}"
+        payload = self.to_chrome_trace() if fmt == "chrome" else self.to_json_dict()
+        path.write_text(json.dumps(payload, indent=1, ensure_ascii=False, default=str), encoding="utf-8")
+        return path
+
+    def print_summary(self, top: int = 5, stream=None) -> None:
+        stream = stream or sys.stdout
+        slowest = sorted(self.records, key=lambda r: r.wall_s, reverse=True)[:top]
+        total = sum(r.wall_s for r in self.records) or 1.0
+        for r in slowest:
+            print(
+                f"      ⏱️  {r.stage:<24} {r.wall_s:8.3f}s ({100 * r.wall_s / total:4.1f}%)"
+                f" +{len(r.cols_added)} cols, copies={r.df_copies}",
+                file=stream,
+            )
@@ -26,6 +26,7 @@ from results_pipeline.core_utilities_results_pandas import (
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
+    stage_frame,
 )
 
 # Output column constants to prevent hardcoding errors
@@ -45,7 +46,7 @@ def process_result_visit_result_status_df(
     if target_col not in df.columns:
         return df
 
-    df = df.copy()
+    df = stage_frame(df)
 
     # Initialize Clean and Code columns
     ensure_column_df(df, OUT_CLEAN)
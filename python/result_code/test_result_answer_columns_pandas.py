@@ -0,0 +1,48 @@
+# test_result_answer_columns_pandas.py
+# ============================================================
+# Cell-level parity of the column-wise answer encoder with the row-wise
+# rule it replaced (values and Python cell types, None included).
+# ============================================================
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from core_utilities_results_pandas import is_missing_like, normalize_text, to_uvl_code  # noqa: E402
+from result_answer_columns_pandas import process_result_answer_columns  # noqa: E402
+
+ANSWER_COLS = ["ANSWER_TEXT_CLEAN", "ANSWER_CODE", "ANSWER_FEATURE_NAME"]
+VALUES = [None, float("nan"), "", "  ", "Yes", " yes ", "No", "N/A", "na", "نعم", "Partially met", "-", 1, 0.5]
+
+
+def _encode_row(item_feat, raw_ans):
+    if is_missing_like(item_feat) or is_missing_like(raw_ans):
+        return None, None, None
+    ans_clean = normalize_text(raw_ans).strip() or None
+    if not ans_clean:
+        return None, None, None
+    ans_code = to_uvl_code(ans_clean)
+    if not ans_code:
+        return None, None, None
+    return ans_clean, ans_code, f"{item_feat}__{ans_code}"
+
+
+def test_answer_columns_match_row_rule_with_cell_types() -> None:
+    rng = random.Random(7)
+    n = 400
+    df = pd.DataFrame({
+        "ITEM_FEATURE_NAME": [rng.choice([None, "item_cat1__iss1__item1__x", "item__y"]) for _ in range(n)],
+        "CHOICE_VALUE_OPTION_NAME": [rng.choice(VALUES) for _ in range(n)],
+    })
+    out = process_result_answer_columns(df)
+    for i, row in enumerate(df.itertuples(index=False)):
+        expected = _encode_row(row.ITEM_FEATURE_NAME, row.CHOICE_VALUE_OPTION_NAME)
+        got = tuple(out[c].iat[i] for c in ANSWER_COLS)
+        assert [type(v) for v in got] == [type(v) for v in expected], (i, got, expected)
+        assert got == expected, (i, got, expected)
@@ -0,0 +1,57 @@
+# test_results_incremental.py
+# ============================================================
+# IncrementalResultsStore against a full run of the same sheet:
+# sheet order, cell types, and visits deleted from the sheet.
+# ============================================================
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+ri = pytest.importorskip("results_pipeline.results_incremental")
+from results_pipeline.results_matcher import match_results_df_to_structure  # noqa: E402
+
+SHEET = "visit_result1"
+REF = {"ISO_Check_category1": {"items_map": {"i1": "PASS"}, "answers": {"a1"}, "plans": set()}}
+FULL = pd.DataFrame({
+    "VISIT_ID": [1, 2, 1, 3, 2, 4, 3],
+    "CHECK_ITEM_ID": [12, "12a", 13, 14.5, "x", 7, True],
+    "ITEM_FEATURE_NAME": ["i1"] * 7,
+    "ANSWER_FEATURE_NAME": ["a1"] * 7,
+    "AUDIT_PLAN_CODE": [None] * 7,
+})
+
+
+def _run(inc, df: pd.DataFrame):
+    rows, dirty, keys = inc.pending(SHEET, df)
+    matching = match_results_df_to_structure(rows, REF, SHEET) if len(rows) else None
+    out, summary = inc.commit(SHEET, rows if len(rows) else None, matching, dirty, REF, keys, reference_digest="d")
+    return out[list(FULL.columns)], summary
+
+
+def _full_run(tmp_path, df: pd.DataFrame):
+    return _run(ri.IncrementalResultsStore(tmp_path / "fresh", "k"), df)
+
+
+def test_incremental_rows_match_full_run_in_order_and_types(tmp_path) -> None:
+    inc = ri.IncrementalResultsStore(tmp_path / "inc", "k")
+    _run(inc, FULL.iloc[[0, 1, 2, 4]].reset_index(drop=True))  # visits 1, 2
+    out, _ = _run(inc, FULL)  # visit 2 grows, 3 and 4 are new and interleaved
+    expected, _ = _full_run(tmp_path, FULL)
+    assert out.equals(expected)
+    assert [type(v) for v in out["CHECK_ITEM_ID"]] == [type(v) for v in FULL["CHECK_ITEM_ID"]]
+
+
+def test_visits_deleted_from_the_sheet_are_dropped(tmp_path) -> None:
+    inc = ri.IncrementalResultsStore(tmp_path / "inc", "k")
+    _run(inc, FULL)
+    trimmed = FULL[FULL["VISIT_ID"] != 3].reset_index(drop=True)
+    out, summary = _run(inc, trimmed)
+    expected, expected_summary = _full_run(tmp_path, trimmed)
+    assert out.equals(expected)
+    assert summary.equals(expected_summary)
+
+    # the watermark forgot visit 3: re-adding it processes its rows again
+    rows, dirty, _ = inc.pending(SHEET, FULL)
+    assert dirty == {"3"} and len(rows) == 2
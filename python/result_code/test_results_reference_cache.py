@@ -0,0 +1,60 @@
+# test_results_reference_cache.py
+# ============================================================
+# StructureReferenceCache with the columnar store as source:
+# 101 --columnar --writeback none rewrites the stored structure sheets
+# but not the workbook, so the next 202 run must not reuse the old
+# reference.
+# ============================================================
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+rrc = pytest.importorskip("results_pipeline.results_reference_cache")
+from pipeline_store.columnar_store import ColumnarStore  # noqa: E402
+
+STRUCT_SHEET = "ISO_Check_category1"
+
+
+def _get(cache, xlsx_path, store):
+    def read_sheet(name: str) -> pd.DataFrame:
+        if store.has(name):
+            return store.load(name)
+        return pd.read_excel(xlsx_path, sheet_name=name)
+
+    return cache.get(
+        xlsx_path,
+        [STRUCT_SHEET],
+        read_sheet=read_sheet,
+        source="columnar",
+        source_stamp=store.content_stamp([STRUCT_SHEET]),
+    )
+
+
+def test_columnar_rewrite_without_workbook_change_rebuilds_reference(tmp_path) -> None:
+    xlsx_path = tmp_path / "ISO_DATA_test.xlsx"
+    pd.DataFrame({"CHECK_ITEM_NAME": ["Fire exit"]}).to_excel(xlsx_path, sheet_name=STRUCT_SHEET, index=False)
+    store = ColumnarStore.for_workbook(xlsx_path, tmp_path / "columnar")
+    cache = rrc.StructureReferenceCache(tmp_path / "ref")
+
+    # first structure run left unprocessed rows (no feature columns yet)
+    store.save(STRUCT_SHEET, pd.DataFrame({"CHECK_ITEM_NAME": ["Fire exit"]}), stage="structure")
+    stale = _get(cache, xlsx_path, store)
+    assert stale[STRUCT_SHEET]["items_map"] == {}
+    _get(cache, xlsx_path, store)
+    assert cache.last_status == "hit"
+
+    # 101 --columnar --writeback none: store rewritten, workbook bytes unchanged
+    store.save(
+        STRUCT_SHEET,
+        pd.DataFrame({
+            "CHECK_ITEM_NAME": ["Fire exit"],
+            "ITEM_FEATURE_NAME": ["item_cat1__iss1__item1__fire_exit"],
+            "VISIT_RESULT_SCORE_STATUS_CODE": ["PASS"],
+        }),
+        stage="structure",
+    )
+    fresh = _get(cache, xlsx_path, store)
+    assert cache.last_status == "built"
+    assert fresh[STRUCT_SHEET]["items_map"] == {"item_cat1__iss1__item1__fire_exit": "PASS"}
@@ -1,9 +1,15 @@
 # structurecode/101_run_structure_universal.py
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+import argparse
+import contextlib
+import io
 import pandas as pd
 import sys
+import traceback
 
 # =============================================================================
 # 1) Paths so local modules are visible (project root + structurecode)
@@ -26,7 +32,19 @@ try:
     import structure_audit_plan_pandas as sapp
     import structure_branch_columns as sbc
     import structure_branch_profile_pandas as sbpp
+    import structure_auditor_profile_pandas as saudp
     import uvl_builder as ub
+    from uvl_build_manifest import UvlBuildManifest
+    from workbook_session import WorkbookSession, structure_sheet_filter
+    from workbook_writeback import WorkbookWriteBack, WRITEBACK_MODES
+    from pipeline_store.columnar_store import ColumnarStore
+    from core_utilities_structure_pandas import (
+        load_slug_cache,
+        save_slug_cache,
+        mark_slug_cache,
+        take_new_slugs,
+        merge_slugs,
+    )
 
     # NOTE: keep as-is if this matches your project layout
     from config.domain_config import *  # noqa: F403,F401
@@ -37,11 +55,6 @@ except ImportError as e:
 # =============================================================================
 # 3) Helpers
 # =============================================================================
-def _update_excel_sheet(xlsx_path: Path, sheet_name: str, df_out: pd.DataFrame) -> None:
-    with pd.ExcelWriter(xlsx_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-        df_out.to_excel(writer, sheet_name=sheet_name, index=False)
-
-
 def _enrich_with_branch_profile_safe(df: pd.DataFrame, df_profile: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
     """
     Safe enrichment: LEFT JOIN so we never drop scope rows
@@ -90,11 +103,118 @@ def _find_iso_data_files(search_dir: Path) -> list[Path]:
 # =============================================================================
 # 4) Main
 # =============================================================================
-def main() -> None:
+def _process_structure_sheet(df: pd.DataFrame, sheet: str, df_p_out: pd.DataFrame) -> pd.DataFrame:
+    # Structural pipeline (kept in same order)
+    df = scp.process_structure_category_df(df, sheet, CATEGORY_SPELLING_MAP)  # noqa: F405
+    df = sicp.process_item_columns(df, sheet)
+    df = sacp.process_answer_columns(df, sheet)
+    df = satp.process_structure_audit_type_df(df, sheet)
+    df = sapp.process_structure_audit_plan_df(df, sheet)
+    df = sbc.process_branch_columns(df, BRANCH_NAME_OVERRIDES, DEP_LABELS)  # noqa: F405
+
+    # Enrich with branch profile (safe)
+    if isinstance(df_p_out, pd.DataFrame) and not df_p_out.empty:
+        df = _enrich_with_branch_profile_safe(df, df_p_out, sheet)
+    return df
+
+
+def _init_structure_worker(slug_cache_path: Path) -> None:
+    load_slug_cache(slug_cache_path)
+    # slugs computed from here on go back to the parent with each result
+    mark_slug_cache()
+
+
+def _sheet_task(task: dict, capture: bool = True) -> dict:
+    """
+    One ISO_Check_ sheet: structural pipeline + UVL build.
+    Runs in a worker process under --jobs; its prints are captured and
+    returned so the parent can replay them in sheet order, together with
+    the slugs it computed (merged into the parent's slug cache).
+    """
+    buf = io.StringIO()
+    out = {"sheet": task["sheet"], "df": None, "fingerprint": None, "error": None}
+    with (contextlib.redirect_stdout(buf) if capture else contextlib.nullcontext()):
+        try:
+            sheet = task["sheet"]
+            print(f"📦 Working on: {sheet}")
+            df = _process_structure_sheet(task["df"], sheet, task["df_p_out"])
+
+            # -------------------------
+            # UVL generation
+            # Use file stem in UVL name to avoid collisions across multiple ISO_DATA files
+            # -------------------------
+            uvl_path = task["uvl_path"]
+            manifest = task["manifest"]
+            built = ub.build_uvl_from_frames(
+                df,
+                sheet,
+                str(uvl_path),
+                UVL_NAMESPACE,  # noqa: F405
+                branch_profile=task["branch_profile"],
+                scope_rules=task["scope_rules"],
+                manifest=manifest,
+                force=task["force"],
+            )
+            if built:
+                print(f"   -> ✅ UVL Ready: {uvl_path.name}")
+                out["fingerprint"] = manifest.fingerprint_for(uvl_path)
+            else:
+                print(f"   -> ⏭️  UVL unchanged: {uvl_path.name}")
+            out["df"] = df
+        except Exception:
+            out["error"] = traceback.format_exc()
+    out["log"] = buf.getvalue()
+    out["slugs"] = take_new_slugs()
+    return out
+
+
+def _read_session(xlsx_path: Path) -> WorkbookSession:
+    # Parse every sheet this runner needs exactly once
+    return WorkbookSession(xlsx_path, sheet_filter=structure_sheet_filter)
+
+
+def _file_banner(xlsx_path: Path) -> str:
+    return "\n" + "=" * 80 + f"\n📘 Processing file: {xlsx_path.name}\n" + "=" * 80 + "\n"
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Master structure runner (ISO_DATA*.xlsx -> processed sheets + UVL)")
+    ap.add_argument(
+        "--writeback",
+        choices=WRITEBACK_MODES,
+        default="excel",
+        help="excel: one atomic rewrite of each workbook (default); "
+             "parquet/feather: write processed sheets to a sidecar store, workbook untouched; "
+             "none: no export (use with --columnar)",
+    )
+    ap.add_argument(
+        "--columnar",
+        action="store_true",
+        help="persist processed sheets to the columnar store (COLUMNAR_CACHE_DIR) for downstream stages",
+    )
+    ap.add_argument(
+        "--force",
+        action="store_true",
+        help="rebuild every UVL file even when its inputs are unchanged",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes for workbook parsing and ISO_Check_ sheets (default 1 = sequential)",
+    )
+    return ap.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    jobs = max(1, args.jobs)
+
     print("\n" + "=" * 80)
     print("🚀 EXECUTING: MASTER STRUCTURE RUNNER (MULTI-FILE MODE)")
     print("=" * 80)
 
+    pool = None
     try:
         # --- Find ALL files that start with ISO_DATA in the current working directory ---
         work_dir = Path(".").resolve()
@@ -107,75 +227,157 @@ def main() -> None:
         # UVL output directory from domain_config (kept as-is)
         # You already have UVL_OUTPUT_DIR and UVL_NAMESPACE in config.domain_config
         UVL_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)  # noqa: F405
-
-        for xlsx_path in xlsx_files:
-            print("\n" + "=" * 80)
-            print(f"📘 Processing file: {xlsx_path.name}")
-            print("=" * 80)
-
+        # Fingerprints of the inputs each UVL file was last built from
+        uvl_manifest = UvlBuildManifest.for_output_dir(UVL_OUTPUT_DIR)  # noqa: F405
+
+        # Reuse slugs from earlier runs (structure or results)
+        n_cached = load_slug_cache(CANONICAL_CACHE_PATH)  # noqa: F405
+        if n_cached:
+            print(f"♻️  Loaded {n_cached} cached slugs from {CANONICAL_CACHE_PATH.name}")  # noqa: F405
+
+        # --jobs N: workbooks are parsed and ISO_Check_ sheets processed in worker
+        # processes. Each workbook is still written by this process only, once,
+        # and all logs are replayed per file in sheet order. At most `jobs` files
+        # are parsed ahead / in flight, so memory does not grow with the file count.
+        session_futures: dict[Path, Future] = {}
+        if jobs > 1:
+            print(f"⚙️  Parallel mode: {jobs} worker processes")
+            pool = ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_structure_worker,
+                initargs=(CANONICAL_CACHE_PATH,),  # noqa: F405
+            )
+
+        def prefetch_sessions(start: int) -> None:
+            for p in xlsx_files[start:start + jobs]:
+                if p not in session_futures and p.exists():
+                    session_futures[p] = pool.submit(_read_session, p)
+
+        def finish_file(entry: dict) -> None:
+            print(entry["log"], end="")
+            if entry["session"] is None:
+                return  # missing file: only its warning
+            xlsx_path, session, writeback, store = entry["path"], entry["session"], entry["writeback"], entry["store"]
+            for sheet, res in entry["results"]:
+                res = res.result() if isinstance(res, Future) else res
+                print(res["log"], end="")
+                # slugs a worker computed: saved with this process's cache at the end
+                merge_slugs(res["slugs"])
+                if res["error"]:
+                    raise RuntimeError(f"{xlsx_path.name} / {sheet} failed:\n{res['error']}")
+                df = res["df"]
+                if res["fingerprint"]:
+                    uvl_manifest.record(UVL_OUTPUT_DIR / f"{xlsx_path.stem}__{sheet}.uvl", res["fingerprint"])  # noqa: F405
+
+                # Stage processed structure for the single write-back below
+                session.put(sheet, df)
+                writeback.stage(sheet, df)
+                if store is not None:
+                    store.save(sheet, df, stage="structure")
+
+            # Write every processed sheet of this file in one atomic commit
+            written = writeback.commit()
+            for w in written:
+                print(f"💾 Saved: {w}")
+            # The workbook bytes changed: keep it pointing at the same columnar store
+            if written and store is not None and args.writeback == "excel":
+                store.bind(xlsx_path)
+            if store is not None and entry["results"]:
+                print(f"🗂️  Columnar store: {store.dir}")
+            uvl_manifest.save()
+
+        def entry_done(entry: dict) -> bool:
+            return all(not isinstance(res, Future) or res.done() for _, res in entry["results"])
+
+        # Files are finished (logged + written) in their original order, each one
+        # as soon as its sheets are done
+        pending: deque[dict] = deque()
+
+        def queue_file(entry: dict) -> None:
+            pending.append(entry)
+            while pending and (len(pending) > jobs or entry_done(pending[0])):
+                finish_file(pending.popleft())
+
+        for i, xlsx_path in enumerate(xlsx_files):
+            log = io.StringIO()
             if not xlsx_path.exists():
-                print(f"⚠️  Skipping missing file: {xlsx_path}")
+                log.write(_file_banner(xlsx_path))
+                log.write(f"⚠️  Skipping missing file: {xlsx_path}\n")
+                queue_file({"path": xlsx_path, "session": None, "log": log.getvalue(), "results": []})
                 continue
 
-            # -------------------------
-            # A) Master sheets
-            # -------------------------
-            # BRANCH_PROFILE
-            try:
-                df_p_raw = pd.read_excel(xlsx_path, sheet_name="BRANCH_PROFILE")
-                df_p_out = sbpp.process_branch_profile_sheet(df_p_raw, BRANCH_NAME_OVERRIDES, DEP_LABELS)  # noqa: F405
-                _update_excel_sheet(xlsx_path, "BRANCH_PROFILE", df_p_out)
-            except Exception as e:
-                print(f"⚠️  [WARN] BRANCH_PROFILE not processed for {xlsx_path.name}: {e}")
-                df_p_out = pd.DataFrame()
-
-            # users
-            try:
-                df_u_raw = pd.read_excel(xlsx_path, sheet_name="users")
-                df_u_out = saudp.process_users_auditor_profile_sheet(df_u_raw)
-                _update_excel_sheet(xlsx_path, "users", df_u_out)
-            except Exception as e:
-                print(f"⚠️  [WARN] users not processed for {xlsx_path.name}: {e}")
-
-            # -------------------------
-            # B) Process all ISO_Check_ sheets in this file
-            # -------------------------
-            xls = pd.ExcelFile(xlsx_path)
-            sheets = [s for s in xls.sheet_names if str(s).startswith("ISO_Check_")]
-
-            if not sheets:
-                print(f"⚠️  No sheets starting with ISO_Check_ in {xlsx_path.name}.")
-                continue
+            if pool:
+                prefetch_sessions(i)
+            with (contextlib.redirect_stdout(log) if pool else contextlib.nullcontext()):
+                print(_file_banner(xlsx_path), end="")
+
+                session = session_futures.pop(xlsx_path).result() if pool else _read_session(xlsx_path)
+                # Processed sheets are staged and written back once at the end of the file
+                writeback = WorkbookWriteBack(xlsx_path, mode=args.writeback)
+                # Columnar hand-off to downstream stages, keyed by the input workbook hash
+                store = ColumnarStore.for_workbook(xlsx_path, COLUMNAR_CACHE_DIR) if args.columnar else None  # noqa: F405
+                if store is not None:
+                    store.set_workbook_sheets(session.sheet_names)
+                    if session.has("SCOPE_RULES"):
+                        store.save("SCOPE_RULES", session.get("SCOPE_RULES"), stage="raw")
 
-            for sheet in sheets:
-                print(f"📦 Working on: {sheet}")
-                df = pd.read_excel(xlsx_path, sheet_name=sheet)
-
-                # Structural pipeline (kept in same order)
-                df = scp.process_structure_category_df(df, sheet, CATEGORY_SPELLING_MAP)  # noqa: F405
-                df = sicp.process_item_columns(df, sheet)
-                df = sacp.process_answer_columns(df, sheet)
-                df = satp.process_structure_audit_type_df(df, sheet)
-                df = sapp.process_structure_audit_plan_df(df, sheet)
-                df = sbc.process_branch_columns(df, BRANCH_NAME_OVERRIDES, DEP_LABELS)  # noqa: F405
-                
-                
-                
-
-                # Enrich with branch profile (safe)
-                if isinstance(df_p_out, pd.DataFrame) and not df_p_out.empty:
-                    df = _enrich_with_branch_profile_safe(df, df_p_out, sheet)
-
-                # Write processed structure back into same file
-                _update_excel_sheet(xlsx_path, sheet, df)
+                # -------------------------
+                # A) Master sheets
+                # -------------------------
+                # BRANCH_PROFILE
+                try:
+                    df_p_raw = session.get("BRANCH_PROFILE")
+                    df_p_out = sbpp.process_branch_profile_sheet(df_p_raw, BRANCH_NAME_OVERRIDES, DEP_LABELS)  # noqa: F405
+                    session.put("BRANCH_PROFILE", df_p_out)
+                    writeback.stage("BRANCH_PROFILE", df_p_out)
+                    if store is not None:
+                        store.save("BRANCH_PROFILE", df_p_out, stage="structure")
+                except Exception as e:
+                    print(f"⚠️  [WARN] BRANCH_PROFILE not processed for {xlsx_path.name}: {e}")
+                    df_p_out = pd.DataFrame()
+
+                # users
+                try:
+                    df_u_raw = session.get("users")
+                    df_u_out = saudp.process_users_auditor_profile_sheet(df_u_raw)
+                    session.put("users", df_u_out)
+                    writeback.stage("users", df_u_out)
+                    if store is not None:
+                        store.save("users", df_u_out, stage="structure")
+                except Exception as e:
+                    print(f"⚠️  [WARN] users not processed for {xlsx_path.name}: {e}")
 
                 # -------------------------
-                # UVL generation
-                # Use file stem in UVL name to avoid collisions across multiple ISO_DATA files
+                # B) Process all ISO_Check_ sheets in this file
                 # -------------------------
-                uvl_path = UVL_OUTPUT_DIR / f"{xlsx_path.stem}__{sheet}.uvl"  # noqa: F405
-                ub.build_uvl_from_structure(str(xlsx_path), sheet, str(uvl_path), UVL_NAMESPACE)  # noqa: F405
-                print(f"   -> ✅ UVL Ready: {uvl_path.name}")
+                sheets = session.sheets_with_prefix("ISO_Check_")
+                if not sheets:
+                    print(f"⚠️  No sheets starting with ISO_Check_ in {xlsx_path.name}.")
+
+            entry = {"path": xlsx_path, "session": session, "writeback": writeback, "store": store,
+                     "log": log.getvalue(), "results": []}
+            for sheet in sheets:
+                task = {
+                    "sheet": sheet,
+                    "df": session.get(sheet),
+                    "df_p_out": df_p_out,
+                    "branch_profile": session.get_optional("BRANCH_PROFILE"),
+                    "scope_rules": session.get_optional("SCOPE_RULES"),
+                    "uvl_path": UVL_OUTPUT_DIR / f"{xlsx_path.stem}__{sheet}.uvl",  # noqa: F405
+                    "manifest": uvl_manifest,
+                    "force": args.force,
+                }
+                if pool:
+                    entry["results"].append((sheet, pool.submit(_sheet_task, task)))
+                else:
+                    entry["results"].append((sheet, _sheet_task(task, capture=False)))
+
+            queue_file(entry)
+
+        while pending:
+            finish_file(pending.popleft())
+
+        save_slug_cache(CANONICAL_CACHE_PATH)  # noqa: F405
 
         print("\n" + "=" * 80)
         print("✨ ALL FILES PROCESSED SUCCESSFULLY (NO DATA DELETED)")
@@ -183,8 +385,10 @@ def main() -> None:
 
     except Exception as e:
         print(f"\n❌ CRITICAL ERROR: {e}")
-        import traceback
         traceback.print_exc()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
 
 if __name__ == "__main__":
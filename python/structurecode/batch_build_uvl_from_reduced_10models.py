@@ -1,18 +1,30 @@
+import argparse
+import sys
 from pathlib import Path
-import pandas as pd
+
+# project root (python/) for pipeline_store / config (same layout as the runners)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
 
 # Run this script from inside structurecode folder:
-from uvl_builder import build_uvl_from_structure
+from uvl_builder import build_uvl_from_frames  # noqa: E402
+from workbook_session import WorkbookSession, MASTER_SHEETS  # noqa: E402
+from uvl_build_manifest import UvlBuildManifest  # noqa: E402
+from pipeline_store.columnar_store import ColumnarStore  # noqa: E402
+from config.domain_config import COLUMNAR_CACHE_DIR  # noqa: E402
 
 FILE_PREFIX = "ISO_DATA"
 REDUCED_PREFIX = "Reduced_"  # matches Reduced_cX_M01 etc
 NAMESPACE = "MedicareAuditStructure"
 OUTPUT_ROOT = "uvl_outputs_10models"
 
-def run(folder="."):
+def run(folder=".", columnar: bool = False, force: bool = False):
     folder_path = Path(folder)
     out_root = folder_path / OUTPUT_ROOT
     out_root.mkdir(parents=True, exist_ok=True)
+    # Unchanged Reduced_* sheets are not rebuilt (see uvl_build_manifest)
+    manifest = UvlBuildManifest.for_output_dir(out_root)
 
     files = sorted(folder_path.glob(f"{FILE_PREFIX}*.xlsx"))
     if not files:
@@ -24,8 +36,15 @@ def run(folder="."):
         print(f"📘 UVL generation for: {xlsx_path.name}")
         print("=" * 95)
 
-        xl = pd.ExcelFile(xlsx_path)
-        reduced_sheets = [s for s in xl.sheet_names if str(s).startswith(REDUCED_PREFIX)]
+        # One parse per sheet: Reduced_* plus BRANCH_PROFILE / SCOPE_RULES
+        # (read from the columnar store first when --columnar is given)
+        store = ColumnarStore.for_workbook(xlsx_path, COLUMNAR_CACHE_DIR) if columnar else None
+        session = WorkbookSession(
+            xlsx_path,
+            sheet_filter=lambda s: s in MASTER_SHEETS or str(s).startswith(REDUCED_PREFIX),
+            store=store,
+        )
+        reduced_sheets = session.sheets_with_prefix(REDUCED_PREFIX)
 
         if not reduced_sheets:
             print("⚠️  No Reduced_* sheets found.")
@@ -37,18 +56,28 @@ def run(folder="."):
         for sheet in reduced_sheets:
             out_uvl = file_out_dir / f"{xlsx_path.stem}__{sheet}.uvl"
 
-            build_uvl_from_structure(
-                input_xlsx=str(xlsx_path),
+            built = build_uvl_from_frames(
+                session.get(sheet),
                 sheet_name=sheet,
                 uvl_out_path=str(out_uvl),
                 namespace=NAMESPACE,
+                branch_profile=session.get_optional("BRANCH_PROFILE"),
+                scope_rules=session.get_optional("SCOPE_RULES"),
                 report_to_terminal=True,
                 require_answers=True,
+                manifest=manifest,
+                force=force,
             )
 
-            print(f"✅ {sheet} -> {out_uvl.name}")
+            print(f"✅ {sheet} -> {out_uvl.name}" if built else f"⏭️  {sheet} unchanged ({out_uvl.name})")
+
+        manifest.save()
 
     print("\n✅ All done.")
 
 if __name__ == "__main__":
-    run(".")
+    ap = argparse.ArgumentParser(description="Build UVL models from Reduced_* sheets")
+    ap.add_argument("--columnar", action="store_true", help="read sheets from the columnar store when available")
+    ap.add_argument("--force", action="store_true", help="rebuild every UVL file even when its inputs are unchanged")
+    args = ap.parse_args()
+    run(".", columnar=args.columnar, force=args.force)
@@ -1,8 +1,20 @@
+import argparse
 import re
 import random
+import sys
 from pathlib import Path
 import pandas as pd
 
+# project root (python/) for pipeline_store / config (same layout as the runners)
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from workbook_session import WorkbookSession  # noqa: E402
+from workbook_writeback import WorkbookWriteBack  # noqa: E402
+from pipeline_store.columnar_store import ColumnarStore  # noqa: E402
+from config.domain_config import COLUMNAR_CACHE_DIR  # noqa: E402
+
 # =========================
 # CONFIG
 # =========================
@@ -292,7 +304,12 @@ def category_first_model_build(df: pd.DataFrame, seed: int):
     return df, subsets, manuals, reports, meta
 
 
-def run_batch(folder="."):
+def run_batch(folder=".", columnar: bool = False, excel: bool = True):
+    """
+    columnar=True: read the processed structure sheets from the columnar store
+    (falling back to the workbook) and persist Reduced/Manual sheets there.
+    excel=False: skip the Excel export (downstream stages then need --columnar).
+    """
     folder_path = Path(folder)
     files = sorted(folder_path.glob(f"{FILE_PREFIX}*.xlsx"))
     if not files:
@@ -304,44 +321,60 @@ def run_batch(folder="."):
         print(f"📘 FILE: {xlsx_path.name}")
         print("=" * 110)
 
-        xl = pd.ExcelFile(xlsx_path)
-        struct_sheets = [s for s in xl.sheet_names if is_structure_sheet(s)]
+        store = ColumnarStore.for_workbook(xlsx_path, COLUMNAR_CACHE_DIR) if columnar else None
+        session = WorkbookSession(xlsx_path, sheet_filter=is_structure_sheet, store=store)
+        struct_sheets = [s for s in session.sheet_names if session.has(s)]
         if not struct_sheets:
             print("⚠️  No structure sheets found.")
             continue
+        if session.from_store:
+            print(f"🗂️  Loaded from columnar store: {len(session.from_store)} sheet(s)")
+
+        # All Reduced/Manual sheets of this file go out in one workbook write
+        writeback = WorkbookWriteBack(xlsx_path, mode="excel" if excel else "none")
+
+        for sheet in struct_sheets:
+            print(f"\n--- STRUCTURE SHEET: {sheet}")
 
-        with pd.ExcelWriter(xlsx_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            for sheet in struct_sheets:
-                print(f"\n--- STRUCTURE SHEET: {sheet}")
+            df = session.get(sheet)
 
-                df = pd.read_excel(xlsx_path, sheet_name=sheet)
+            # Validate required scope columns exist (case-insensitive)
+            for req in REQ_SCOPE_UPPER:
+                _ = find_col(df, req)
 
-                # Validate required scope columns exist (case-insensitive)
-                for req in REQ_SCOPE_UPPER:
-                    _ = find_col(df, req)
+            tag = safe_tag_from_sheet(sheet)
+            _, subsets, manuals, reports, meta = category_first_model_build(df, SEED)
 
-                tag = safe_tag_from_sheet(sheet)
-                _, subsets, manuals, reports, meta = category_first_model_build(df, SEED)
+            print(f"✅ Exact duplicate rows removed inside '{sheet}': {meta['removed_exact_duplicates']}")
+            print(f"✅ Available: categories={meta['available_categories']}, audit_types={meta['available_audit_types']}, "
+                  f"plans={meta['available_audit_plans']}, branches={meta['available_branches']}")
 
-                print(f"✅ Exact duplicate rows removed inside '{sheet}': {meta['removed_exact_duplicates']}")
-                print(f"✅ Available: categories={meta['available_categories']}, audit_types={meta['available_audit_types']}, "
-                      f"plans={meta['available_audit_plans']}, branches={meta['available_branches']}")
+            # Stage outputs
+            for rep in reports:
+                mid = rep["model"]
+                reduced_name = excel_sheet(f"{REDUCED_PREFIX}_{tag}_{mid}")
+                manual_name  = excel_sheet(f"{MANUAL_PREFIX}_{tag}_{mid}")
 
-                # Write outputs
-                for rep in reports:
-                    mid = rep["model"]
-                    reduced_name = excel_sheet(f"{REDUCED_PREFIX}_{tag}_{mid}")
-                    manual_name  = excel_sheet(f"{MANUAL_PREFIX}_{tag}_{mid}")
+                writeback.stage(reduced_name, subsets[mid])
+                writeback.stage(manual_name, manuals[mid])
+                if store is not None:
+                    store.save(reduced_name, subsets[mid], stage="optionA")
+                    store.save(manual_name, manuals[mid], stage="optionA")
 
-                    subsets[mid].to_excel(writer, index=False, sheet_name=reduced_name)
-                    manuals[mid].to_excel(writer, index=False, sheet_name=manual_name)
+            print("✅ Models written:")
+            for r in reports:
+                print("  -", r)
 
-                print("✅ Models written:")
-                for r in reports:
-                    print("  -", r)
+        if writeback.commit() and store is not None:
+            store.bind(xlsx_path)
 
-        print(f"\n✅ Done: wrote Reduced/Manual for all structure sheets into {xlsx_path.name}")
+        target = xlsx_path.name if excel else f"columnar store {store.dir}" if store is not None else "nowhere (--no-excel)"
+        print(f"\n✅ Done: wrote Reduced/Manual for all structure sheets into {target}")
 
 
 if __name__ == "__main__":
-    run_batch(".")
+    ap = argparse.ArgumentParser(description="Option-A triangular reduction (10 models per structure sheet)")
+    ap.add_argument("--columnar", action="store_true", help="read/write sheets through the columnar store")
+    ap.add_argument("--no-excel", action="store_true", help="skip writing Reduced/Manual sheets into the workbook")
+    args = ap.parse_args()
+    run_batch(".", columnar=args.columnar, excel=not args.no_excel)
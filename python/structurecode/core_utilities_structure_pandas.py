@@ -1,55 +1,37 @@
 # structurecode/core_utilities_structure_pandas.py
+# Text / slug / ID / flag normalization is implemented once in
+# canonical_code.canonicalization and re-exported here unchanged.
 from __future__ import annotations
-from typing import Any, List, Optional
-import re
-import unicodedata
+from typing import List
+import sys
+from pathlib import Path
 import pandas as pd
 
-# missing lists
-_MISSING_TOKENS = {"", "nan", "none", "null", "na", "n/a", "-", "--", "?"}
-
-def normalize_text(val: Any) -> str:
-    if val is None:
-        return ""
-    try:
-        if pd.isna(val):
-            return ""
-    except Exception:
-        pass
-    s = str(val).strip()
-    s = unicodedata.normalize('NFKC', s)
-    if not s:
-        return ""
-    s = re.sub(r"\s+", " ", s)
-    return s
-
-def is_missing_like(val: Any) -> bool:
-    if val is None:
-        return True
-    try:
-        if pd.isna(val):
-            return True
-    except Exception:
-        pass
-    s = normalize_text(val)
-    if not s:
-        return True
-    return s.strip().lower() in _MISSING_TOKENS
-
-def to_uvl_code(val: Any) -> Optional[str]:
-    if is_missing_like(val):
-        return None
-    s = normalize_text(val)
-    s = unicodedata.normalize("NFKD", s)
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.lower()
-    s = re.sub(r"[^a-z0-9_]+", "_", s)
-    s = re.sub(r"_+", "_", s).strip("_")
-    if not s:
-        return None
-    if not re.match(r"^[a-z_]", s):
-        s = f"_{s}"
-    return s
+# The canonical core lives in python/canonical_code (shared with result_code)
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from canonical_code.canonicalization import (  # noqa: E402,F401
+    _MISSING_TOKENS,
+    normalize_text,
+    is_missing_like,
+    to_uvl_code,
+    normalize_id_token,
+    normalize_flag01,
+    normalize_text_series,
+    is_missing_like_series,
+    is_present_series,
+    clean_text_series,
+    to_uvl_code_series,
+    map_distinct,
+    normalize_id_token_series,
+    load_slug_cache,
+    save_slug_cache,
+    mark_slug_cache,
+    take_new_slugs,
+    merge_slugs,
+)
 
 def ensure_column_df(df: pd.DataFrame, col_name: str) -> pd.DataFrame:
     if col_name not in df.columns:
@@ -61,36 +43,3 @@ def require_columns_df(df: pd.DataFrame, required: List[str], sheet_name: str =
     if missing:
         where = f" in sheet '{sheet_name}'" if sheet_name else ""
         raise ValueError(f"CRITICAL ERROR: Missing columns{where}: {missing}")
-
-def normalize_id_token(val: Any) -> Optional[str]:
-    if val is None: return None
-    try:
-        if pd.isna(val): return None
-    except Exception: pass
-    s = str(val).strip()
-    if s.lower() in _MISSING_TOKENS: return None
-    if isinstance(val, (int, float)):
-        f_val = float(val)
-        if f_val.is_integer(): return str(int(f_val))
-        return s.rstrip("0").rstrip(".")
-    try:
-        f = float(s)
-        if f.is_integer(): return str(int(f))
-        return str(f).rstrip("0").rstrip(".")
-    except Exception:
-        return s
-
-# --- الدالة المضافة لحل مشكلة الرنر الصارم ---
-def normalize_flag01(val: Any) -> int:
-    """
-    تحويل قيم الأعلام (iso_active, micro_active, etc) إلى 0 أو 1 حصراً.
-    تتعامل مع المدخلات: 'Active', 1, 1.0, 'Yes', '1' -> تعيد 1
-    تتعامل مع: NaN, 'No', 0, 'Inactive' -> تعيد 0
-    """
-    if is_missing_like(val):
-        return 0
-    s = str(val).strip().lower()
-    # الحالات التي نعتبرها True/Active
-    if s in {'1', '1.0', 'true', 'active', 'yes', 'y', 'enabled'}:
-        return 1
-    return 0
\ No newline at end of file
@@ -1,12 +1,11 @@
 # structure_answer_columns_pandas.py
 from __future__ import annotations
-from typing import Optional, Tuple
 import pandas as pd
 
 from core_utilities_structure_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
+    clean_text_series,
+    to_uvl_code_series,
+    is_missing_like_series,
     ensure_column_df,
     require_columns_df,
 )
@@ -20,32 +19,24 @@ def process_answer_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.DataFra
     ensure_column_df(df, "ANSWER_CODE")
     ensure_column_df(df, "ANSWER_FEATURE_NAME")
 
-    def _encode_row(row) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-        item_key = row["ITEM_KEY"]
-        item_feat = row["ITEM_FEATURE_NAME"]
-        raw_ans = row["CHOICE_VALUE_OPTION_NAME"]
-
-        # STRICT: لازم item_key + item_feat + raw_ans
-        if is_missing_like(item_key) or is_missing_like(item_feat) or is_missing_like(raw_ans):
-            return None, None, None
-
-        ans_clean = normalize_text(raw_ans).strip() or None
-        if not ans_clean:
-            return None, None, None
-
-        ans_code = to_uvl_code(ans_clean)
-        if not ans_code:
-            return None, None, None
-
-        # Build unique namespaced feature
-        ans_feat = f"{item_feat}__{ans_code}"
-        return ans_clean, ans_code, ans_feat
-
-    encoded = df.apply(_encode_row, axis=1, result_type="expand")
-    encoded.columns = ["ANSWER_TEXT_CLEAN", "ANSWER_CODE", "ANSWER_FEATURE_NAME"]
-
-    df["ANSWER_TEXT_CLEAN"] = encoded["ANSWER_TEXT_CLEAN"]
-    df["ANSWER_CODE"] = encoded["ANSWER_CODE"]
-    df["ANSWER_FEATURE_NAME"] = encoded["ANSWER_FEATURE_NAME"]
+    # Answer texts are a tiny vocabulary (Yes/No/NA variants): each distinct
+    # text is cleaned and slugged once, then broadcast back to the rows.
+    ans_clean = clean_text_series(df["CHOICE_VALUE_OPTION_NAME"])
+    ans_code = to_uvl_code_series(ans_clean)
+
+    # STRICT: لازم item_key + item_feat + raw_ans (and a non-empty answer code)
+    ok = (
+        ~is_missing_like_series(df["ITEM_KEY"])
+        & ~is_missing_like_series(df["ITEM_FEATURE_NAME"])
+        & ans_code.notna()
+    )
+
+    # Build unique namespaced feature
+    ans_feat = df["ITEM_FEATURE_NAME"].where(ok, "").astype(str) + "__" + ans_code.where(ok, "")
+
+    # object first: where() on a str-dtype column would put NaN, not None, in the masked cells
+    df["ANSWER_TEXT_CLEAN"] = ans_clean.astype(object).where(ok, None)
+    df["ANSWER_CODE"] = ans_code.astype(object).where(ok, None)
+    df["ANSWER_FEATURE_NAME"] = ans_feat.astype(object).where(ok, None)
 
     return df
@@ -13,6 +13,9 @@ from core_utilities_structure_pandas import (
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
+    clean_text_series,
+    is_missing_like_series,
+    map_distinct,
 )
 
 _COL_RAW = "AUDIT_PLAN"
@@ -94,21 +97,15 @@ def process_audit_plan(df: pd.DataFrame, sheet_name: str | None = None, mode: st
     ensure_column_df(df, _COL_CODE)
 
     # تنظيف النص
-    df[_COL_CLEAN] = df[_COL_RAW].apply(
-        lambda x: normalize_text(x).strip() if not is_missing_like(x) else None
-    )
-
-    # وظيفة حساب الكود الذكي
-    def _compute_code(row) -> str | None:
-        existing = row.get(_COL_CODE, None)
-        # إذا كان الكود موجوداً مسبقاً (غير فارغ)، لا نغيره
-        if not is_missing_like(existing):
-            return existing 
-        
-        # إذا كان فارغاً، نطبق محرك القواعد + تمثيل UVL
-        return _map_plan_by_rules(row.get(_COL_CLEAN, None))
-
-    df[_COL_CODE] = df.apply(_compute_code, axis=1)
+    df[_COL_CLEAN] = clean_text_series(df[_COL_RAW])
+
+    # إذا كان الكود موجوداً مسبقاً (غير فارغ)، لا نغيره
+    existing = df[_COL_CODE].astype(object)
+    keep = ~is_missing_like_series(existing)
+
+    # إذا كان فارغاً، نطبق محرك القواعد + تمثيل UVL (مرة واحدة لكل نص مميز)
+    rule_codes = map_distinct(df[_COL_CLEAN], _map_plan_by_rules)
+    df[_COL_CODE] = existing.where(keep, rule_codes)
     
     return df
 
@@ -34,9 +34,8 @@ from __future__ import annotations
 import pandas as pd
 
 from core_utilities_structure_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
+    clean_text_series,
+    to_uvl_code_series,
     ensure_column_df,
 )
 
@@ -56,13 +55,7 @@ def process_structure_audit_type_df(df: pd.DataFrame, sheet_name: str) -> pd.Dat
     ensure_column_df(df, _COL_CLEAN)
     ensure_column_df(df, _COL_CODE)
 
-    def _clean(raw) -> str | None:
-        if is_missing_like(raw):
-            return None
-        txt = normalize_text(raw).strip()
-        return txt if txt else None
-
-    df[_COL_CLEAN] = df[_COL_RAW].apply(_clean)
-    df[_COL_CODE] = df[_COL_CLEAN].apply(to_uvl_code)
+    df[_COL_CLEAN] = clean_text_series(df[_COL_RAW])
+    df[_COL_CODE] = to_uvl_code_series(df[_COL_CLEAN])
 
     return df
\ No newline at end of file
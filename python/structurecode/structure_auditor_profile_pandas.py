@@ -18,13 +18,12 @@ from typing import Any, Optional
 import pandas as pd
 
 from core_utilities_structure_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
     ensure_column_df,
     require_columns_df,
     normalize_id_token,
     normalize_flag01,
+    clean_text_series,
+    to_uvl_code_series,
 )
 
 _FLAG_COLS = ["iso_auditor", "micro_auditor", "path_auditor", "senior_auditor"]
@@ -89,14 +88,8 @@ def process_users_auditor_profile_sheet(
 
     df["AUDITOR_ID_TOKEN"] = df["ID"].apply(_id_token)
 
-    def _clean_label(val: Any) -> Optional[str]:
-        if is_missing_like(val):
-            return None
-        s = normalize_text(val).strip()
-        return s if s else None
-
-    df["AUDITOR_LABEL_CLEAN"] = df["FULL_NAME_EN"].apply(_clean_label)
-    df["AUDITOR_LABEL_SLUG"] = df["AUDITOR_LABEL_CLEAN"].apply(to_uvl_code)
+    df["AUDITOR_LABEL_CLEAN"] = clean_text_series(df["FULL_NAME_EN"])
+    df["AUDITOR_LABEL_SLUG"] = to_uvl_code_series(df["AUDITOR_LABEL_CLEAN"])
 
     def _make_feature(row) -> Optional[str]:
         # Only auditors have a feature identity in FM
@@ -40,11 +40,13 @@ from typing import Dict, Set, Optional
 import pandas as pd
 
 from core_utilities_structure_pandas import (
-    normalize_text,
     to_uvl_code,
     is_missing_like,
     ensure_column_df,
     normalize_id_token,
+    clean_text_series,
+    to_uvl_code_series,
+    map_distinct,
 )
 
 def process_branch_columns(
@@ -66,24 +68,21 @@ def process_branch_columns(
     dep_slugs = {to_uvl_code(x) for x in dep_labels if x}
     dep_slugs.discard(None)
 
-    def _clean_and_override(raw_name) -> Optional[str]:
-        if is_missing_like(raw_name): return None
-        name = normalize_text(raw_name).strip()
+    def _override(name: Optional[str]) -> Optional[str]:
         if not name: return None
         return branch_overrides.get(name, name)
 
-    df["BRANCH_LABEL_CLEAN"] = df["BRANCH_NAME"].apply(_clean_and_override)
-    df["BRANCH_LABEL_SLUG"] = df["BRANCH_LABEL_CLEAN"].apply(to_uvl_code)
+    df["BRANCH_LABEL_CLEAN"] = map_distinct(clean_text_series(df["BRANCH_NAME"]), _override)
+    df["BRANCH_LABEL_SLUG"] = to_uvl_code_series(df["BRANCH_LABEL_CLEAN"])
 
-    def _classify(label_clean: Optional[str]) -> Optional[str]:
-        if not label_clean: return None
-        slug = to_uvl_code(label_clean)
+    # ENTITY_TYPE is classified from the slug computed above (same to_uvl_code(label_clean))
+    def _classify(slug: Optional[str]) -> Optional[str]:
         if not slug: return None
         if slug in dep_slugs: return "dep"
         if slug == "headoffice" or slug.startswith("elite_medical"): return "org"
         return "branch"
 
-    df["ENTITY_TYPE"] = df["BRANCH_LABEL_CLEAN"].apply(_classify)
+    df["ENTITY_TYPE"] = map_distinct(df["BRANCH_LABEL_SLUG"], _classify)
 
     def _id_token(raw_id) -> Optional[str]:
         if is_missing_like(raw_id): return None
@@ -37,9 +37,8 @@ from typing import Dict
 import pandas as pd
 
 from core_utilities_structure_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
+    clean_text_series,
+    to_uvl_code_series,
     ensure_column_df,
     require_columns_df,
 )
@@ -56,18 +55,13 @@ def process_structure_category_df(
     ensure_column_df(df, "CATEGORY_NAME_HARMONIZED")
     ensure_column_df(df, "CATEGORY_CODE")
 
-    def _clean(raw) -> str | None:
-        if is_missing_like(raw): return None
-        txt = normalize_text(raw).strip()
-        return txt if txt else None
-
-    df["CATEGORY_NAME_CLEAN"] = df["CHECK_CATEGORY_NAME"].apply(_clean)
+    df["CATEGORY_NAME_CLEAN"] = clean_text_series(df["CHECK_CATEGORY_NAME"])
 
     def _harmonize(clean_val: str | None) -> str | None:
         if not clean_val: return None
         return category_spelling_map.get(clean_val, clean_val)
 
     df["CATEGORY_NAME_HARMONIZED"] = df["CATEGORY_NAME_CLEAN"].apply(_harmonize)
-    df["CATEGORY_CODE"] = df["CATEGORY_NAME_HARMONIZED"].apply(to_uvl_code)
+    df["CATEGORY_CODE"] = to_uvl_code_series(df["CATEGORY_NAME_HARMONIZED"])
 
     return df
\ No newline at end of file
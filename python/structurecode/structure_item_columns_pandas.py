@@ -7,19 +7,25 @@
 # - Do NOT create ITEM_FEATURE_NAME unless (ITEM_KEY + ITEM_TEXT_CODE) are both present.
 # - No fallback features like: item_{item_key} or item__{text_code}.
 #   Missing inputs => derived feature fields remain None.
+#
+# COLUMNAR BUILD:
+# - Whole columns at once: names are cleaned and slugged once per
+#   distinct value (clean_text_series / to_uvl_code_series), IDs are
+#   tokenized once per distinct value (normalize_id_token_series), and
+#   the key / feature strings are concatenated over the rows where the
+#   strict policy allows them; every other row stays None.
 # ============================================================
 
 from __future__ import annotations
-from typing import Optional, Tuple
 import pandas as pd
 
 from core_utilities_structure_pandas import (
-    normalize_text,
-    to_uvl_code,
-    is_missing_like,
+    clean_text_series,
+    to_uvl_code_series,
     ensure_column_df,
     require_columns_df,
-    normalize_id_token,
+    normalize_id_token_series,
+    is_present_series,
 )
 
 def process_item_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.DataFrame:
@@ -31,42 +37,30 @@ def process_item_columns(df: pd.DataFrame, sheet_name: str = "") -> pd.DataFrame
     ensure_column_df(df, "ITEM_KEY")
     ensure_column_df(df, "ITEM_FEATURE_NAME")
 
-    def _build_row(row) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
-        # ---- Clean item name ----
-        raw_name = row["CHECK_ITEM_NAME"]
-        if is_missing_like(raw_name):
-            item_clean = None
-        else:
-            item_clean = normalize_text(raw_name).strip() or None
+    # ---- Clean item name ----
+    item_clean = clean_text_series(df["CHECK_ITEM_NAME"])
+    item_text_code = to_uvl_code_series(item_clean)
 
-        item_text_code = to_uvl_code(item_clean) if item_clean else None
+    # ---- Normalize required ID tokens ----
+    item_id_s = normalize_id_token_series(df["CHECK_ITEM_ID"])
+    cat_id_s = normalize_id_token_series(df["CHECK_CATEGORY_ID"])
+    issue_s = normalize_id_token_series(df["ISSUE_NUMBER"])
 
-        # ---- Normalize required ID tokens ----
-        item_id_s = normalize_id_token(row["CHECK_ITEM_ID"])
-        cat_id_s  = normalize_id_token(row["CHECK_CATEGORY_ID"])
-        issue_s   = normalize_id_token(row["ISSUE_NUMBER"])
+    # ---- STRICT: composite key must be complete (no key => no feature) ----
+    has_key = is_present_series(cat_id_s) & is_present_series(issue_s) & is_present_series(item_id_s)
+    item_key = ("cat" + cat_id_s.where(has_key, "") + "__iss" + issue_s.where(has_key, "")
+                + "__item" + item_id_s.where(has_key, ""))
+    item_key = item_key.where(has_key, None).astype(object)
 
-        # ---- STRICT: composite key must be complete ----
-        if not (cat_id_s and issue_s and item_id_s):
-            # No key => no feature
-            return item_clean, item_text_code, None, None
+    # ---- STRICT: feature name requires BOTH key and text code ----
+    # (rows with a key but no text code keep the key for tracking only)
+    has_feature = has_key & is_present_series(item_text_code)
+    item_feature = "item_" + item_key.where(has_feature, "") + "__" + item_text_code.where(has_feature, "")
+    item_feature = item_feature.where(has_feature, None).astype(object)
 
-        item_key = f"cat{cat_id_s}__iss{issue_s}__item{item_id_s}"
-
-        # ---- STRICT: feature name requires BOTH key and text code ----
-        if not item_text_code:
-            # Keep the key for tracking, but DO NOT create feature name
-            return item_clean, item_text_code, item_key, None
-
-        item_feature = f"item_{item_key}__{item_text_code}"
-        return item_clean, item_text_code, item_key, item_feature
-
-    out = df.apply(_build_row, axis=1, result_type="expand")
-    out.columns = ["ITEM_NAME_CLEAN", "ITEM_TEXT_CODE", "ITEM_KEY", "ITEM_FEATURE_NAME"]
-
-    df["ITEM_NAME_CLEAN"] = out["ITEM_NAME_CLEAN"]
-    df["ITEM_TEXT_CODE"] = out["ITEM_TEXT_CODE"]
-    df["ITEM_KEY"] = out["ITEM_KEY"]
-    df["ITEM_FEATURE_NAME"] = out["ITEM_FEATURE_NAME"]
+    df["ITEM_NAME_CLEAN"] = item_clean
+    df["ITEM_TEXT_CODE"] = item_text_code
+    df["ITEM_KEY"] = item_key
+    df["ITEM_FEATURE_NAME"] = item_feature
 
     return df
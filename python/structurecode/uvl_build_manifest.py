@@ -0,0 +1,116 @@
+# structurecode/uvl_build_manifest.py
+# ============================================================
+# Incremental UVL builds — content fingerprints + build manifest
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - A fingerprint is a SHA-256 over exactly what the UVL builder reads:
+#   the structure columns of the sheet (row order included, it drives
+#   item order), the BRANCH_PROFILE capability flags, the SCOPE_RULES
+#   columns, the namespace / require_answers options and the builder
+#   version.
+# - The manifest (JSON next to the UVL files) maps each UVL output path
+#   to the fingerprint it was built from. A sheet whose fingerprint is
+#   unchanged and whose UVL file still exists is skipped.
+# - Bump UVL_BUILDER_VERSION in uvl_builder.py whenever the emitted text
+#   changes, so every model is rebuilt once.
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import pandas as pd
+
+MANIFEST_NAME = ".uvl_build_manifest.json"
+
+# Columns the builder reads (matched after strip().upper(), like _clean_upper_cols)
+SHEET_FINGERPRINT_COLS = [
+    "CATEGORY_CODE",
+    "ITEM_KEY",
+    "ITEM_FEATURE_NAME",
+    "ANSWER_FEATURE_NAME",
+    "BRANCH_FEATURE_CODE",
+    "AUDIT_TYPE_CODE",
+    "AUDIT_PLAN_CODE",
+]
+PROFILE_FINGERPRINT_COLS = ["BRANCH_FEATURE_CODE", "ISO_ACTIVE", "MICRO_ACTIVE", "PATH_ACTIVE"]
+RULES_FINGERPRINT_COLS = ["CAPABILITY_FLAG", "TARGET_CODE", "ACTION"]
+
+
+def _frame_digest(df: Optional[pd.DataFrame], cols: List[str]) -> str:
+    if df is None:
+        return "absent"
+    by_upper = {str(c).strip().upper(): c for c in df.columns}
+    present = [c for c in cols if c in by_upper]
+    sub = df[[by_upper[c] for c in present]].astype(str)
+    sub.columns = present
+    h = hashlib.sha256(",".join(present).encode("utf-8"))
+    h.update(str(len(sub)).encode("utf-8"))
+    if present and len(sub):
+        h.update(pd.util.hash_pandas_object(sub, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def uvl_input_fingerprint(
+    df_sheet: pd.DataFrame,
+    branch_profile: Optional[pd.DataFrame],
+    scope_rules: Optional[pd.DataFrame],
+    namespace: str,
+    require_answers: bool,
+    builder_version: int,
+) -> str:
+    parts = [
+        f"builder={builder_version}",
+        f"namespace={namespace}",
+        f"require_answers={int(bool(require_answers))}",
+        "sheet=" + _frame_digest(df_sheet, SHEET_FINGERPRINT_COLS),
+        "profile=" + _frame_digest(branch_profile, PROFILE_FINGERPRINT_COLS),
+        "rules=" + _frame_digest(scope_rules, RULES_FINGERPRINT_COLS),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class UvlBuildManifest:
+    """JSON map: UVL output path -> fingerprint of the inputs it was built from."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._entries: Dict[str, str] = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                self._entries = dict(json.loads(self.path.read_text(encoding="utf-8")).get("uvl", {}))
+            except Exception:
+                self._entries = {}
+
+    @classmethod
+    def for_output_dir(cls, out_dir: str | Path) -> "UvlBuildManifest":
+        return cls(Path(out_dir) / MANIFEST_NAME)
+
+    @staticmethod
+    def _key(uvl_out_path: str | Path) -> str:
+        return str(Path(uvl_out_path).resolve())
+
+    def is_current(self, uvl_out_path: str | Path, fingerprint: str) -> bool:
+        return (
+            self._entries.get(self._key(uvl_out_path)) == fingerprint
+            and Path(uvl_out_path).exists()
+        )
+
+    def fingerprint_for(self, uvl_out_path: str | Path) -> Optional[str]:
+        return self._entries.get(self._key(uvl_out_path))
+
+    def record(self, uvl_out_path: str | Path, fingerprint: str) -> None:
+        self._entries[self._key(uvl_out_path)] = fingerprint
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"uvl": self._entries}, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
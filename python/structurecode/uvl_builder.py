@@ -3,6 +3,11 @@ import pandas as pd
 import re
 from collections import defaultdict
 
+from uvl_build_manifest import UvlBuildManifest, uvl_input_fingerprint
+
+# Bump whenever the emitted UVL text changes: invalidates every manifest entry
+UVL_BUILDER_VERSION = 1
+
 
 def _indent(level: int) -> str:
     return " " * (4 * level)
@@ -86,11 +91,18 @@ def _print_build_report(report: dict, max_examples: int = 20) -> None:
     print("=" * 80 + "\n")
 
 
-def _read_branch_profile(input_xlsx: str) -> pd.DataFrame:
+def _read_optional_sheet(input_xlsx: str, sheet_name: str) -> pd.DataFrame | None:
     try:
-        bp = pd.read_excel(input_xlsx, sheet_name="BRANCH_PROFILE")
-        bp = _clean_upper_cols(bp)
-        return bp
+        return pd.read_excel(input_xlsx, sheet_name=sheet_name)
+    except Exception:
+        return None
+
+
+def _prepare_branch_profile(branch_profile: pd.DataFrame | None) -> pd.DataFrame:
+    if branch_profile is None:
+        return pd.DataFrame()
+    try:
+        return _clean_upper_cols(branch_profile)
     except Exception:
         return pd.DataFrame()
 
@@ -115,12 +127,57 @@ def build_uvl_from_structure(
     namespace: str = "MedicareAuditStructure",
     report_to_terminal: bool = True,
     require_answers: bool = True,
-) -> None:
+    manifest: UvlBuildManifest | None = None,
+    force: bool = False,
+) -> bool:
+    """File-based entry point: reads the sheets, then delegates to build_uvl_from_frames."""
+    df_sheet = pd.read_excel(input_xlsx, sheet_name=sheet_name)
+    return build_uvl_from_frames(
+        df_sheet,
+        sheet_name,
+        uvl_out_path,
+        namespace=namespace,
+        branch_profile=_read_optional_sheet(input_xlsx, "BRANCH_PROFILE"),
+        scope_rules=_read_optional_sheet(input_xlsx, "SCOPE_RULES"),
+        report_to_terminal=report_to_terminal,
+        require_answers=require_answers,
+        manifest=manifest,
+        force=force,
+    )
+
+
+def build_uvl_from_frames(
+    df_sheet: pd.DataFrame,
+    sheet_name: str,
+    uvl_out_path: str,
+    namespace: str = "MedicareAuditStructure",
+    branch_profile: pd.DataFrame | None = None,
+    scope_rules: pd.DataFrame | None = None,
+    report_to_terminal: bool = True,
+    require_answers: bool = True,
+    manifest: UvlBuildManifest | None = None,
+    force: bool = False,
+) -> bool:
+    """
+    In-memory entry point: builds the UVL from an already-loaded structure
+    sheet plus (optional) BRANCH_PROFILE and SCOPE_RULES frames.
+
+    With a manifest, the build is skipped (returns False) when the inputs'
+    fingerprint matches the one recorded for uvl_out_path; force=True
+    always rebuilds. Returns True when the UVL file was written.
+    """
+    fingerprint = None
+    if manifest is not None:
+        fingerprint = uvl_input_fingerprint(
+            df_sheet, branch_profile, scope_rules, namespace, require_answers, UVL_BUILDER_VERSION
+        )
+        if not force and manifest.is_current(uvl_out_path, fingerprint):
+            return False
+
     # =========================
-    # Read & clean RAW sheet
+    # Clean RAW sheet
     # =========================
-    df_raw = pd.read_excel(input_xlsx, sheet_name=sheet_name)
-    df_raw = _clean_upper_cols(df_raw)
+    df_raw = _clean_upper_cols(df_sheet)
 
     _require_columns(
         df_raw,
@@ -173,7 +230,7 @@ def build_uvl_from_structure(
         + list(CONTAINER_FEATURES)
     )
 
-    branch_profile = _read_branch_profile(input_xlsx)
+    branch_profile = _prepare_branch_profile(branch_profile)
 
     # =========================
     # UVL builder
@@ -221,14 +278,32 @@ def build_uvl_from_structure(
 
     # =========================
     # Categories / Items / Answers (from CONTENT)
+    # One pass builds category -> items (first-seen order) and
+    # (category, item) -> sorted answers, instead of re-filtering
+    # df_content for every category and every item.
     # =========================
-    for cat in categories_all:
-        cat_rows = df_content[df_content["CATEGORY_CODE"].astype(str).str.strip() == cat].copy()
+    content = df_content[df_content["CATEGORY_CODE"].notna()]
 
-        cat_valid_items = cat_rows.dropna(subset=["ITEM_KEY", "ITEM_FEATURE_NAME"]).copy()
-        cat_valid_items = cat_valid_items.drop_duplicates(subset=["ITEM_KEY", "ITEM_FEATURE_NAME"], keep="first")
+    items_by_cat: dict[str, list[tuple[str, str]]] = {}
+    core_items = content.dropna(subset=["ITEM_KEY", "ITEM_FEATURE_NAME"]).drop_duplicates(
+        subset=["CATEGORY_CODE", "ITEM_KEY", "ITEM_FEATURE_NAME"], keep="first"
+    )
+    for cat_val, ikey_val, feat_val in zip(
+        core_items["CATEGORY_CODE"], core_items["ITEM_KEY"], core_items["ITEM_FEATURE_NAME"]
+    ):
+        items_by_cat.setdefault(cat_val, []).append((ikey_val, feat_val))
+
+    answers_by_item: dict[tuple[str, str], set[str]] = defaultdict(set)
+    core_answers = content.dropna(subset=["ITEM_KEY", "ANSWER_FEATURE_NAME"])
+    for cat_val, ikey_val, ans_val in zip(
+        core_answers["CATEGORY_CODE"], core_answers["ITEM_KEY"], core_answers["ANSWER_FEATURE_NAME"]
+    ):
+        answers_by_item[(cat_val, ikey_val)].add(ans_val)
+
+    for cat in categories_all:
+        cat_items = items_by_cat.get(cat, [])
 
-        if cat_valid_items.empty:
+        if not cat_items:
             report["SKIP_CATEGORY_NO_VALID_ITEMS"].append(
                 f"CATEGORY={cat} (all rows missing ITEM_KEY/ITEM_FEATURE_NAME)"
             )
@@ -237,10 +312,7 @@ def build_uvl_from_structure(
         emit_feature(cat, 5, abstract=True)
         emit(_indent(6) + "mandatory")
 
-        for _, row in cat_valid_items.iterrows():
-            ikey = row["ITEM_KEY"]
-            item_feat = row["ITEM_FEATURE_NAME"]
-
+        for ikey, item_feat in cat_items:
             if _is_missing(ikey) or _is_missing(item_feat):
                 report["SKIP_ITEM_MISSING_KEY_OR_FEATURE"].append(
                     f"CATEGORY={cat} ITEM_KEY={ikey} ITEM_FEATURE_NAME={item_feat}"
@@ -250,9 +322,7 @@ def build_uvl_from_structure(
             ikey = str(ikey).strip()
             item_feat = str(item_feat).strip()
 
-            rel = cat_rows[cat_rows["ITEM_KEY"].astype(str).str.strip() == ikey].copy()
-            rel_answers = rel.dropna(subset=["ANSWER_FEATURE_NAME"]).copy()
-            choices = _safe_sorted_unique(rel_answers.get("ANSWER_FEATURE_NAME"))
+            choices = sorted(answers_by_item.get((cat, ikey), ()))
 
             if not choices:
                 if require_answers:
@@ -322,8 +392,7 @@ def build_uvl_from_structure(
 
     # Scope rules (unchanged)
     try:
-        df_rules = pd.read_excel(input_xlsx, sheet_name="SCOPE_RULES")
-        df_rules = _clean_upper_cols(df_rules)
+        df_rules = _clean_upper_cols(scope_rules) if scope_rules is not None else pd.DataFrame()
 
         if all(c in df_rules.columns for c in ["CAPABILITY_FLAG", "TARGET_CODE", "ACTION"]):
             for _, r in df_rules.iterrows():
@@ -357,7 +426,11 @@ def build_uvl_from_structure(
     with open(uvl_out_path, "w", encoding="utf-8") as f:
         f.write("\n".join(uvl_lines))
 
+    if manifest is not None:
+        manifest.record(uvl_out_path, fingerprint)
+
     if report_to_terminal:
         _print_build_report(report, max_examples=20)
 
     print(f"✅ UVL written to: {uvl_out_path}")
+    return True
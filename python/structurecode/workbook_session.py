@@ -0,0 +1,96 @@
+# structurecode/workbook_session.py
+# ============================================================
+# Workbook Session — parse each sheet ONCE
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Opens the ISO_DATA workbook a single time (one openpyxl load) and
+#   parses every requested sheet in one pass (pd.ExcelFile.parse with a
+#   list of sheet names), then releases the file handle.
+# - Every pipeline stage (branch profile, users, ISO_Check_ sheets,
+#   UVL builder) reads its DataFrame from the session instead of calling
+#   pd.read_excel again.
+# - Processed frames are put back into the session so later stages
+#   (e.g. the UVL builder) see the processed version without a disk
+#   round-trip.
+# - With a ColumnarStore (pipeline_store), sheets an earlier stage already
+#   persisted are read from Parquet; the XLSX is only opened for sheets
+#   the store does not have.
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+import pandas as pd
+
+if TYPE_CHECKING:
+    from pipeline_store.columnar_store import ColumnarStore
+
+MASTER_SHEETS = ("BRANCH_PROFILE", "users", "SCOPE_RULES")
+STRUCT_PREFIX = "ISO_Check_"
+
+
+def structure_sheet_filter(name: str) -> bool:
+    """Sheets the structure runner needs: master sheets + ISO_Check_*."""
+    return name in MASTER_SHEETS or str(name).startswith(STRUCT_PREFIX)
+
+
+class WorkbookSession:
+    """In-memory view of one workbook: each sheet is parsed at most once."""
+
+    def __init__(
+        self,
+        xlsx_path: str | Path,
+        sheet_filter: Optional[Callable[[str], bool]] = None,
+        store: Optional["ColumnarStore"] = None,
+    ) -> None:
+        self.path = Path(xlsx_path)
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self.from_store: List[str] = []
+        self.modified: List[str] = []
+
+        def wanted(names: List[str]) -> List[str]:
+            return [s for s in names if sheet_filter is None or sheet_filter(s)]
+
+        def load_stored(names: List[str]) -> None:
+            for s in names:
+                if s not in self._frames and store is not None and store.has(s):
+                    self._frames[s] = store.load(s)
+                    self.from_store.append(s)
+
+        # Sheet order is known without opening the workbook once a stage has recorded it
+        self.sheet_names: List[str] = store.workbook_sheets if store is not None else []
+        load_stored(wanted(self.sheet_names))
+        if self.sheet_names and all(s in self._frames for s in wanted(self.sheet_names)):
+            return
+
+        with pd.ExcelFile(self.path, engine="openpyxl") as xls:
+            book_sheets = [str(s) for s in xls.sheet_names]
+            self.sheet_names += [s for s in book_sheets if s not in self.sheet_names]
+            load_stored(wanted(self.sheet_names))
+            pending = [s for s in wanted(book_sheets) if s not in self._frames]
+            if pending:
+                self._frames.update(xls.parse(sheet_name=pending))
+        if store is not None:
+            store.set_workbook_sheets(self.sheet_names)
+
+    def has(self, sheet_name: str) -> bool:
+        return sheet_name in self._frames
+
+    def get(self, sheet_name: str) -> pd.DataFrame:
+        if sheet_name not in self._frames:
+            raise KeyError(f"Sheet '{sheet_name}' not loaded from {self.path.name}")
+        return self._frames[sheet_name]
+
+    def get_optional(self, sheet_name: str) -> Optional[pd.DataFrame]:
+        return self._frames.get(sheet_name)
+
+    def put(self, sheet_name: str, df: pd.DataFrame) -> None:
+        """Replace a sheet with its processed version (kept in original sheet order)."""
+        if sheet_name not in self.sheet_names:
+            self.sheet_names.append(sheet_name)
+        self._frames[sheet_name] = df
+        if sheet_name not in self.modified:
+            self.modified.append(sheet_name)
+
+    def sheets_with_prefix(self, prefix: str) -> List[str]:
+        return [s for s in self.sheet_names if s.startswith(prefix) and s in self._frames]
@@ -0,0 +1,106 @@
+# structurecode/workbook_writeback.py
+# ============================================================
+# Batched Write-Back — ONE atomic workbook write per file
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Processed sheets are staged in memory while the pipeline runs.
+# - commit() copies the workbook to a temp file next to it, opens ONE
+#   ExcelWriter(mode="a", if_sheet_exists="replace") on the copy, writes
+#   every staged sheet, then os.replace()s the copy over the original.
+#   openpyxl loads and serializes the workbook once, not once per sheet,
+#   and a crash mid-write never leaves a half-written ISO_DATA file.
+# - Optional sidecar mode ("parquet" / "feather") writes the staged
+#   sheets to <workbook_stem>.processed/ and leaves the workbook untouched.
+# - Mode "none" skips the export entirely (stages that hand their output
+#   over through the columnar store only).
+# ============================================================
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List
+import importlib.util
+import os
+import re
+import shutil
+import sys
+import pandas as pd
+
+# pipeline_store lives in the project root (python/)
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
+
+from pipeline_store.columnar_store import to_arrow_safe  # noqa: E402
+
+WRITEBACK_MODES = ("excel", "parquet", "feather", "none")
+SIDECAR_SUFFIX = ".processed"
+
+
+def sidecar_dir_for(xlsx_path: str | Path) -> Path:
+    xlsx_path = Path(xlsx_path)
+    return xlsx_path.with_name(f"{xlsx_path.stem}{SIDECAR_SUFFIX}")
+
+
+def _safe_file_stem(sheet_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", sheet_name)
+
+
+class WorkbookWriteBack:
+    """Collects processed sheets for one workbook and commits them in one write."""
+
+    def __init__(self, xlsx_path: str | Path, mode: str = "excel") -> None:
+        if mode not in WRITEBACK_MODES:
+            raise ValueError(f"Unknown write-back mode '{mode}'. Use one of {WRITEBACK_MODES}.")
+        if mode in ("parquet", "feather") and importlib.util.find_spec("pyarrow") is None:
+            raise ImportError(f"Write-back mode '{mode}' requires pyarrow (pip install pyarrow).")
+        self.path = Path(xlsx_path)
+        self.mode = mode
+        self._staged: Dict[str, pd.DataFrame] = {}
+
+    def stage(self, sheet_name: str, df: pd.DataFrame) -> None:
+        self._staged[sheet_name] = df
+
+    @property
+    def staged_sheets(self) -> List[str]:
+        return list(self._staged)
+
+    def commit(self) -> List[Path]:
+        """Writes everything staged so far; returns the files written."""
+        if not self._staged or self.mode == "none":
+            self._staged.clear()
+            return []
+        if self.mode == "excel":
+            written = [self._commit_excel()]
+        else:
+            written = self._commit_sidecar()
+        self._staged.clear()
+        return written
+
+    def _commit_excel(self) -> Path:
+        tmp_path = self.path.with_name(f"~{self.path.stem}.writeback{self.path.suffix}")
+        shutil.copy2(self.path, tmp_path)
+        try:
+            with pd.ExcelWriter(tmp_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+                for sheet_name, df in self._staged.items():
+                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+            os.replace(tmp_path, self.path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return self.path
+
+    def _commit_sidecar(self) -> List[Path]:
+        out_dir = sidecar_dir_for(self.path)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+        for sheet_name, df in self._staged.items():
+            safe = to_arrow_safe(df)
+            target = out_dir / f"{_safe_file_stem(sheet_name)}.{self.mode}"
+            tmp = target.with_name(target.name + ".tmp")
+            if self.mode == "parquet":
+                safe.to_parquet(tmp, index=False)
+            else:
+                safe.reset_index(drop=True).to_feather(tmp)
+            os.replace(tmp, target)
+            written.append(target)
+        return written
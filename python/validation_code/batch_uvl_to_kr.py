@@ -1,10 +1,16 @@
 from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
+import bisect
 import re
 import csv
 import argparse
+import hashlib
+import json
+import os
+import time
 
 GROUP_KINDS = {"mandatory", "optional", "alternative", "or"}
 
@@ -29,8 +35,15 @@ def _strip_inline_comment(s: str) -> str:
     return s.rstrip("\n")
 
 
+_FEATURE_DECL_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(\{abstract\})?\s*$")
+_LITERAL = r"(not\([A-Za-z_][A-Za-z0-9_]*\)|[A-Za-z_][A-Za-z0-9_]*)"
+_IMP_RE = re.compile(r"^\s*" + _LITERAL + r"\s*=>\s*" + _LITERAL + r"\s*$")
+_EQUIV_OR_RE = re.compile(r"^\s*" + _LITERAL + r"\s*<=>\s*\((.+)\)\s*$")
+_ENCODINGS = ("utf-8", "utf-8-sig", "latin-1")
+
+
 def _parse_feature_decl(line: str) -> Tuple[str, bool]:
-    m = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(\{abstract\})?\s*$", line.strip())
+    m = _FEATURE_DECL_RE.match(line.strip())
     if not m:
         raise ValueError(f"Cannot parse feature declaration: {line!r}")
     return m.group(1), bool(m.group(2))
@@ -45,168 +58,258 @@ def _normalize_constraint(line: str) -> Optional[str]:
     return s
 
 
-def _read_text_any_encoding(path: Path) -> str:
-    for enc in ("utf-8", "utf-8-sig", "latin-1"):
-        try:
-            return path.read_text(encoding=enc)
-        except Exception:
-            continue
-    return path.read_text(encoding="utf-8", errors="ignore")
-
-
-def parse_uvl(uvl_path: str) -> Tuple[Dict[str, FeatureNode], List[Group], List[str], str]:
-    path = Path(uvl_path)
-    raw_text = _read_text_any_encoding(path)
-    lines = raw_text.splitlines()
-
-    namespace = ""
-    section: Optional[str] = None  # None | "features" | "constraints"
-
-    stack: List[Tuple[int, str]] = []
-    pending_group_kind: Dict[int, str] = {}
-
-    features: Dict[str, FeatureNode] = {}
-    groups: List[Group] = []
-    constraints: List[str] = []
-
-    def current_parent(indent: int) -> Optional[str]:
-        for i in range(len(stack) - 1, -1, -1):
-            if stack[i][0] < indent:
-                return stack[i][1]
-        return None
-
-    def nearest_pending_group_indent(child_indent: int) -> Optional[int]:
-        cands = [gi for gi in pending_group_kind.keys() if gi < child_indent]
-        return max(cands) if cands else None
-
-    def add_child_to_group(parent: str, kind: str, child: str) -> None:
-        for g in groups:
-            if g.parent == parent and g.kind == kind:
-                if child not in g.children:
-                    g.children.append(child)
-                return
-        groups.append(Group(parent=parent, kind=kind, children=[child]))
-
-    for raw in lines:
-        raw = raw.rstrip("\n")
+def _iter_lines(fp: Iterable[str]) -> Iterator[str]:
+    # Same line boundaries as str.splitlines() on the whole text
+    for chunk in fp:
+        yield from chunk.splitlines()
+
+
+class _UvlStreamParser:
+    """
+    Line-at-a-time UVL parser.
+    - stack: strictly increasing (indent, feature) path to the current line,
+      so the parent is simply the top after popping indents >= current.
+    - pending group kinds are kept per indent (never cleared, as before)
+      with a sorted indent list for the "nearest indent below" lookup.
+    - groups are indexed by (parent, kind) instead of scanned.
+    """
+
+    def __init__(self) -> None:
+        self.namespace = ""
+        self.section: Optional[str] = None  # None | "features" | "constraints"
+        self.stack: List[Tuple[int, str]] = []
+        self.pending_group_kind: Dict[int, str] = {}
+        self.pending_indents: List[int] = []
+        self.features: Dict[str, FeatureNode] = {}
+        self.group_index: Dict[Tuple[str, str], Set[str]] = {}
+        self.constraints: List[str] = []
+
+    def feed(self, raw: str) -> None:
         stripped = _strip_inline_comment(raw).strip()
         if not stripped:
-            continue
+            return
 
         if stripped.lower().startswith("namespace "):
-            namespace = stripped.split(None, 1)[1].strip()
-            continue
+            self.namespace = stripped.split(None, 1)[1].strip()
+            return
 
         if stripped.lower() == "features":
-            section = "features"
-            continue
+            self.section = "features"
+            return
 
         if stripped.lower() == "constraints":
-            section = "constraints"
-            continue
+            self.section = "constraints"
+            return
 
-        if section == "constraints":
+        if self.section == "constraints":
             c = _normalize_constraint(stripped)
             if c:
-                constraints.append(c)
-            continue
+                self.constraints.append(c)
+            return
 
-        if section != "features":
-            continue
+        if self.section != "features":
+            return
 
         indent = len(raw) - len(raw.lstrip(" "))
 
-        token = stripped
-        if token in GROUP_KINDS:
-            pending_group_kind[indent] = token
-            continue
+        if stripped in GROUP_KINDS:
+            if indent not in self.pending_group_kind:
+                bisect.insort(self.pending_indents, indent)
+            self.pending_group_kind[indent] = stripped
+            return
 
-        feat_name, is_abs = _parse_feature_decl(token)
-        parent = current_parent(indent)
+        feat_name, is_abs = _parse_feature_decl(stripped)
 
+        stack = self.stack
         while stack and stack[-1][0] >= indent:
             stack.pop()
+        parent = stack[-1][1] if stack else None
         stack.append((indent, feat_name))
 
-        if feat_name not in features:
-            features[feat_name] = FeatureNode(name=feat_name, is_abstract=is_abs, parent=parent)
+        node = self.features.get(feat_name)
+        if node is None:
+            self.features[feat_name] = FeatureNode(name=feat_name, is_abstract=is_abs, parent=parent)
         else:
             if is_abs:
-                features[feat_name].is_abstract = True
+                node.is_abstract = True
             if parent:
-                features[feat_name].parent = parent
+                node.parent = parent
 
         if parent:
-            gi = nearest_pending_group_indent(indent)
-            if gi is not None:
-                kind = pending_group_kind[gi]
-                add_child_to_group(parent=parent, kind=kind, child=feat_name)
+            pos = bisect.bisect_left(self.pending_indents, indent)
+            if pos:
+                kind = self.pending_group_kind[self.pending_indents[pos - 1]]
+                self.group_index.setdefault((parent, kind), set()).add(feat_name)
 
-    for g in groups:
-        g.children = sorted(set(g.children))
+    def groups(self) -> List[Group]:
+        return [Group(parent=p, kind=k, children=sorted(ch)) for (p, k), ch in self.group_index.items()]
 
-    return features, groups, constraints, namespace
 
+def _parse_uvl_stream(path: Path) -> _UvlStreamParser:
+    for enc in _ENCODINGS:
+        parser = _UvlStreamParser()
+        try:
+            with path.open("r", encoding=enc) as fp:
+                for raw in _iter_lines(fp):
+                    parser.feed(raw)
+            return parser
+        except UnicodeDecodeError:
+            continue
+    parser = _UvlStreamParser()
+    with path.open("r", encoding="utf-8", errors="ignore") as fp:
+        for raw in _iter_lines(fp):
+            parser.feed(raw)
+    return parser
+
+
+def parse_uvl(uvl_path: str) -> Tuple[Dict[str, FeatureNode], List[Group], List[str], str]:
+    parser = _parse_uvl_stream(Path(uvl_path))
+    return parser.features, parser.groups(), parser.constraints, parser.namespace
 
-def emit_kr_facts(features: Dict[str, FeatureNode], groups: List[Group], constraints: List[str], namespace: str) -> str:
-    out: List[str] = []
 
+def iter_kr_facts(
+    features: Dict[str, FeatureNode], groups: List[Group], constraints: List[str], namespace: str
+) -> Iterator[str]:
+    """Yields the KR fact lines (without newline) in output order."""
     if namespace:
-        out.append(f"% namespace: {namespace}")
+        yield f"% namespace: {namespace}"
 
-    for fname in sorted(features.keys()):
-        out.append(f"feature({fname}).")
+    names = sorted(features.keys())
+    for fname in names:
+        yield f"feature({fname})."
         if features[fname].is_abstract:
-            out.append(f"abstract({fname}).")
+            yield f"abstract({fname})."
 
-    for fname in sorted(features.keys()):
+    for fname in names:
         p = features[fname].parent
         if p:
-            out.append(f"p({fname},{p}).")
+            yield f"p({fname},{p})."
 
     for g in sorted(groups, key=lambda x: (x.parent, x.kind)):
         children = ",".join(g.children)
-        out.append(f"group({g.parent},{g.kind},[{children}]).")
+        yield f"group({g.parent},{g.kind},[{children}])."
 
     for c in constraints:
-        m = re.match(
-            r"^\s*(not\([A-Za-z_][A-Za-z0-9_]*\)|[A-Za-z_][A-Za-z0-9_]*)\s*=>\s*"
-            r"(not\([A-Za-z_][A-Za-z0-9_]*\)|[A-Za-z_][A-Za-z0-9_]*)\s*$",
-            c,
-        )
+        m = _IMP_RE.match(c)
         if m:
-            out.append(f"imp({m.group(1)},{m.group(2)}).")
+            yield f"imp({m.group(1)},{m.group(2)})."
             continue
 
-        m2 = re.match(
-            r"^\s*(not\([A-Za-z_][A-Za-z0-9_]*\)|[A-Za-z_][A-Za-z0-9_]*)\s*<=>\s*\((.+)\)\s*$",
-            c,
-        )
+        m2 = _EQUIV_OR_RE.match(c)
         if m2:
             left = m2.group(1)
             rhs = m2.group(2)
             parts = [x.strip() for x in rhs.split("|") if x.strip()]
             for r in parts:
-                out.append(f"equiv_or({left},{r}).")
+                yield f"equiv_or({left},{r})."
             continue
 
-        out.append(f"constraint_raw({c!r}).")
+        yield f"constraint_raw({c!r})."
 
-    return "\n".join(out) + "\n"
+
+def emit_kr_facts(features: Dict[str, FeatureNode], groups: List[Group], constraints: List[str], namespace: str) -> str:
+    return "\n".join(iter_kr_facts(features, groups, constraints, namespace)) + "\n"
 
 
-def transform_one(uvl_file: Path, out_dir: Path) -> Dict[str, int]:
+def transform_one(uvl_file: Path, out_dir: Path) -> Dict[str, float]:
+    t0 = time.perf_counter()
     features, groups, constraints, namespace = parse_uvl(str(uvl_file))
-    kr_text = emit_kr_facts(features, groups, constraints, namespace)
+    t1 = time.perf_counter()
 
     out_dir.mkdir(parents=True, exist_ok=True)
     out_path = out_dir / f"{uvl_file.stem}.kr.pl"
-    out_path.write_text(kr_text, encoding="utf-8")
-
-    return {"features": len(features), "groups": len(groups), "constraints": len(constraints)}
-
-
-def run_batch(input_dir: str, output_dir: str, pattern: str = "*.uvl") -> None:
+    # Facts are written as they are generated; the KR text is never built in memory
+    with out_path.open("w", encoding="utf-8") as fp:
+        n_lines = 0
+        for line in iter_kr_facts(features, groups, constraints, namespace):
+            fp.write(line + "\n")
+            n_lines += 1
+        if not n_lines:
+            fp.write("\n")
+
+    return {
+        "features": len(features),
+        "groups": len(groups),
+        "constraints": len(constraints),
+        "parse_seconds": round(t1 - t0, 4),
+        "emit_seconds": round(time.perf_counter() - t1, 4),
+    }
+
+
+# =========================
+# Batch: manifest + process pool
+# =========================
+MANIFEST_NAME = ".kr_manifest.json"
+# Bump whenever parse_uvl / iter_kr_facts change the emitted facts: older .kr.pl files are re-emitted
+KR_EMITTER_VERSION = 1
+TIMING_FIELDS = ("parse_seconds", "emit_seconds")
+SUMMARY_FIELDS = [
+    "uvl_file", "kr_file", "features", "groups", "constraints", "error",
+    "uvl_bytes", "kr_bytes", "parse_seconds", "emit_seconds", "skipped", "timings_reused",
+]
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_manifest(path: Path) -> Dict[str, Dict]:
+    try:
+        return dict(json.loads(path.read_text(encoding="utf-8")))
+    except Exception:
+        return {}
+
+
+def _save_manifest(path: Path, manifest: Dict[str, Dict]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _transform_task(uvl_file: Path, out_dir: Path) -> Dict:
+    """Worker entry point: transform one file, never raise."""
+    t0 = time.perf_counter()
+    try:
+        stats = transform_one(uvl_file, out_dir)
+        error = ""
+    except Exception as e:
+        stats = {"features": 0, "groups": 0, "constraints": 0,
+                 "parse_seconds": round(time.perf_counter() - t0, 4), "emit_seconds": 0.0}
+        error = str(e)
+    return {**stats, "error": error}
+
+
+def _is_unchanged(uvl_file: Path, kr_path: Path, entry: Optional[Dict], st: os.stat_result) -> Tuple[bool, Optional[str]]:
+    """mtime+size match skips without hashing; otherwise the content hash decides."""
+    if not entry or entry.get("error") or not kr_path.exists():
+        return False, None
+    if entry.get("emitter_version") != KR_EMITTER_VERSION:
+        return False, None
+    if entry.get("mtime_ns") == st.st_mtime_ns and entry.get("uvl_bytes") == st.st_size:
+        return True, entry.get("sha256")
+    digest = _file_sha256(uvl_file)
+    return digest == entry.get("sha256"), digest
+
+
+def run_batch(
+    input_dir: str,
+    output_dir: str,
+    pattern: str = "*.uvl",
+    jobs: int = 1,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+) -> None:
+    """
+    jobs > 1 (or a shared executor) transforms files in a process pool.
+    Files whose mtime+size or SHA-256 match the manifest entry of their last
+    successful transformation (by the same KR_EMITTER_VERSION) are skipped
+    unless force=True. Skipped rows of kr_summary.csv carry the timings of
+    that earlier run (timings_reused=1).
+    """
     in_dir = Path(input_dir)
     out_dir = Path(output_dir)
 
@@ -218,36 +321,95 @@ def run_batch(input_dir: str, output_dir: str, pattern: str = "*.uvl") -> None:
         print(f"⚠️ No UVL files found under: {in_dir.resolve()} with pattern: {pattern}")
         return
 
-    summary_rows = []
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+
     print(f"📂 Input : {in_dir.resolve()}")
     print(f"📁 Output: {out_dir.resolve()}")
     print(f"🔎 Found : {len(uvl_files)} UVL files")
     print("-" * 80)
 
+    # Decide what needs work (stat first, hash only when mtime/size moved)
+    plan = []
+    for f in uvl_files:
+        key = str(f.resolve())
+        kr_path = out_dir / f"{f.stem}.kr.pl"
+        st = f.stat()
+        unchanged, digest = (False, None) if force else _is_unchanged(f, kr_path, manifest.get(key), st)
+        plan.append((f, key, kr_path, st, unchanged, digest))
+
+    todo = [p[0] for p in plan if not p[4]]
+    own_pool = None
+    if todo and executor is None and jobs > 1:
+        own_pool = ProcessPoolExecutor(max_workers=jobs)
+    pool = executor or own_pool
+    try:
+        if pool is not None:
+            results = dict(zip(todo, pool.map(_transform_task, todo, [out_dir] * len(todo))))
+        else:
+            results = {f: _transform_task(f, out_dir) for f in todo}
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
+
+    summary_rows = []
     ok = 0
     fail = 0
-
-    for f in uvl_files:
-        try:
-            stats = transform_one(f, out_dir)
-            ok += 1
-            print(f"✅ {f.name} -> {f.stem}.kr.pl | features={stats['features']} groups={stats['groups']} constraints={stats['constraints']}")
-            summary_rows.append({"uvl_file": str(f), "kr_file": str(out_dir / f"{f.stem}.kr.pl"), **stats, "error": ""})
-        except Exception as e:
-            fail += 1
-            print(f"❌ FAIL {f.name}: {e}")
-            summary_rows.append({"uvl_file": str(f), "kr_file": "", "features": 0, "groups": 0, "constraints": 0, "error": str(e)})
+    skipped = 0
+
+    for f, key, kr_path, st, unchanged, digest in plan:
+        if unchanged:
+            entry = manifest[key]
+            entry["mtime_ns"] = st.st_mtime_ns
+            skipped += 1
+            print(f"⏭️  {f.name} unchanged -> {f.stem}.kr.pl")
+            res = {k: entry.get(k, 0) for k in ("features", "groups", "constraints") + TIMING_FIELDS}
+            res["error"] = ""
+        else:
+            res = results[f]
+            if res["error"]:
+                fail += 1
+                print(f"❌ FAIL {f.name}: {res['error']}")
+                manifest.pop(key, None)
+            else:
+                ok += 1
+                print(f"✅ {f.name} -> {f.stem}.kr.pl | features={res['features']} groups={res['groups']} constraints={res['constraints']}")
+                manifest[key] = {
+                    "mtime_ns": st.st_mtime_ns,
+                    "uvl_bytes": st.st_size,
+                    "sha256": digest or _file_sha256(f),
+                    "emitter_version": KR_EMITTER_VERSION,
+                    **{k: res[k] for k in ("features", "groups", "constraints") + TIMING_FIELDS},
+                }
+
+        failed = bool(res["error"])
+        summary_rows.append({
+            "uvl_file": str(f),
+            "kr_file": "" if failed else str(kr_path),
+            "features": res["features"],
+            "groups": res["groups"],
+            "constraints": res["constraints"],
+            "error": res["error"],
+            "uvl_bytes": st.st_size,
+            "kr_bytes": 0 if failed or not kr_path.exists() else kr_path.stat().st_size,
+            "parse_seconds": res["parse_seconds"],
+            "emit_seconds": res["emit_seconds"],
+            "skipped": int(unchanged),
+            "timings_reused": int(unchanged),
+        })
+
+    _save_manifest(manifest_path, manifest)
 
     csv_path = out_dir / "kr_summary.csv"
-    fieldnames = ["uvl_file", "kr_file", "features", "groups", "constraints", "error"]
     with csv_path.open("w", newline="", encoding="utf-8") as fp:
-        w = csv.DictWriter(fp, fieldnames=fieldnames)
+        w = csv.DictWriter(fp, fieldnames=SUMMARY_FIELDS)
         w.writeheader()
         for r in summary_rows:
-            w.writerow({k: r.get(k, "") for k in fieldnames})
+            w.writerow({k: r.get(k, "") for k in SUMMARY_FIELDS})
 
     print("-" * 80)
-    print(f"✅ Done. success={ok} fail={fail}")
+    print(f"✅ Done. success={ok} skipped={skipped} fail={fail}")
     print(f"📄 Summary CSV: {csv_path.resolve()}")
 
 
@@ -256,8 +418,10 @@ def main():
     ap.add_argument("--input", "-i", required=True, help="Input folder containing .uvl files (recursive)")
     ap.add_argument("--output", "-o", required=True, help="Output folder to store .kr.pl files")
     ap.add_argument("--pattern", "-p", default="*.uvl", help="Glob pattern (default: *.uvl)")
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes (default: 1 = sequential)")
+    ap.add_argument("--force", action="store_true", help="Re-transform every file, ignoring the manifest")
     args = ap.parse_args()
-    run_batch(args.input, args.output, args.pattern)
+    run_batch(args.input, args.output, args.pattern, jobs=args.jobs, force=args.force)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@
 # FINAL LOGIC ANALYZER (ONE-EXCEL REPORT, STABLE ARTIFACT)
 # Core truth: compares KR (clean vs injected) directly.
 # Optional enrichment: reads SAT/time/NF from existing CSV/Excel if available.
+# Dead features / false optionals / void models are decided exactly by the
+# in-process CNF compiler + CDCL solver (kr_sat_solver.py).
 #
 # Outputs:
 #  - FINAL_Verification_Report.xlsx (multiple stable sheets)
@@ -13,13 +15,20 @@
 
 from __future__ import annotations
 
+import ast
+import os
+import pickle
 import re
+import time
+from collections import defaultdict, deque
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple
 
 import pandas as pd
 
+from kr_sat_solver import compile_kr, decide_defects
+
 
 # ----------------------------
 # Fixed Root
@@ -37,6 +46,7 @@ INJECTED_KR_DIR_NAME = "prolog_facts_v5"
 # ----------------------------
 SAT_RESULTS_CSV_NAME = "final_phd_validation_results_sat.csv"
 FINAL_REPORT_XLSX_NAME = "FINAL_Verification_Report.xlsx"
+KR_CACHE_FILE_NAME = ".kr_model_cache.pkl"
 
 # ----------------------------
 # Stable sheet names (do not change)
@@ -82,6 +92,9 @@ _RE_IMP = re.compile(
     r"^\s*imp\(\s*([^,]+?)\s*,\s*(.+?)\s*\)\.\s*$",
     re.MULTILINE,
 )
+_RE_PARENT = re.compile(r"^\s*p\(\s*([^,]+?)\s*,\s*([^)]+?)\s*\)\.\s*$", re.MULTILINE)
+_RE_EQUIV_OR = re.compile(r"^\s*equiv_or\(\s*([^,]+?)\s*,\s*([^)]+?)\s*\)\.\s*$", re.MULTILINE)
+_RE_CONSTRAINT_RAW = re.compile(r"^\s*constraint_raw\((.*)\)\.\s*$", re.MULTILINE)
 
 
 def derive_model_key(filename: str) -> str:
@@ -134,6 +147,20 @@ class KRModel:
     features: Set[str]
     groups: List[Tuple[str, str, List[str]]]  # (parent, gtype, children)
     imps: List[Tuple[str, str]]               # raw (lhs, rhs)
+    parents: List[Tuple[str, str]] = field(default_factory=list)          # p(child, parent)
+    equiv_or: List[Tuple[str, str]] = field(default_factory=list)         # (left, one rhs disjunct)
+    constraints_raw: List[str] = field(default_factory=list)              # UVL expression text
+
+
+def _unquote_constraint(blob: str) -> str:
+    blob = blob.strip()
+    try:
+        value = ast.literal_eval(blob)
+        if isinstance(value, str):
+            return value
+    except (ValueError, SyntaxError):
+        pass
+    return blob.strip("'\"")
 
 
 def load_kr_model(path: Path) -> KRModel:
@@ -151,7 +178,94 @@ def load_kr_model(path: Path) -> KRModel:
     for lhs, rhs in _RE_IMP.findall(text):
         imps.append((lhs.strip(), rhs.strip()))
 
-    return KRModel(path=path, features=features, groups=groups, imps=imps)
+    parents = [(c.strip(), par.strip()) for c, par in _RE_PARENT.findall(text)]
+    equiv_or = [(left.strip(), right.strip()) for left, right in _RE_EQUIV_OR.findall(text)]
+    constraints_raw = [_unquote_constraint(c) for c in _RE_CONSTRAINT_RAW.findall(text)]
+
+    return KRModel(
+        path=path,
+        features=features,
+        groups=groups,
+        imps=imps,
+        parents=parents,
+        equiv_or=equiv_or,
+        constraints_raw=constraints_raw,
+    )
+
+
+class KRModelCache:
+    """
+    One parse per KR file: parsed models are kept in memory by resolved
+    path. With cache_path, the parsed facts are also pickled to disk and
+    reused on the next run while the file's mtime and size are unchanged.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_path: Optional[Path] = None) -> None:
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._models: Dict[str, KRModel] = {}
+        self._disk: Dict[str, Tuple[int, int, tuple]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.parses = 0
+        if self.cache_path and self.cache_path.exists():
+            try:
+                with self.cache_path.open("rb") as fp:
+                    payload = pickle.load(fp)
+                if payload.get("version") == self.VERSION:
+                    self._disk = payload["entries"]
+            except Exception:
+                self._disk = {}
+
+    def get(self, path: Path) -> KRModel:
+        key = str(Path(path).resolve())
+        st = os.stat(key)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        model = self._models.get(key)
+        if model is not None and self._disk.get(key, (None, None))[:2] == stamp:
+            self.hits += 1
+            return model
+
+        entry = self._disk.get(key)
+        if entry is not None and entry[:2] == stamp:
+            features, groups, imps, parents, equiv_or, constraints_raw = entry[2]
+            model = KRModel(
+                path=Path(path),
+                features=set(features),
+                groups=[(par, g, list(ch)) for par, g, ch in groups],
+                imps=list(imps),
+                parents=list(parents),
+                equiv_or=list(equiv_or),
+                constraints_raw=list(constraints_raw),
+            )
+            self.hits += 1
+        else:
+            model = load_kr_model(Path(path))
+            self.parses += 1
+            self._disk[key] = stamp + ((
+                sorted(model.features),
+                [(par, g, tuple(ch)) for par, g, ch in model.groups],
+                model.imps,
+                model.parents,
+                model.equiv_or,
+                model.constraints_raw,
+            ),)
+            self._dirty = True
+        self._models[key] = model
+        return model
+
+    def save(self) -> None:
+        if not self.cache_path or not self._dirty:
+            return
+        # drop entries for files that no longer exist
+        self._disk = {k: v for k, v in self._disk.items() if os.path.exists(k)}
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with tmp.open("wb") as fp:
+            pickle.dump({"version": self.VERSION, "entries": self._disk}, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
 
 
 def index_kr_files(root_dir: Path) -> Dict[str, Path]:
@@ -179,6 +293,93 @@ class KRAnalysis:
     defects_raw: List[str]
     defects_filtered: List[str]
     is_visit_type_artifact: bool
+    satisfiable: bool = True
+    solve_seconds: float = 0.0
+
+
+@dataclass
+class KRPropagation:
+    always: Set[str]      # forced true
+    forbidden: Set[str]   # forced false
+    conflict: bool        # some name forced both ways -> void model
+
+
+def propagate_kr_literals(
+    root: str,
+    groups: List[Tuple[str, str, List[str]]],
+    imps: List[Tuple[str, str]],
+    parents: List[Tuple[str, str]] = (),
+    equiv_or: List[Tuple[str, str]] = (),
+) -> KRPropagation:
+    """
+    Worklist unit propagation from root=true. Every fact is indexed once by
+    the literal that triggers it and the queue is drained once, so the run
+    is linear in model size:
+      x              -> parent true; mandatory children true;
+                        single child of an or/alternative group true;
+                        other children of its alternative groups false
+      !x             -> all children false; mandatory parent false
+      imp(a, b)      -> a gives b, !b gives !a (either side may be not(x))
+      equiv_or(L, r) -> r gives L, !L gives !r
+    """
+    implied: Dict[Tuple[str, bool], List[Tuple[str, bool]]] = defaultdict(list)
+    alternatives_of: Dict[str, List[List[str]]] = defaultdict(list)
+
+    for child, parent in parents:
+        implied[(child, True)].append((parent, True))
+        implied[(parent, False)].append((child, False))
+
+    for parent, gtype, children in groups:
+        for c in children:
+            implied[(c, True)].append((parent, True))
+            implied[(parent, False)].append((c, False))
+        if gtype == "mandatory" or (gtype in {"alternative", "or"} and len(children) == 1):
+            for c in children:
+                implied[(parent, True)].append((c, True))
+                implied[(c, False)].append((parent, False))
+        elif gtype == "alternative":
+            for c in children:
+                alternatives_of[c].append(children)
+
+    for lhs_raw, rhs_raw in imps:
+        lhs_pos, lhs_feat = parse_literal(lhs_raw)
+        rhs_pos, rhs_feat = parse_literal(rhs_raw)
+        implied[(lhs_feat, lhs_pos)].append((rhs_feat, rhs_pos))
+        implied[(rhs_feat, not rhs_pos)].append((lhs_feat, not lhs_pos))
+
+    for left, right in equiv_or:
+        implied[(right, True)].append((left, True))
+        implied[(left, False)].append((right, False))
+
+    value: Dict[str, bool] = {}
+    queue: deque = deque()
+    conflict = False
+
+    def assign(name: str, val: bool) -> None:
+        nonlocal conflict
+        current = value.get(name)
+        if current is None:
+            value[name] = val
+            queue.append((name, val))
+        elif current != val:
+            conflict = True
+
+    assign(root, True)
+    while queue:
+        name, val = queue.popleft()
+        for other, other_val in implied.get((name, val), ()):
+            assign(other, other_val)
+        if val:
+            for siblings in alternatives_of.get(name, ()):
+                for s in siblings:
+                    if s != name:
+                        assign(s, False)
+
+    return KRPropagation(
+        always={n for n, v in value.items() if v},
+        forbidden={n for n, v in value.items() if not v},
+        conflict=conflict,
+    )
 
 
 def compute_structural_always(root: str, groups: List[Tuple[str, str, List[str]]]) -> Set[str]:
@@ -188,30 +389,18 @@ def compute_structural_always(root: str, groups: List[Tuple[str, str, List[str]]
     - mandatory-group children of always-parent are always
     - alternative/or with single child under always-parent -> child always
     """
-    by_parent: Dict[str, List[Tuple[str, List[str]]]] = {}
-    for parent, gtype, children in groups:
-        by_parent.setdefault(parent, []).append((gtype, children))
-
-    always: Set[str] = {root}
-    changed = True
-    while changed:
-        changed = False
-        for parent in list(always):
-            for gtype, children in by_parent.get(parent, []):
-                if gtype == "mandatory":
-                    for c in children:
-                        if c not in always:
-                            always.add(c)
-                            changed = True
-                elif gtype in {"alternative", "or"} and len(children) == 1:
-                    c = children[0]
-                    if c not in always:
-                        always.add(c)
-                        changed = True
-    return always
+    return propagate_kr_literals(root, groups, imps=[]).always
 
 
 def analyze_kr_for_defects(kr: KRModel, model_key: str, root: str = ROOT_FEATURE) -> KRAnalysis:
+    """
+    Exact analysis on the CNF of the whole KR model (structure, imp/2,
+    equiv_or/2, constraint_raw/1):
+      - void: no configuration exists (defects: VOID:<root>)
+      - DF: names that no configuration selects
+      - FO: optional children of the root selected in every configuration
+    """
+    t0 = time.perf_counter()
     nf = len(kr.features)
     constraints = len(kr.imps)
 
@@ -228,34 +417,38 @@ def analyze_kr_for_defects(kr: KRModel, model_key: str, root: str = ROOT_FEATURE
         if parent == root and gtype == "optional":
             root_optional.update(children)
 
-    # Compute always + forward-chaining on implications
-    always = compute_structural_always(root, kr.groups) if root in kr.features else set()
-    forbidden: Set[str] = set()
-
-    changed = True
-    while changed:
-        changed = False
-        for lhs_raw, rhs_raw in kr.imps:
-            lhs_pos, lhs_feat = parse_literal(lhs_raw)
-            if not lhs_pos:
-                continue
-            if lhs_feat not in always:
-                continue
+    has_root = root in kr.features
 
-            rhs_pos, rhs_feat = parse_literal(rhs_raw)
-            if rhs_pos:
-                if rhs_feat not in always:
-                    always.add(rhs_feat)
-                    changed = True
-            else:
-                if rhs_feat not in forbidden:
-                    forbidden.add(rhs_feat)
-                    changed = True
+    # Linear pre-pass: forced literals need no SAT query
+    forced = (
+        propagate_kr_literals(root, kr.groups, kr.imps, parents=kr.parents, equiv_or=kr.equiv_or)
+        if has_root
+        else KRPropagation(always=set(), forbidden=set(), conflict=False)
+    )
 
-    dead_features = set(forbidden)
-    false_optional = (root_optional & always) if root in kr.features else set()
+    cnf = compile_kr(
+        kr.features,
+        kr.parents,
+        kr.groups,
+        kr.imps,
+        equiv_or=kr.equiv_or,
+        constraints_raw=kr.constraints_raw,
+        root=root if has_root else None,
+        parse_literal=parse_literal,
+    )
+    decision = decide_defects(
+        cnf,
+        dead_candidates=cnf.names,
+        fo_candidates=[(c, root) for c in sorted(root_optional)] if has_root else [],
+        forced_true=forced.always,
+        forced_false=forced.forbidden,
+    )
+    dead_features = decision.dead
+    false_optional = decision.false_optional
 
     defects_raw: List[str] = []
+    if not decision.satisfiable:
+        defects_raw.append(f"VOID:{root}")
     for d in sorted(dead_features):
         defects_raw.append(f"DF:{d}")
     for fo in sorted(false_optional):
@@ -278,6 +471,8 @@ def analyze_kr_for_defects(kr: KRModel, model_key: str, root: str = ROOT_FEATURE
         defects_raw=defects_raw,
         defects_filtered=defects_filtered,
         is_visit_type_artifact=is_visit_type_artifact,
+        satisfiable=decision.satisfiable,
+        solve_seconds=time.perf_counter() - t0,
     )
 
 
@@ -401,9 +596,11 @@ def _sanity_print_folders(clean_dir: Path, inj_dir: Path, clean_index: Dict[str,
     print("============================================================")
 
 
-def build_final_report() -> Path:
+def build_final_report(kr_cache: bool = True) -> Path:
+    """kr_cache=False skips the on-disk KR parse cache (the in-memory one is always used)."""
     script_dir = Path(__file__).resolve().parent
     base_dir = script_dir.parent
+    kr_models = KRModelCache(script_dir / KR_CACHE_FILE_NAME if kr_cache else None)
 
     clean_dir = base_dir / CLEAN_KR_DIR_NAME
     inj_dir = base_dir / INJECTED_KR_DIR_NAME
@@ -428,6 +625,11 @@ def build_final_report() -> Path:
     else:
         opt_df = pd.DataFrame(columns=CANON_COLS + ["ModelKey", "Group_norm"])
 
+    # First prior-result row per (ModelKey, group): one dict lookup per run row
+    opt_lookup: Dict[Tuple[str, str], Dict[str, object]] = {}
+    for rec in opt_df.to_dict("records"):
+        opt_lookup.setdefault((rec["ModelKey"], rec["Group_norm"]), rec)
+
     # Pairs KR-first
     pairs = build_pairs_from_kr(clean_index, inj_index)
     df_pairs = pd.DataFrame(pairs)
@@ -441,12 +643,12 @@ def build_final_report() -> Path:
 
         cf = row["CleanFile"]
         if cf:
-            kr_c = load_kr_model(clean_index[cf])
+            kr_c = kr_models.get(clean_index[cf])
             clean_analysis[mk] = analyze_kr_for_defects(kr_c, mk, root=ROOT_FEATURE)
 
         inf = row["InjectedFile"]
         if inf:
-            kr_i = load_kr_model(inj_index[inf])
+            kr_i = kr_models.get(inj_index[inf])
             inj_analysis[mk] = analyze_kr_for_defects(kr_i, mk, root=ROOT_FEATURE)
 
     # Build RunTable rows
@@ -477,8 +679,8 @@ def build_final_report() -> Path:
             nf_kr = ana.nf if ana else 0
             cons_kr = ana.constraints if ana else 0
 
-            sat_val = ""
-            tsec = 0.0
+            sat_val = ("SAT" if ana.satisfiable else "UNSAT") if ana else ""
+            tsec = ana.solve_seconds if ana else 0.0
             nf_val = nf_kr
             cons_val = cons_kr
             n_dead = len(ana.dead_features) if ana else 0
@@ -486,10 +688,9 @@ def build_final_report() -> Path:
             defects = ";".join(ana.defects_raw) if ana else ""
 
             # Enrich from opt results if exists
-            if not opt_df.empty:
-                m = opt_df[(opt_df["ModelKey"] == mk) & (opt_df["Group_norm"] == grp.lower())]
-                if not m.empty:
-                    r = m.iloc[0]
+            if opt_lookup:
+                r = opt_lookup.get((mk, grp.lower()))
+                if r is not None:
                     sat_val = r.get("SAT", "")
                     tsec = float(r.get("TimeSec", 0.0))
                     try:
@@ -527,6 +728,11 @@ def build_final_report() -> Path:
     df_clean = df_all[df_all["Group"].str.lower() == "clean"].copy()
     df_inj = df_all[df_all["Group"].str.lower() == "injected"].copy()
 
+    # First run-table row per (ModelKey, group)
+    run_lookup: Dict[Tuple[str, str], Dict[str, object]] = {}
+    for rec in df_all.to_dict("records"):
+        run_lookup.setdefault((rec["ModelKey"], str(rec["Group"]).lower()), rec)
+
     # Verification: KR diff
     verify_rows: List[Dict[str, object]] = []
     for row in pairs:
@@ -543,14 +749,14 @@ def build_final_report() -> Path:
         sat_from_results = ""
         nf_from_results = 0
 
-        inj_row = df_inj[df_inj["ModelKey"] == mk]
-        clean_row = df_clean[df_clean["ModelKey"] == mk]
-        if not inj_row.empty:
-            nf_from_results = int(inj_row.iloc[0].get("NF", 0))
-            sat_from_results = inj_row.iloc[0].get("SAT", "")
-        elif not clean_row.empty:
-            nf_from_results = int(clean_row.iloc[0].get("NF", 0))
-            sat_from_results = clean_row.iloc[0].get("SAT", "")
+        inj_row = run_lookup.get((mk, "injected"))
+        clean_row = run_lookup.get((mk, "clean"))
+        if inj_row is not None:
+            nf_from_results = int(inj_row.get("NF", 0))
+            sat_from_results = inj_row.get("SAT", "")
+        elif clean_row is not None:
+            nf_from_results = int(clean_row.get("NF", 0))
+            sat_from_results = clean_row.get("SAT", "")
         else:
             nf_from_results = (
                 inj_analysis.get(mk).nf if mk in inj_analysis
@@ -559,8 +765,8 @@ def build_final_report() -> Path:
             )
 
         if cf and inf:
-            kr_c = load_kr_model(clean_index[cf])
-            kr_i = load_kr_model(inj_index[inf])
+            kr_c = kr_models.get(clean_index[cf])
+            kr_i = kr_models.get(inj_index[inf])
             s_c = imp_set(kr_c)
             s_i = imp_set(kr_i)
             new_imps = s_i - s_c
@@ -575,7 +781,7 @@ def build_final_report() -> Path:
         ana_i = inj_analysis.get(mk)
         detected_raw = ";".join(ana_i.defects_raw) if ana_i else ""
         detected_filtered = ";".join(ana_i.defects_filtered) if ana_i else ""
-        detected_any = bool(detected_filtered.strip())
+        detected_any = bool(detected_filtered.strip())  # a void injected model reports VOID:<root>
 
         if not injection_present:
             status = "MISSING_INJECTION"
@@ -612,6 +818,7 @@ def build_final_report() -> Path:
         )
 
     df_verify = pd.DataFrame(verify_rows)
+    kr_models.save()
 
     # Tables for misses
     df_det_miss = df_verify[df_verify["Status"] == "DETECTOR_MISS"].copy()
@@ -639,19 +846,21 @@ def build_final_report() -> Path:
     df_fn = df_det_miss.copy()
 
     # Delta time
+    verify_lookup: Dict[str, Dict[str, object]] = {}
+    for rec in verify_rows:
+        verify_lookup.setdefault(rec["ModelKey"], rec)
+
     delta_rows = []
     for mk in sorted(set(df_clean["ModelKey"]) & set(df_inj["ModelKey"])):
-        c = df_clean[df_clean["ModelKey"] == mk]
-        i = df_inj[df_inj["ModelKey"] == mk]
-        if c.empty or i.empty:
-            continue
-        tc = float(c.iloc[0].get("TimeSec", 0.0))
-        ti = float(i.iloc[0].get("TimeSec", 0.0))
-        nf = int(i.iloc[0].get("NF", 0))
+        c = run_lookup[(mk, "clean")]
+        i = run_lookup[(mk, "injected")]
+        tc = float(c.get("TimeSec", 0.0))
+        ti = float(i.get("TimeSec", 0.0))
+        nf = int(i.get("NF", 0))
         inj_present = False
-        v = df_verify[df_verify["ModelKey"] == mk]
-        if not v.empty:
-            inj_present = bool(v.iloc[0].get("InjectionPresent", False))
+        v = verify_lookup.get(mk)
+        if v is not None:
+            inj_present = bool(v.get("InjectionPresent", False))
 
         delta_rows.append(
             {
@@ -719,8 +928,14 @@ def build_final_report() -> Path:
     return out_xlsx
 
 
-def main() -> None:
-    out = build_final_report()
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Build FINAL_Verification_Report.xlsx from the clean/injected KR folders.")
+    ap.add_argument("--no-kr-cache", action="store_true", help=f"Do not read/write {KR_CACHE_FILE_NAME}")
+    args = ap.parse_args(argv)
+
+    out = build_final_report(kr_cache=not args.no_kr_cache)
     print(f"✅ FINAL report generated: {out}")
     print(f"✅ Compatibility CSV written: {out.parent / SAT_RESULTS_CSV_NAME}")
     print("✅ Stable artifact: sheet names and core columns remain fixed.")
@@ -1,3 +1,4 @@
+import argparse
 import os
 import random
 import re
@@ -20,7 +21,6 @@ SOURCE_DIR = os.path.join(BASE_DIR, "structurecode", "uvl_outputs_10models", "IS
 
 # Output injected UVLs
 OUTPUT_DIR = os.path.join(BASE_DIR, "uvl_scientific_defects_v5")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 ROOT = "InternalAuditSystem"
 
@@ -47,7 +47,8 @@ def _extract_features_uvl(all_text: str):
     return sorted(set(feats))
 
 
-def inject_and_track_defects(file_path, out_path):
+def inject_and_track_defects(file_path, out_path, rng=None):
+    # rng: optional random.Random for reproducible runs (benchmarks); default = module random
     lines = _read_lines_any_encoding(file_path)
     all_text = "".join(lines)
 
@@ -56,7 +57,7 @@ def inject_and_track_defects(file_path, out_path):
         return None, "Not enough features to inject 3 constraints"
 
     # اختيار 3 ميزات عشوائية للحقن
-    df_feat, fo_feat, re_feat = random.sample(potential_targets, 3)
+    df_feat, fo_feat, re_feat = (rng or random).sample(potential_targets, 3)
 
     # قيود UVL نقية (بدون تعليقات)
     injected_constraints = [
@@ -93,42 +94,63 @@ def inject_and_track_defects(file_path, out_path):
     }, "Success"
 
 
-# --- التنفيذ الرئيسي ---
-print(f"{'Source File Name':<55} | {'Status'}")
-print("-" * 120)
+def run_injection(source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR, seed=None, write_key=True):
+    """Injects every *.uvl in source_dir; returns the oracle key as a DataFrame."""
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed) if seed is not None else None
 
-tracking_list = []
+    print(f"{'Source File Name':<55} | {'Status'}")
+    print("-" * 120)
 
-for filename in sorted(os.listdir(SOURCE_DIR)):
-    if not filename.endswith(".uvl"):
-        continue
+    tracking_list = []
 
-    src_p = os.path.join(SOURCE_DIR, filename)
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.endswith(".uvl"):
+            continue
 
-    # ✅ naming FIX: keep same stem and add "_injected"
-    stem = filename[:-4]  # remove ".uvl"
-    out_n = f"{stem}_injected.uvl"
-    target_p = os.path.join(OUTPUT_DIR, out_n)
+        src_p = os.path.join(source_dir, filename)
 
-    defect_data, status = inject_and_track_defects(src_p, target_p)
+        # ✅ naming FIX: keep same stem and add "_injected"
+        stem = filename[:-4]  # remove ".uvl"
+        out_n = f"{stem}_injected.uvl"
+        target_p = os.path.join(output_dir, out_n)
 
-    if defect_data:
-        tracking_list.append(defect_data)
-        print(f"{filename:<55} | ✅ Injected -> {out_n}")
-    else:
-        print(f"{filename:<55} | ❌ {status}")
+        defect_data, status = inject_and_track_defects(src_p, target_p, rng=rng)
 
-# --- حفظ مفتاح العيوب (The Oracle Key) ---
-if tracking_list:
+        if defect_data:
+            tracking_list.append(defect_data)
+            print(f"{filename:<55} | ✅ Injected -> {out_n}")
+        else:
+            print(f"{filename:<55} | ❌ {status}")
+
+    # --- حفظ مفتاح العيوب (The Oracle Key) ---
     df_key = pd.DataFrame(tracking_list)
-    df_key.to_excel(os.path.join(OUTPUT_DIR, "Defect_Injected_Key.xlsx"), index=False)
-    df_key.to_csv(os.path.join(OUTPUT_DIR, "Defect_Injected_Key.csv"), index=False, encoding="utf-8-sig")
-
-    print("\n" + "=" * 60)
-    print("🚀 DONE! Injected UVL files generated in:")
-    print(f"   {OUTPUT_DIR}")
-    print("📄 Oracle key saved:")
-    print("   Defect_Injected_Key.xlsx / Defect_Injected_Key.csv")
-    print("=" * 60)
-else:
-    print("\n⚠️ No files injected. Check SOURCE_DIR and UVL contents.")
+    if tracking_list:
+        if write_key:
+            df_key.to_excel(os.path.join(output_dir, "Defect_Injected_Key.xlsx"), index=False)
+            df_key.to_csv(os.path.join(output_dir, "Defect_Injected_Key.csv"), index=False, encoding="utf-8-sig")
+
+        print("\n" + "=" * 60)
+        print("🚀 DONE! Injected UVL files generated in:")
+        print(f"   {output_dir}")
+        if write_key:
+            print("📄 Oracle key saved:")
+            print("   Defect_Injected_Key.xlsx / Defect_Injected_Key.csv")
+        print("=" * 60)
+    else:
+        print("\n⚠️ No files injected. Check SOURCE_DIR and UVL contents.")
+    return df_key
+
+
+# --- التنفيذ الرئيسي ---
+def main():
+    ap = argparse.ArgumentParser(description="Inject DF1 / FO / RE defects into clean UVL models")
+    ap.add_argument("--source", default=SOURCE_DIR, help="Folder of clean .uvl files")
+    ap.add_argument("--output", default=OUTPUT_DIR, help="Folder for *_injected.uvl + oracle key")
+    ap.add_argument("--seed", type=int, default=None, help="Random seed (default: unseeded)")
+    args = ap.parse_args()
+    run_injection(args.source, args.output, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,723 @@
+# kr_sat_solver.py
+# ============================================================
+# KR -> CNF COMPILER + CDCL SAT SOLVER (pure Python, in-process)
+# ------------------------------------------------------------
+# LOGIC & METHODOLOGY:
+# - Every KR fact is compiled to clauses over one boolean variable per
+#   feature name:
+#     root                      -> root
+#     p(c, parent)              -> c => parent
+#     group(P, mandatory, Cs)   -> P <=> c            (each c)
+#     group(P, optional, Cs)    -> c => P
+#     group(P, or, Cs)          -> P <=> (c1 | ... | ck)
+#     group(P, alternative, Cs) -> P <=> (c1 | ... | ck), at most one ci
+#     imp(a, b)                 -> a => b             (a / b may be not(x))
+#     equiv_or(L, r)            -> L <=> (r1 | ... | rk)   (grouped by L)
+#     constraint_raw('expr')    -> Tseitin encoding of the UVL expression
+#                                  (! & | => <=>); unparseable ones are
+#                                  counted and skipped
+# - CdclSolver: conflict-driven clause learning with two watched literals
+#   (binary clauses get their own implication lists), first-UIP learning,
+#   VSIDS-style activities, phase saving and Luby restarts.
+# - solve(assumptions) treats assumptions as the first decisions, so every
+#   learned clause follows from the formula alone and is kept for the next
+#   query. The per-feature dead / false-optional queries all share one
+#   solver instance.
+# - decide_defects() first collects satisfying assignments: any feature
+#   true in some model is alive, any optional child false while its parent
+#   is true is not false-optional. Only the remaining candidates need a
+#   dedicated assumption query, and each query prefers the still-uncovered
+#   candidates (and deselects covered ones) so one model retires as many
+#   candidates as possible.
+# ============================================================
+
+from __future__ import annotations
+
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+# ============================================================
+# CDCL solver
+# ============================================================
+
+def _luby(i: int) -> int:
+    """i-th element (1-based) of the Luby restart sequence 1,1,2,1,1,2,4,..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class CdclSolver:
+    """
+    Clauses use DIMACS-style literals (+v / -v, v >= 1). Internally a
+    literal is 2*v (positive) or 2*v+1 (negative), so lit ^ 1 negates it.
+    """
+
+    RESTART_UNIT = 100
+    VAR_DECAY = 0.95
+
+    def __init__(self, n_vars: int = 0, default_phase: bool = False) -> None:
+        self.n_vars = 0
+        self.ok = True
+        self.default_phase = default_phase
+        self._val: List[int] = [0, 0]             # per internal literal: 1 true, -1 false, 0 unset
+        self._level: List[int] = [0]
+        self._reason: List[Optional[list]] = [None]
+        self._activity: List[float] = [0.0]
+        self._phase: List[bool] = [default_phase]
+        self._watches: List[List[list]] = [[], []]
+        self._bin: List[List[Tuple[int, list]]] = [[], []]
+        self._trail: List[int] = []
+        self._trail_lim: List[int] = []
+        self._qhead = 0
+        self._heap: List[Tuple[float, int]] = []
+        self._in_heap: List[bool] = [False]
+        self._var_inc = 1.0
+        self.n_learnt = 0
+        self.n_conflicts = 0
+        self.n_decisions = 0
+        self.n_solves = 0
+        for _ in range(n_vars):
+            self.new_var()
+
+    # ------------------------------------------------------------------
+    # Problem construction
+    # ------------------------------------------------------------------
+    def new_var(self) -> int:
+        self.n_vars += 1
+        v = self.n_vars
+        self._val.extend((0, 0))
+        self._level.append(0)
+        self._reason.append(None)
+        self._activity.append(0.0)
+        self._phase.append(self.default_phase)
+        self._watches.extend(([], []))
+        self._bin.extend(([], []))
+        self._in_heap.append(True)
+        heapq.heappush(self._heap, (0.0, v))
+        return v
+
+    @staticmethod
+    def _ilit(lit: int) -> int:
+        return (lit << 1) if lit > 0 else ((-lit) << 1) | 1
+
+    def add_clause(self, lits: Iterable[int]) -> bool:
+        """Adds a clause at decision level 0. Returns False once the formula is UNSAT."""
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        clause: List[int] = []
+        seen: Set[int] = set()
+        for lit in lits:
+            v = abs(lit)
+            while v > self.n_vars:
+                self.new_var()
+            il = self._ilit(lit)
+            if il ^ 1 in seen or self._val[il] == 1:
+                return True  # tautology or already satisfied
+            if il in seen or self._val[il] == -1:
+                continue
+            seen.add(il)
+            clause.append(il)
+
+        if not clause:
+            self.ok = False
+            return False
+        if len(clause) == 1:
+            self._enqueue(clause[0], None)
+            if self._propagate() is not None:
+                self.ok = False
+            return self.ok
+        self._attach(clause)
+        return True
+
+    def _attach(self, clause: list) -> None:
+        if len(clause) == 2:
+            a, b = clause
+            self._bin[a].append((b, clause))
+            self._bin[b].append((a, clause))
+        else:
+            self._watches[clause[0]].append(clause)
+            self._watches[clause[1]].append(clause)
+
+    # ------------------------------------------------------------------
+    # Assignment / propagation
+    # ------------------------------------------------------------------
+    def _enqueue(self, il: int, reason: Optional[list]) -> None:
+        v = il >> 1
+        self._val[il] = 1
+        self._val[il ^ 1] = -1
+        self._level[v] = len(self._trail_lim)
+        self._reason[v] = reason
+        self._trail.append(il)
+
+    def _propagate(self) -> Optional[list]:
+        """Unit propagation; returns a conflicting clause or None."""
+        val = self._val
+        trail = self._trail
+        bins = self._bin
+        watches = self._watches
+        while self._qhead < len(trail):
+            p = trail[self._qhead]
+            self._qhead += 1
+            false_lit = p ^ 1
+
+            for other, clause in bins[false_lit]:
+                ov = val[other]
+                if ov == 1:
+                    continue
+                if ov == -1:
+                    return clause
+                # reason clauses keep the implied literal first
+                if clause[0] != other:
+                    clause[0], clause[1] = clause[1], clause[0]
+                self._enqueue(other, clause)
+
+            ws = watches[false_lit]
+            if not ws:
+                continue
+            kept: List[list] = []
+            n = len(ws)
+            i = 0
+            while i < n:
+                clause = ws[i]
+                i += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if val[first] == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    lk = clause[k]
+                    if val[lk] != -1:
+                        clause[1], clause[k] = lk, false_lit
+                        watches[lk].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if val[first] == -1:
+                        kept.extend(ws[i:])
+                        watches[false_lit] = kept
+                        return clause
+                    self._enqueue(first, clause)
+            watches[false_lit] = kept
+        return None
+
+    def _cancel_until(self, level: int) -> None:
+        if len(self._trail_lim) <= level:
+            return
+        val = self._val
+        activity = self._activity
+        phase = self._phase
+        in_heap = self._in_heap
+        start = self._trail_lim[level]
+        for il in self._trail[start:]:
+            v = il >> 1
+            val[il] = 0
+            val[il ^ 1] = 0
+            self._reason[v] = None
+            phase[v] = not (il & 1)
+            if not in_heap[v]:
+                in_heap[v] = True
+                heapq.heappush(self._heap, (-activity[v], v))
+        del self._trail[start:]
+        del self._trail_lim[level:]
+        self._qhead = len(self._trail)
+
+    # ------------------------------------------------------------------
+    # Conflict analysis
+    # ------------------------------------------------------------------
+    def _bump(self, v: int) -> None:
+        self._activity[v] += self._var_inc
+        if self._activity[v] > 1e100:
+            self._activity = [a * 1e-100 for a in self._activity]
+            self._var_inc *= 1e-100
+            self._heap = [(-self._activity[u], u) for u in range(1, self.n_vars + 1) if self._in_heap[u]]
+            heapq.heapify(self._heap)
+
+    def _analyze(self, confl: list) -> Tuple[List[int], int]:
+        level = self._level
+        reason = self._reason
+        trail = self._trail
+        current = len(self._trail_lim)
+        seen: Set[int] = set()
+        learnt: List[int] = [0]
+        counter = 0
+        p = -1
+        idx = len(trail) - 1
+        clause = confl
+        while True:
+            for q in (clause if p == -1 else clause[1:]):
+                v = q >> 1
+                if v in seen or level[v] == 0:
+                    continue
+                seen.add(v)
+                self._bump(v)
+                if level[v] >= current:
+                    counter += 1
+                else:
+                    learnt.append(q)
+            while (trail[idx] >> 1) not in seen:
+                idx -= 1
+            p = trail[idx]
+            idx -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = reason[p >> 1]
+            seen.discard(p >> 1)
+        learnt[0] = p ^ 1
+
+        if len(learnt) == 1:
+            return learnt, 0
+        best = 1
+        for i in range(2, len(learnt)):
+            if level[learnt[i] >> 1] > level[learnt[best] >> 1]:
+                best = i
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, level[learnt[1] >> 1]
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def _pick_branch(self) -> int:
+        heap = self._heap
+        val = self._val
+        while heap:
+            _, v = heapq.heappop(heap)
+            self._in_heap[v] = False
+            if val[v << 1] == 0:
+                return (v << 1) if self._phase[v] else (v << 1) | 1
+        return -1
+
+    def _search(self, assumptions: Sequence[int], conflict_budget: int) -> Optional[bool]:
+        conflicts = 0
+        while True:
+            confl = self._propagate()
+            if confl is not None:
+                self.n_conflicts += 1
+                conflicts += 1
+                if not self._trail_lim:
+                    self.ok = False
+                    return False
+                learnt, back_level = self._analyze(confl)
+                self._cancel_until(back_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self._attach(learnt)
+                    self.n_learnt += 1
+                    self._enqueue(learnt[0], learnt)
+                self._var_inc /= self.VAR_DECAY
+                continue
+
+            if conflicts >= conflict_budget:
+                self._cancel_until(0)
+                return None
+
+            next_lit = -1
+            while len(self._trail_lim) < len(assumptions):
+                a = assumptions[len(self._trail_lim)]
+                if self._val[a] == 1:
+                    self._trail_lim.append(len(self._trail))  # dummy level
+                elif self._val[a] == -1:
+                    return False  # assumptions contradict the formula
+                else:
+                    next_lit = a
+                    break
+
+            if next_lit == -1:
+                next_lit = self._pick_branch()
+                if next_lit == -1:
+                    return True
+                self.n_decisions += 1
+            self._trail_lim.append(len(self._trail))
+            self._enqueue(next_lit, None)
+
+    def solve(self, assumptions: Sequence[int] = ()) -> bool:
+        """
+        SAT check under DIMACS-style assumptions. Learned clauses are kept
+        between calls; the model stays readable via value() until the next
+        call or add_clause().
+        """
+        self.n_solves += 1
+        if not self.ok:
+            return False
+        self._cancel_until(0)
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+        assumed = [self._ilit(a) for a in assumptions]
+        restarts = 0
+        while True:
+            restarts += 1
+            status = self._search(assumed, _luby(restarts) * self.RESTART_UNIT)
+            if status is not None:
+                if status is False:
+                    self._cancel_until(0)
+                return status
+
+    def set_phase(self, var: int, phase: bool) -> None:
+        """Preferred polarity the next time var is picked as a decision (drops the current model)."""
+        self._cancel_until(0)
+        self._phase[var] = phase
+
+    def value(self, var: int) -> Optional[bool]:
+        """Value of var in the current assignment (the model after a SAT solve)."""
+        if var > self.n_vars:
+            return None
+        v = self._val[var << 1]
+        return None if v == 0 else v == 1
+
+
+# ============================================================
+# KR -> CNF compiler
+# ============================================================
+
+_EXPR_TOKEN_RE = re.compile(r"\s*(<=>|=>|[!&|()]|[A-Za-z_][A-Za-z0-9_]*)")
+
+
+def _tokenize_expr(expr: str) -> List[str]:
+    tokens: List[str] = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        m = _EXPR_TOKEN_RE.match(expr, pos)
+        if not m:
+            raise ValueError(f"Unexpected text in constraint: {expr[pos:]!r}")
+        tokens.append(m.group(1))
+        pos = m.end()
+    return tokens
+
+
+def parse_constraint_expr(expr: str):
+    """
+    Parses a UVL constraint into a nested tuple tree:
+      ("var", name) | ("not", a) | ("and"|"or"|"imp"|"iff", a, b)
+    Precedence (loosest first): <=>, =>, |, &, !
+    """
+    tokens = _tokenize_expr(expr)
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take() -> str:
+        nonlocal pos
+        tok = tokens[pos]
+        pos += 1
+        return tok
+
+    def parse_binary(op_token: str, op_name: str, sub, right_assoc: bool = False):
+        left = sub()
+        while peek() == op_token:
+            take()
+            right = parse_binary(op_token, op_name, sub, right_assoc) if right_assoc else sub()
+            left = (op_name, left, right)
+            if right_assoc:
+                break
+        return left
+
+    def parse_iff():
+        return parse_binary("<=>", "iff", parse_imp)
+
+    def parse_imp():
+        return parse_binary("=>", "imp", parse_or, right_assoc=True)
+
+    def parse_or():
+        return parse_binary("|", "or", parse_and)
+
+    def parse_and():
+        return parse_binary("&", "and", parse_not)
+
+    def parse_not():
+        tok = peek()
+        if tok is None:
+            raise ValueError(f"Incomplete constraint: {expr!r}")
+        if tok == "!":
+            take()
+            return ("not", parse_not())
+        if tok == "(":
+            take()
+            node = parse_iff()
+            if peek() != ")":
+                raise ValueError(f"Unbalanced parentheses in constraint: {expr!r}")
+            take()
+            return node
+        if tok in ("&", "|", "=>", "<=>", ")"):
+            raise ValueError(f"Unexpected '{tok}' in constraint: {expr!r}")
+        take()
+        return ("var", tok)
+
+    tree = parse_iff()
+    if pos != len(tokens):
+        raise ValueError(f"Trailing tokens in constraint: {expr!r}")
+    return tree
+
+
+@dataclass
+class CompiledKR:
+    """CNF for one KR model: the solver plus the feature-name <-> variable maps."""
+    solver: CdclSolver
+    var_of: Dict[str, int]
+    root: Optional[str]
+    optional_children: List[Tuple[str, str]]  # (child, parent) of optional groups
+    n_clauses: int = 0
+    skipped_constraints: List[str] = field(default_factory=list)
+
+    def lit(self, name: str, positive: bool = True) -> int:
+        v = self.var_of[name]
+        return v if positive else -v
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.var_of)
+
+
+def compile_kr(
+    features: Iterable[str],
+    parents: Iterable[Tuple[str, str]],
+    groups: Iterable[Tuple[str, str, List[str]]],
+    imps: Iterable[Tuple[str, str]],
+    equiv_or: Iterable[Tuple[str, str]] = (),
+    constraints_raw: Iterable[str] = (),
+    root: Optional[str] = None,
+    parse_literal=None,
+) -> CompiledKR:
+    """
+    Builds the CNF of a KR model. parse_literal maps an imp/2 argument
+    to (is_positive, name); the default understands x and not(x).
+    """
+    if parse_literal is None:
+        def parse_literal(expr: str) -> Tuple[bool, str]:
+            s = expr.strip()
+            if s.startswith("not(") and s.endswith(")"):
+                return (False, s[4:-1].strip())
+            return (True, s)
+
+    solver = CdclSolver()
+    var_of: Dict[str, int] = {}
+    n_clauses = 0
+
+    def var(name: str) -> int:
+        v = var_of.get(name)
+        if v is None:
+            v = solver.new_var()
+            var_of[name] = v
+        return v
+
+    def add(lits: List[int]) -> None:
+        nonlocal n_clauses
+        n_clauses += 1
+        solver.add_clause(lits)
+
+    def at_most_one(lits: List[int]) -> None:
+        if len(lits) <= 6:
+            for i in range(len(lits)):
+                for j in range(i + 1, len(lits)):
+                    add([-lits[i], -lits[j]])
+            return
+        # sequential counter: s_i <=> some of x_1..x_i is true
+        prev = solver.new_var()
+        add([-lits[0], prev])
+        for x in lits[1:-1]:
+            s = solver.new_var()
+            add([-x, s])
+            add([-prev, s])
+            add([-x, -prev])
+            prev = s
+        add([-lits[-1], -prev])
+
+    feature_list = list(features)
+    for f in sorted(feature_list):
+        var(f)
+
+    if root is not None and root in var_of:
+        add([var(root)])
+
+    for child, parent in parents:
+        add([-var(child), var(parent)])
+
+    optional_children: List[Tuple[str, str]] = []
+    for parent, gtype, children in groups:
+        if not children:
+            continue
+        pv = var(parent)
+        cvs = [var(c) for c in children]
+        for cv in cvs:
+            add([-cv, pv])
+        if gtype == "mandatory":
+            for cv in cvs:
+                add([-pv, cv])
+        elif gtype in ("or", "alternative"):
+            add([-pv] + cvs)
+            if gtype == "alternative":
+                at_most_one(cvs)
+        elif gtype == "optional":
+            optional_children.extend((c, parent) for c in children)
+
+    for lhs, rhs in imps:
+        lpos, lname = parse_literal(lhs)
+        rpos, rname = parse_literal(rhs)
+        lv = var(lname)
+        rv = var(rname)
+        add([-lv if lpos else lv, rv if rpos else -rv])
+
+    rhs_by_left: Dict[str, List[str]] = {}
+    for left, right in equiv_or:
+        rhs_by_left.setdefault(left, []).append(right)
+    for left, rights in rhs_by_left.items():
+        lv = var(left)
+        rvs = [var(r) for r in rights]
+        add([-lv] + rvs)
+        for rv in rvs:
+            add([-rv, lv])
+
+    def tseitin(node) -> int:
+        kind = node[0]
+        if kind == "var":
+            return var(node[1])
+        if kind == "not":
+            return -tseitin(node[1])
+        a = tseitin(node[1])
+        b = tseitin(node[2])
+        if kind == "imp":
+            a, kind = -a, "or"
+        t = solver.new_var()
+        if kind == "and":
+            add([-t, a])
+            add([-t, b])
+            add([t, -a, -b])
+        elif kind == "or":
+            add([-t, a, b])
+            add([t, -a])
+            add([t, -b])
+        else:  # iff
+            add([-t, -a, b])
+            add([-t, a, -b])
+            add([t, a, b])
+            add([t, -a, -b])
+        return t
+
+    skipped: List[str] = []
+    for expr in constraints_raw:
+        try:
+            tree = parse_constraint_expr(expr)
+        except ValueError:
+            skipped.append(expr)
+            continue
+        add([tseitin(tree)])
+
+    return CompiledKR(
+        solver=solver,
+        var_of=var_of,
+        root=root if root in var_of else None,
+        optional_children=optional_children,
+        n_clauses=n_clauses,
+        skipped_constraints=skipped,
+    )
+
+
+# ============================================================
+# Dead features / false optionals / void
+# ============================================================
+
+@dataclass
+class DefectDecision:
+    satisfiable: bool
+    dead: Set[str]
+    false_optional: Set[str]
+    n_queries: int
+    n_models: int
+
+
+def decide_defects(
+    cnf: CompiledKR,
+    dead_candidates: Iterable[str],
+    fo_candidates: Iterable[Tuple[str, str]],
+    forced_true: Iterable[str] = (),
+    forced_false: Iterable[str] = (),
+) -> DefectDecision:
+    """
+    Exact decisions on one shared solver:
+      - void model: the formula itself is UNSAT
+      - dead feature f: formula & f is UNSAT
+      - false optional (f, parent): f not dead and formula & parent & !f is UNSAT
+    forced_true / forced_false are names already known to hold in every
+    configuration (e.g. from unit propagation); they are settled without a
+    query. Candidate names missing from the CNF are ignored.
+    """
+    solver = cnf.solver
+    var_of = cnf.var_of
+
+    if not solver.solve():
+        return DefectDecision(False, set(), set(), 1, 0)
+
+    dead_todo = {var_of[f]: f for f in dead_candidates if f in var_of}
+    candidate_vars = list(dead_todo)
+    fo_todo: Dict[Tuple[int, int], str] = {}
+    for child, parent in fo_candidates:
+        if child in var_of and parent in var_of:
+            fo_todo[(var_of[child], var_of[parent])] = child
+
+    n_queries = 1
+    n_models = 0
+
+    def absorb_model() -> None:
+        nonlocal n_models
+        n_models += 1
+        value = solver.value
+        for v in [v for v in dead_todo if value(v)]:
+            del dead_todo[v]
+        for key in [k for k in fo_todo if value(k[1]) and not value(k[0])]:
+            del fo_todo[key]
+
+    absorb_model()
+
+    dead: Set[str] = set()
+    for f in forced_false:
+        v = var_of.get(f)
+        if v in dead_todo:
+            dead.add(dead_todo.pop(v))
+    dead_vars = {var_of[f] for f in dead}
+    false_optional: Set[str] = set()
+    forced_true_vars = {var_of[f] for f in forced_true if f in var_of}
+    for key in [k for k in fo_todo if k[0] in forced_true_vars and k[0] not in dead_vars]:
+        false_optional.add(fo_todo.pop(key))
+
+    for v in sorted(dead_todo):
+        if v not in dead_todo:
+            continue  # covered by a model found for an earlier query
+        for u in candidate_vars:
+            solver.set_phase(u, u in dead_todo)
+        n_queries += 1
+        if solver.solve([v]):
+            absorb_model()
+        else:
+            dead.add(dead_todo.pop(v))
+
+    dead_vars = {var_of[f] for f in dead}
+    for key in sorted(fo_todo):
+        if key not in fo_todo:
+            continue
+        cv, pv = key
+        if cv in dead_vars:
+            del fo_todo[key]
+            continue
+        n_queries += 1
+        if solver.solve([pv, -cv]):
+            absorb_model()
+        else:
+            false_optional.add(fo_todo.pop(key))
+
+    return DefectDecision(True, dead, false_optional, n_queries, n_models)
@@ -1,6 +1,14 @@
+import sys
 import pandas as pd
 from pathlib import Path
 
+# project root (python/) for pipeline_store
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from pipeline_store.sheet_chunks import iter_xlsx_chunks  # noqa: E402
+
 # =========================
 # CONFIG
 # =========================
@@ -22,6 +30,9 @@ structure_sheets = [
 
 out_report = Path("NA_Captured_2025_Report.xlsx")
 
+# VISIT_RESULT sheets are streamed in chunks of this many rows; only 2025 rows are kept
+CHUNK_ROWS = 50_000
+
 # Columns in VISIT_RESULT*
 COL_BRANCH_ID = "BRANCH_ID"
 COL_CATEGORY_ID = "CATEGORY_ID"
@@ -95,20 +106,19 @@ usecols_vr = [
 ]
 
 for sh in visit_result_sheets:
-    df = pd.read_excel(xls, sheet_name=sh, usecols=usecols_vr)
-    df["SOURCE_SHEET"] = sh
-    vr_frames.append(df)
+    # Filter 2025 chunk by chunk: memory follows the 2025 rows, not the whole multi-year export
+    for df in iter_xlsx_chunks(excel_path, sh, CHUNK_ROWS, usecols=usecols_vr):
+        df[COL_VISIT_DATE] = ensure_datetime(df[COL_VISIT_DATE])
+        df = df[df[COL_VISIT_DATE].dt.year == 2025].copy()
+        df["SOURCE_SHEET"] = sh
+        vr_frames.append(df)
 
-vr = pd.concat(vr_frames, ignore_index=True)
+vr_2025 = pd.concat(vr_frames, ignore_index=True)
 
 # Fix types
-vr[COL_BRANCH_ID] = safe_int(vr[COL_BRANCH_ID])
-vr[COL_CATEGORY_ID] = safe_int(vr[COL_CATEGORY_ID])
-vr[COL_ITEM_ID] = safe_int(vr[COL_ITEM_ID])
-vr[COL_VISIT_DATE] = ensure_datetime(vr[COL_VISIT_DATE])
-
-# Filter 2025
-vr_2025 = vr[vr[COL_VISIT_DATE].dt.year == 2025].copy()
+vr_2025[COL_BRANCH_ID] = safe_int(vr_2025[COL_BRANCH_ID])
+vr_2025[COL_CATEGORY_ID] = safe_int(vr_2025[COL_CATEGORY_ID])
+vr_2025[COL_ITEM_ID] = safe_int(vr_2025[COL_ITEM_ID])
 
 # 2) Read branch profile (iso_active)
 bp = pd.read_excel(xls, sheet_name=branch_profile_sheet, usecols=[COL_BRANCH_ID, COL_ISO_ACTIVE]).copy()
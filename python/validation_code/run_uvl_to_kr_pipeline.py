@@ -1,11 +1,14 @@
-import sys
-import subprocess
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# batch_uvl_to_kr.py lives next to this script (validation_code)
+from batch_uvl_to_kr import run_batch
+
 # =========================
-# PROJECT ROOT (عدل إذا لزم)
+# PROJECT ROOT (python/ — same base the analyzer uses)
 # =========================
-BASE_DIR = Path(r"C:\Users\pc\Desktop\phd file draft\phd new\جامعه اشبيليه\برنامج الايزو\vs code\medicareinternalaudit")
+BASE_DIR = Path(__file__).resolve().parent.parent
 
 # -------------------------
 # UVL INPUTS (الحقيقية عندك)
@@ -19,14 +22,8 @@ INJECTED_UVL_DIR = BASE_DIR / "uvl_scientific_defects_v5"
 CLEAN_KR_DIR = BASE_DIR / "kr_outputs_10models"
 INJECTED_KR_DIR = BASE_DIR / "prolog_facts_v5"
 
-# -------------------------
-# Path to transformer script
-# (موجود داخل structurecode)
-# -------------------------
-TRANSFORMER_SCRIPT = BASE_DIR / "structurecode" / "batch_uvl_to_kr.py"
-
 
-def run_transform(input_dir: Path, output_dir: Path, label: str) -> None:
+def run_transform(input_dir: Path, output_dir: Path, label: str, force: bool = False, executor=None) -> None:
     print(f"\n>>> [{label}] UVL -> KR")
     print(f"    Input : {input_dir}")
     print(f"    Output: {output_dir}")
@@ -36,23 +33,33 @@ def run_transform(input_dir: Path, output_dir: Path, label: str) -> None:
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    cmd = [
-        sys.executable,
-        str(TRANSFORMER_SCRIPT),
-        "-i", str(input_dir),
-        "-o", str(output_dir),
-    ]
+    # In-process call (no subprocess); unchanged files are skipped via the KR manifest
+    run_batch(str(input_dir), str(output_dir), force=force, executor=executor)
 
-    # مهم: نجعل الـ working directory هو structurecode
-    # لكي أي مراجع نسبية داخل السكربت تكون آمنة
-    subprocess.run(cmd, check=True, cwd=str(TRANSFORMER_SCRIPT.parent))
 
+def main() -> None:
+    ap = argparse.ArgumentParser(description="UVL -> KR for the CLEAN and INJECTED corpora")
+    ap.add_argument("--clean-uvl", type=Path, default=CLEAN_UVL_DIR)
+    ap.add_argument("--injected-uvl", type=Path, default=INJECTED_UVL_DIR)
+    ap.add_argument("--clean-kr", type=Path, default=CLEAN_KR_DIR)
+    ap.add_argument("--injected-kr", type=Path, default=INJECTED_KR_DIR)
+    ap.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes shared by both corpora")
+    ap.add_argument("--force", action="store_true", help="Re-transform every file, ignoring the manifests")
+    args = ap.parse_args()
 
-if __name__ == "__main__":
-    # 1) Clean
-    run_transform(CLEAN_UVL_DIR, CLEAN_KR_DIR, "CLEAN")
+    pool = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        # 1) Clean
+        run_transform(args.clean_uvl, args.clean_kr, "CLEAN", force=args.force, executor=pool)
 
-    # 2) Injected
-    run_transform(INJECTED_UVL_DIR, INJECTED_KR_DIR, "INJECTED")
+        # 2) Injected
+        run_transform(args.injected_uvl, args.injected_kr, "INJECTED", force=args.force, executor=pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     print("\n✅ All transformations completed successfully!")
+
+
+if __name__ == "__main__":
+    main()
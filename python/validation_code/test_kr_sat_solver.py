@@ -0,0 +1,161 @@
+# test_kr_sat_solver.py
+# ============================================================
+# Brute-force cross-checks for kr_sat_solver.py
+# ------------------------------------------------------------
+# - CdclSolver.solve(assumptions) on random small CNFs, one solver
+#   reused across queries (learned clauses are kept between calls).
+# - analyze_kr_for_defects on random small feature models (optional /
+#   mandatory / or / alternative groups, imp/2 with not(x), void models)
+#   against enumeration of every configuration.
+# ============================================================
+
+from __future__ import annotations
+
+import itertools
+import random
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import pytest
+
+from kr_sat_solver import CdclSolver
+
+ROOT = "R"
+
+
+# ----------------------------
+# CdclSolver
+# ----------------------------
+def _brute_sat(n_vars: int, clauses: List[List[int]], assumptions: List[int]) -> bool:
+    for bits in itertools.product((False, True), repeat=n_vars):
+        def holds(lit: int) -> bool:
+            return bits[abs(lit) - 1] == (lit > 0)
+        if all(holds(a) for a in assumptions) and all(any(holds(l) for l in c) for c in clauses):
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_cdcl_matches_brute_force_under_assumptions(seed: int) -> None:
+    rng = random.Random(seed)
+    n_vars = rng.randint(3, 10)
+    clauses = [
+        [rng.choice((1, -1)) * v for v in rng.sample(range(1, n_vars + 1), rng.randint(1, 3))]
+        for _ in range(rng.randint(n_vars, 4 * n_vars))
+    ]
+    solver = CdclSolver(n_vars)
+    for c in clauses:
+        solver.add_clause(c)
+
+    for _ in range(12):
+        assumptions = [rng.choice((1, -1)) * v for v in rng.sample(range(1, n_vars + 1), rng.randint(0, 3))]
+        expected = _brute_sat(n_vars, clauses, assumptions)
+        assert solver.solve(assumptions) == expected
+        if expected:
+            model = {v: solver.value(v) for v in range(1, n_vars + 1)}
+            assert all(model[abs(a)] == (a > 0) for a in assumptions)
+            assert all(any(model[abs(l)] == (l > 0) for l in c) for c in clauses)
+
+
+# ----------------------------
+# analyze_kr_for_defects
+# ----------------------------
+def _random_model(rng: random.Random) -> Tuple[Set[str], List[Tuple[str, str, List[str]]], List[Tuple[str, str]]]:
+    names = [ROOT] + [f"F{i}" for i in range(rng.randint(3, 11))]
+    children_of: Dict[str, List[str]] = {}
+    for i, name in enumerate(names[1:], start=1):
+        children_of.setdefault(rng.choice(names[:i]), []).append(name)
+
+    groups: List[Tuple[str, str, List[str]]] = []
+    for parent, children in children_of.items():
+        rng.shuffle(children)
+        while children:
+            take = rng.randint(1, len(children))
+            groups.append((parent, rng.choice(("optional", "mandatory", "or", "alternative")), children[:take]))
+            children = children[take:]
+
+    def literal() -> str:
+        name = rng.choice(names)
+        return f"not({name})" if rng.random() < 0.4 else name
+
+    imps = [(literal(), literal()) for _ in range(rng.randint(0, 4))]
+    return set(names), groups, imps
+
+
+def _holds(lit: str, value: Dict[str, bool]) -> bool:
+    if lit.startswith("not(") and lit.endswith(")"):
+        return not value[lit[4:-1]]
+    return value[lit]
+
+
+def _brute_defects(
+    features: Set[str], groups: List[Tuple[str, str, List[str]]], imps: List[Tuple[str, str]]
+) -> Tuple[bool, Set[str], Set[str]]:
+    names = sorted(features)
+    root_optional = {c for p, g, cs in groups if p == ROOT and g == "optional" for c in cs}
+    ever_true: Set[str] = set()
+    always_true = set(root_optional)
+    n_models = 0
+    for bits in itertools.product((False, True), repeat=len(names)):
+        value = dict(zip(names, bits))
+        if not value[ROOT]:
+            continue
+        ok = True
+        for parent, gtype, children in groups:
+            selected = sum(value[c] for c in children)
+            if any(value[c] and not value[parent] for c in children):
+                ok = False
+            elif gtype == "mandatory" and value[parent] and selected != len(children):
+                ok = False
+            elif gtype == "or" and value[parent] and selected == 0:
+                ok = False
+            elif gtype == "alternative" and value[parent] and selected != 1:
+                ok = False
+            if not ok:
+                break
+        if not ok or not all(_holds(b, value) for a, b in imps if _holds(a, value)):
+            continue
+        n_models += 1
+        ever_true.update(n for n in names if value[n])
+        always_true &= {n for n in names if value[n]}
+    if not n_models:
+        return False, set(), set()
+    return True, set(names) - ever_true, always_true - (set(names) - ever_true)
+
+
+def _analyze(features, groups, imps):
+    fla = pytest.importorskip("final_logic_analyzer")
+    kr = fla.KRModel(
+        path=Path("ISO_DATA__test.lp"),
+        features=set(features),
+        groups=[(p, g, list(cs)) for p, g, cs in groups],
+        imps=list(imps),
+        parents=[(c, p) for p, _, cs in groups for c in cs],
+    )
+    return fla.analyze_kr_for_defects(kr, "test", root=ROOT)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_kr_defects_match_brute_force(seed: int) -> None:
+    features, groups, imps = _random_model(random.Random(seed))
+    satisfiable, dead, false_optional = _brute_defects(features, groups, imps)
+    ana = _analyze(features, groups, imps)
+    assert ana.satisfiable == satisfiable
+    assert ana.dead_features == dead
+    assert ana.false_optional == false_optional
+    assert (f"VOID:{ROOT}" in ana.defects_raw) == (not satisfiable)
+
+
+def test_kr_defects_wide_alternative_and_void() -> None:
+    # 8 alternatives use the sequential-counter encoding; F1 => F2 kills F1
+    children = [f"F{i}" for i in range(8)]
+    features = {ROOT, *children, "X"}
+    groups = [(ROOT, "alternative", children), (ROOT, "optional", ["X"])]
+    imps = [("F1", "F2"), ("X", "not(F0)")]
+    assert _brute_defects(features, groups, imps) == (True, {"F1"}, set())
+    ana = _analyze(features, groups, imps)
+    assert ana.satisfiable and ana.dead_features == {"F1"} and not ana.false_optional
+
+    ana = _analyze(features, groups, imps + [(ROOT, "X"), ("X", "F0")])
+    assert not ana.satisfiable
+    assert ana.defects_raw == [f"VOID:{ROOT}"]